@@ -0,0 +1,213 @@
+"""
+Airport gazetteer for AI Travel Planner
+Offline airport and city index over the bundled data files (IATA, name, city, country, lat/lng), loaded
+on first use, with O(1) code lookup, prefix search over codes, cities and airport names, and a KD-tree for
+nearest-airport queries from any coordinates.
+
+data/airports.tsv is the curated list of featured cities offered by default in the planner;
+data/airports_world.tsv adds about 6,700 more airports with IATA codes worldwide, derived from the
+airportsdata package (MIT, see data/airports_world_LICENSE.txt). Curated rows come first and win for codes
+listed in both. The first airport listed for a city is its primary airport (the one flights are searched from).
+"""
+
+import csv
+import heapq
+import math
+import threading
+import unicodedata
+from bisect import bisect_left
+from dataclasses import dataclass
+from pathlib import Path
+
+DATA_PATH = Path(__file__).parent / "data" / "airports.tsv"
+WORLD_DATA_PATH = Path(__file__).parent / "data" / "airports_world.tsv"
+EARTH_RADIUS_KM = 6371.0
+
+@dataclass(frozen=True, slots=True)
+class Airport:
+    iata: str
+    name: str
+    city: str
+    country: str
+    lat: float
+    lng: float
+
+    @property
+    def city_country(self):
+        """Planner location label, e.g. "Cape Town, South Africa" """
+        return f"{self.city}, {self.country}"
+
+def to_unit_vector(lat, lng):
+    """Point on the unit sphere; straight-line distance between these orders points by great-circle distance"""
+    lat, lng = math.radians(lat), math.radians(lng)
+    return (math.cos(lat) * math.cos(lng), math.cos(lat) * math.sin(lng), math.sin(lat))
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+def build_kdtree(points, indices, depth=0):
+    """
+    KD-tree over 3D points as nested (index, axis, left, right) tuples, split at the median
+
+    Args:
+        points (list): (x, y, z) tuples
+        indices (list): Point positions to place in this subtree
+    """
+    if not indices:
+        return None
+    axis = depth % 3
+    indices = sorted(indices, key=lambda index: points[index][axis])
+    median = len(indices) // 2
+    return (indices[median], axis,
+            build_kdtree(points, indices[:median], depth + 1),
+            build_kdtree(points, indices[median + 1:], depth + 1))
+
+def normalize(text):
+    """Lowercase, accent-free form used for matching ("Bogotá" -> "bogota")"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower().strip()
+
+class AirportIndex:
+    """
+    Lazily loaded airport index
+
+    by_code maps IATA code -> Airport; by_city maps a normalized "city, country" or bare city name
+    -> its airports (primary first); prefix_keys is a sorted list of (normalized term, position) for bisect
+    prefix search; kdtree indexes the airports' unit-sphere points for nearest queries. The first
+    featured_count airports are the featured ones, from path.
+
+    Args:
+        path (Path): Curated airport file
+        world_path (Path): Additional airports, or None for the curated file only
+    """
+
+    def __init__(self, path=DATA_PATH, world_path=WORLD_DATA_PATH):
+        self.path = path
+        self.world_path = world_path
+        self.lock = threading.Lock()
+        self.airports = None
+
+    @staticmethod
+    def _read(path):
+        with open(path, 'r', encoding='utf-8', newline='') as file:
+            return [Airport(row['iata'], row['name'], row['city'], row['country'], float(row['lat']), float(row['lng']))
+                    for row in csv.DictReader(file, delimiter='\t')]
+
+    def _load(self):
+        if self.airports is not None:
+            return
+        with self.lock:
+            if self.airports is not None:
+                return
+            airports = self._read(self.path)
+            self.featured_count = len(airports)
+            if self.world_path:
+                featured_codes = {airport.iata for airport in airports}
+                airports += [airport for airport in self._read(self.world_path) if airport.iata not in featured_codes]
+
+            self.by_code = {airport.iata: airport for airport in airports}
+            self.by_city = {}
+            prefix_keys = set()
+            for position, airport in enumerate(airports):
+                for city_key in (normalize(airport.city_country), normalize(airport.city)):
+                    self.by_city.setdefault(city_key, []).append(airport)
+                for term in (airport.iata, airport.city, airport.city_country, airport.name):
+                    prefix_keys.add((normalize(term), position))
+            self.prefix_keys = sorted(prefix_keys)
+            self.points = [to_unit_vector(airport.lat, airport.lng) for airport in airports]
+            self.kdtree = build_kdtree(self.points, list(range(len(airports))))
+            self.airports = airports
+
+    def get(self, iata_code):
+        """Airport for an IATA code, or None"""
+        self._load()
+        return self.by_code.get((iata_code or '').upper())
+
+    def city_airports(self, city):
+        """Airports for "City, Country" or a bare city name, primary first"""
+        self._load()
+        return self.by_city.get(normalize(city)) or self.by_city.get(normalize(city.split(',')[0])) or []
+
+    def search(self, prefix, limit=10):
+        """
+        Airports whose code, city or name starts with prefix, in data file order
+
+        Args:
+            prefix (str): Search text (case and accent insensitive)
+            limit (int): Maximum airports returned
+
+        Returns:
+            list: Airport records
+        """
+        self._load()
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        positions = set()
+        for term, position in self.prefix_keys[bisect_left(self.prefix_keys, (prefix, -1)):]:
+            if not term.startswith(prefix):
+                break
+            positions.add(position)
+        return [self.airports[position] for position in sorted(positions)[:limit]]
+
+    def nearest(self, lat, lng, k=3, max_km=None):
+        """
+        The k airports closest to a point
+
+        Args:
+            lat (float): Latitude
+            lng (float): Longitude
+            k (int): Number of airports
+            max_km (float): Ignore airports farther than this
+
+        Returns:
+            list: (Airport, distance_km) tuples, closest first
+        """
+        self._load()
+        target = to_unit_vector(lat, lng)
+        best = []  # max-heap of (-squared chord, index)
+
+        def visit(node):
+            if node is None:
+                return
+            index, axis, left, right = node
+            point = self.points[index]
+            squared = sum((point[i] - target[i]) ** 2 for i in range(3))
+            if len(best) < k:
+                heapq.heappush(best, (-squared, index))
+            elif squared < -best[0][0]:
+                heapq.heapreplace(best, (-squared, index))
+            offset = target[axis] - point[axis]
+            near, far = (left, right) if offset < 0 else (right, left)
+            visit(near)
+            if len(best) < k or offset * offset < -best[0][0]:
+                visit(far)
+
+        visit(self.kdtree)
+        results = sorted((chord_to_km(math.sqrt(-negative)), index) for negative, index in best)
+        return [(self.airports[index], distance) for distance, index in results
+                if max_km is None or distance <= max_km]
+
+    def distance_km(self, from_code, to_code):
+        """Great-circle distance between two airports, or None if either code is unknown"""
+        origin, destination = self.get(from_code), self.get(to_code)
+        if not origin or not destination:
+            return None
+        a, b = to_unit_vector(origin.lat, origin.lng), to_unit_vector(destination.lat, destination.lng)
+        return chord_to_km(math.sqrt(sum((a[i] - b[i]) ** 2 for i in range(3))))
+
+    def all(self):
+        """Every airport, featured ones first, in data file order"""
+        self._load()
+        return list(self.airports)
+
+    def city_codes(self, featured_only=False):
+        """"City, Country" -> primary airport code, for every city (or every featured city) in the data files"""
+        self._load()
+        codes = {}
+        for airport in self.airports[:self.featured_count] if featured_only else self.airports:
+            codes.setdefault(airport.city_country, airport.iata)
+        return codes
+
+# Shared index, loaded on first lookup
+airports = AirportIndex()
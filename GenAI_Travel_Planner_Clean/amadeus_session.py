@@ -0,0 +1,265 @@
+"""
+Amadeus session for AI Travel Planner
+The Amadeus SDK client with two changes: its HTTP calls go over one pooled connection session per process,
+and its OAuth access token is shared by every worker process on the host through a SQLite file (readable by
+the owner only), so workers reuse one token instead of each negotiating their own. A background thread
+renews the token shortly before it expires while the session is in use. Endpoints, responses and errors
+(amadeus.ResponseError and its subclasses) are the SDK's own.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from urllib.error import URLError
+import requests
+from requests.adapters import HTTPAdapter
+from amadeus import Client, AuthenticationError
+from config import config
+
+# A token is not used in its last EXPIRY_MARGIN seconds, so in-flight calls never carry an expired token
+EXPIRY_MARGIN = 10
+
+# Shortest wait between background refreshes, however short-lived the tokens are
+MIN_REFRESH_INTERVAL = 30
+
+class TokenStore:
+    """
+    Access tokens per (host, client id) in SQLite, shared by every process on the host
+
+    The file is created readable and writable by its owner only. A process that finds the stored token
+    too close to expiry takes the database write lock before requesting a new one, so concurrent workers
+    wait for that token instead of requesting their own.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+        os.chmod(path, 0o600)  # also tightens files created before tokens were protected
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tokens (
+                    client_key TEXT PRIMARY KEY,
+                    access_token TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def get(self, client_key, min_remaining, request_token):
+        """
+        A token valid for at least min_remaining seconds, requesting one only if no process has
+
+        Args:
+            client_key (str): Host and client id
+            min_remaining (float): Seconds the token must still be valid for
+            request_token (callable): Returns (access_token, expires_in) from the token endpoint
+
+        Returns:
+            tuple: (access_token, expires_at, requested) where requested is True if this call fetched it
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT access_token, expires_at FROM tokens WHERE client_key = ?", (client_key,)).fetchone()
+            if row and row[1] - min_remaining > time.time():
+                return row[0], row[1], False
+
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT access_token, expires_at FROM tokens WHERE client_key = ?", (client_key,)).fetchone()
+            if row and row[1] - min_remaining > time.time():
+                conn.execute("COMMIT")
+                return row[0], row[1], False
+            try:
+                access_token, expires_in = request_token()
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            expires_at = time.time() + expires_in
+            conn.execute("INSERT OR REPLACE INTO tokens (client_key, access_token, expires_at) VALUES (?, ?, ?)",
+                         (client_key, access_token, expires_at))
+            conn.execute("COMMIT")
+            return access_token, expires_at, True
+        finally:
+            conn.close()
+
+    def invalidate(self, client_key, access_token):
+        """Forget a token the API rejected (only if no other process has replaced it already)"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM tokens WHERE client_key = ? AND access_token = ?", (client_key, access_token))
+
+class PooledResponse:
+    """requests response seen through the urlopen interface the SDK parses"""
+
+    def __init__(self, response):
+        self.response = response
+        self.status = response.status_code
+
+    def info(self):
+        return self.response.headers
+
+    def read(self):
+        return self.response.content
+
+class PooledHTTP:
+    """urlopen-compatible callable for the SDK's http option, over one pooled requests session"""
+
+    def __init__(self, pool_size=16, timeout=30):
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.timeout = timeout
+
+    def __call__(self, request):
+        try:
+            response = self.session.request(request.get_method(), request.full_url, data=request.data,
+                                            headers=dict(request.header_items()), timeout=self.timeout)
+        except requests.RequestException as e:
+            raise URLError(e)  # the SDK reports it as a NetworkError
+        return PooledResponse(response)
+
+class SharedAccessToken:
+    """
+    Stand-in for the SDK's per-client AccessToken, drawing tokens from the shared TokenStore
+
+    Args:
+        session (AmadeusSession): Client whose token endpoint is called when no process has a valid token
+        store (TokenStore): Shared token store, or None to keep the token in this process only
+        refresh_ahead (float): Seconds before expiry the background thread renews the token
+    """
+
+    def __init__(self, session, store=None, refresh_ahead=120):
+        self.session = session
+        self.client_key = f"{session.host}|{session.client_id}"
+        self.store = store
+        self.refresh_ahead = refresh_ahead
+        self.lock = threading.Lock()
+        self.token = None
+        self.expires_at = 0.0
+        self.token_loaded_at = 0.0
+        self.last_call = 0.0
+        self.refresher = None
+
+    def _bearer_token(self):
+        """Authorization header value, as the SDK asks its AccessToken for it"""
+        return f"Bearer {self.current()}"
+
+    def _request_token(self):
+        """(access_token, expires_in) from the OAuth token endpoint"""
+        response = self.session._unauthenticated_request('POST', '/v1/security/oauth2/token', {
+            'grant_type': 'client_credentials',
+            'client_id': self.session.client_id,
+            'client_secret': self.session.client_secret,
+        })
+        return response.result['access_token'], float(response.result.get('expires_in', 1799))
+
+    def _ahead(self):
+        """Seconds before expiry to renew: refresh_ahead, but at most half the token's lifetime"""
+        return min(self.refresh_ahead, (self.expires_at - self.token_loaded_at) / 2)
+
+    def _load(self, min_remaining):
+        """Refresh the in-memory token from the shared store (call with self.lock held)"""
+        if self.store is None:
+            token, expires_in = self._request_token()
+            self.token, self.expires_at, requested = token, time.time() + expires_in, True
+        else:
+            self.token, self.expires_at, requested = self.store.get(self.client_key, min_remaining, self._request_token)
+        self.token_loaded_at = time.time()
+        self.session._count('token_requests' if requested else 'shared_tokens')
+
+    def current(self):
+        """Current access token, loading or requesting one only when the cached one is about to expire"""
+        self.last_call = time.time()
+        if self.token and self.expires_at - EXPIRY_MARGIN > time.time():
+            return self.token
+        with self.lock:
+            if not (self.token and self.expires_at - EXPIRY_MARGIN > time.time()):
+                self._load(EXPIRY_MARGIN)
+            if self.refresher is None:
+                self.refresher = threading.Thread(target=self._refresh_loop, name="amadeus-token", daemon=True)
+                self.refresher.start()
+            return self.token
+
+    def reject(self, token):
+        """Drop a token the API refused, here and in the store, so the next call gets a new one"""
+        with self.lock:
+            if self.token == token:
+                if self.store is not None:
+                    self.store.invalidate(self.client_key, token)
+                self.token, self.expires_at = None, 0.0
+
+    def _refresh_loop(self):
+        """Renew the token ahead of expiry, never more often than MIN_REFRESH_INTERVAL; stops once the session goes unused"""
+        while True:
+            time.sleep(max(MIN_REFRESH_INTERVAL, self.expires_at - self._ahead() - time.time()))
+            with self.lock:
+                if self.last_call < self.token_loaded_at:
+                    self.refresher = None  # idle: the next call loads a token and restarts the thread
+                    return
+                try:
+                    self._load(self._ahead())
+                    self.session._count('background_refreshes')
+                except Exception as e:
+                    print(f"✈️ Amadeus token refresh failed: {e}")
+                    self.session._count('refresh_failures')
+
+class AmadeusSession(Client):
+    """
+    Amadeus SDK client sharing its access token across threads and processes
+
+    Args:
+        client_id (str): API key
+        client_secret (str): API secret
+        hostname (str): 'production' or 'test'
+        store (TokenStore): Shared token store
+        refresh_ahead (float): Seconds before expiry the background thread renews the token
+        pool_size (int): Pooled connections kept open to the API host
+        timeout (float): Request timeout in seconds
+    """
+
+    def __init__(self, client_id, client_secret, hostname='production', store=None, refresh_ahead=120,
+                 pool_size=16, timeout=30):
+        super().__init__(client_id=client_id, client_secret=client_secret, hostname=hostname,
+                         http=PooledHTTP(pool_size, timeout))
+        # Counters have their own lock: the token lock is held across token requests, which calls must not wait on
+        self.metrics_lock = threading.Lock()
+        self.metrics = {'calls': 0, 'token_requests': 0, 'shared_tokens': 0, 'background_refreshes': 0,
+                        'refresh_failures': 0, 'rejected_tokens': 0}
+        # The SDK reads its token through self.access_token._bearer_token()
+        self.access_token = SharedAccessToken(self, store, refresh_ahead)
+
+    def _count(self, name):
+        with self.metrics_lock:
+            self.metrics[name] += 1
+
+    def request(self, verb, path, params):
+        """SDK request with the shared token; a rejected token is replaced and the call retried once"""
+        self._count('calls')
+        token = self.access_token.current()
+        try:
+            return super().request(verb, path, params)
+        except AuthenticationError:
+            self._count('rejected_tokens')
+            self.access_token.reject(token)
+            return super().request(verb, path, params)
+
+    def get_metrics(self):
+        """Call and token counters for this process, plus seconds until the current token expires"""
+        with self.metrics_lock:
+            metrics = dict(self.metrics)
+        token = self.access_token
+        metrics['token_expires_in'] = max(0, round(token.expires_at - time.time())) if token.token else None
+        return metrics
+
+def create_session():
+    """Session for the configured credentials, sharing tokens through AMADEUS_TOKEN_DB"""
+    return AmadeusSession(
+        config.AMADEUS_CLIENT_ID,
+        config.AMADEUS_CLIENT_SECRET,
+        hostname=config.AMADEUS_HOSTNAME,
+        store=TokenStore(config.AMADEUS_TOKEN_DB),
+        refresh_ahead=config.AMADEUS_TOKEN_REFRESH_AHEAD,
+        pool_size=config.AMADEUS_POOL_SIZE,
+    )
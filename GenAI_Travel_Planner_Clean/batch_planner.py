@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Batch travel plan generation for AI Travel Planner
+Reads trips from CSV or JSONL, generates plans on a process pool and streams them out as JSONL
+
+Usage:
+    python batch_planner.py trips.csv -o plans.jsonl --workers 4
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from travel_records import to_plain
+
+def read_trips(path):
+    """
+    Read trip requests from a CSV (header row) or JSONL file
+
+    Args:
+        path (str): Input file path, '-' reads JSONL from stdin
+
+    Returns:
+        list: Trip dicts in file order
+    """
+    if path == '-':
+        return [json.loads(line) for line in sys.stdin if line.strip()]
+
+    with open(path, 'r', encoding='utf-8') as file:
+        if path.lower().endswith('.csv'):
+            return [dict(row) for row in csv.DictReader(file)]
+        return [json.loads(line) for line in file if line.strip()]
+
+def _load_destination(destination, activity_preferences_list):
+    """Worker entry point: fetch shared destination data"""
+    from plan_pipeline import fetch_destination_data
+    return fetch_destination_data(destination, activity_preferences_list)
+
+def _plan_trip(trip, completed):
+    """Worker entry point: generate a single plan reusing shared destination data"""
+    from plan_pipeline import generate_travel_plan
+    return generate_travel_plan(trip, completed=completed)
+
+def _shared_stages(destination_data, activity_preferences):
+    """Pick the precomputed stage results that apply to one trip"""
+    return {
+        'coords': destination_data['coords'],
+        'local_info': destination_data['local_info'],
+        'attractions': destination_data['attractions'][activity_preferences],
+    }
+
+def run_batch(trips, output, workers=4):
+    """
+    Generate plans for all trips, fetching destination data once per destination
+
+    Args:
+        trips (list): Trip dicts
+        output (file): Writable text stream for JSONL results
+        workers (int): Process pool size
+
+    Returns:
+        dict: Throughput statistics
+    """
+    started = time.perf_counter()
+
+    # Group trips by destination so geocode, attractions and local info are fetched once
+    # (multi-city trips share nothing per destination and are planned directly)
+    by_destination, multi_city = {}, []
+    for index, trip in enumerate(trips):
+        if trip.get('destinations'):
+            multi_city.append(index)
+        else:
+            by_destination.setdefault(trip.get('destination', ''), []).append(index)
+
+    succeeded = failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        for destination, indexes in by_destination.items():
+            preferences = sorted({trips[i].get('activity_preferences') or "" for i in indexes})
+            future = pool.submit(_load_destination, destination, preferences)
+            pending[future] = ('destination', destination)
+        for index in multi_city:
+            pending[pool.submit(_plan_trip, trips[index], None)] = ('trip', index)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, key = pending.pop(future)
+
+                if kind == 'destination':
+                    # Destination data is ready - queue every trip that uses it
+                    try:
+                        destination_data = future.result()
+                    except Exception as e:
+                        print(f"⚠️ Destination data failed for {key}: {e}", file=sys.stderr)
+                        destination_data = None
+                    for index in by_destination[key]:
+                        trip = trips[index]
+                        completed = _shared_stages(destination_data, trip.get('activity_preferences') or "") if destination_data else None
+                        pending[pool.submit(_plan_trip, trip, completed)] = ('trip', index)
+                    continue
+
+                record = {'index': key, 'trip': trips[key]}
+                try:
+                    record['plan'] = future.result()
+                    succeeded += 1
+                except Exception as e:
+                    record['error'] = str(e)
+                    failed += 1
+
+                # Stream each result as soon as it finishes
+                output.write(json.dumps(record, default=to_plain, ensure_ascii=False) + "\n")
+                output.flush()
+
+    elapsed = time.perf_counter() - started
+    return {
+        'trips': len(trips),
+        'destinations': len(by_destination),
+        'succeeded': succeeded,
+        'failed': failed,
+        'elapsed_seconds': round(elapsed, 2),
+        'trips_per_minute': round(len(trips) / elapsed * 60, 2) if elapsed > 0 else 0.0,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate travel plans in bulk from a CSV or JSONL trip list")
+    parser.add_argument('input', help="Trips file (.csv with a header row, or .jsonl); '-' reads JSONL from stdin")
+    parser.add_argument('-o', '--output', default='-', help="JSONL output path (default: stdout)")
+    parser.add_argument('-w', '--workers', type=int, default=4, help="Number of worker processes (default: 4)")
+    args = parser.parse_args(argv)
+
+    trips = read_trips(args.input)
+    if not trips:
+        print("No trips found in input", file=sys.stderr)
+        return 1
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        stats = run_batch(trips, output, workers=args.workers)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"✅ {stats['succeeded']}/{stats['trips']} plans for {stats['destinations']} destinations "
+          f"in {stats['elapsed_seconds']}s ({stats['trips_per_minute']} trips/min, {stats['failed']} failed)",
+          file=sys.stderr)
+    return 0 if stats['failed'] == 0 else 2
+
+if __name__ == "__main__":
+    sys.exit(main())
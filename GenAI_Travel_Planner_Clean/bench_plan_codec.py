@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Plan serialization benchmark for AI Travel Planner
+Compares payload size and encode/decode time of plan_codec against the JSON currently stored
+
+Usage:
+    python bench_plan_codec.py                     # synthetic plan
+    python bench_plan_codec.py plans.jsonl -n 500  # plans from batch_planner.py output
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import date, timedelta
+import plan_codec
+
+COMPRESSION_NAMES = {'n': 'none', 's': 'zstd', 'z': 'zlib'}
+
+WORDS = ("the city waterfront museum market dining harbour mountain trail coffee local wine tour gallery "
+         "beach sunset historic district meeting venue transport airport taxi safety culture festival "
+         "morning afternoon evening book reserve walk view garden").split()
+
+def synthetic_plan():
+    """A plan shaped like generate_travel_plan output, with realistic field sizes"""
+    departure = date.today() + timedelta(days=30)
+    rng = random.Random(7)
+    text = lambda words: " ".join(rng.choice(WORDS) for _ in range(words))
+    place = lambda i, kind: {
+        'name': f"{kind} {i}",
+        'address': f"{10 + i} Long Street, Cape Town City Centre, Cape Town, 8001, South Africa",
+        'phone': f"+27 21 555 01{i:02d}",
+        'website': f"https://www.example-{kind.lower()}-{i}.co.za/",
+        'rating': 4.1 + i / 10,
+        'total_ratings': 250 * (i + 1),
+        'price_level': '💰💰 Moderate',
+        'hours': "Monday: 9:00 AM – 10:00 PM; Tuesday: 9:00 AM – 10:00 PM...",
+        'photo_url': '',
+        'review_snippet': 'Visit Google Maps for reviews',
+        'google_maps_url': f"https://maps.google.com/?cid=1234567890{i}",
+        'place_id': f"ChIJ{'x' * 23}{i}",
+        'source': 'Google Places API',
+    }
+    return {
+        'source': "Durban, South Africa",
+        'destination': "Cape Town, South Africa",
+        'departure_date': departure,
+        'return_date': departure + timedelta(days=5),
+        'travel_theme': "💼 Business Trip",
+        'num_travelers': 2,
+        'budget': "Standard",
+        'flight_class': "economy",
+        'source_iata': "DUR",
+        'destination_iata': "CPT",
+        'trip_duration': 5,
+        'coords': [-33.9249, 18.4241],
+        'flight_summary': {
+            'route': "Durban (DUR) → Cape Town (CPT)",
+            'dates': f"{departure} to {departure + timedelta(days=5)}",
+            'booking_url': "https://www.skyscanner.com/transport/flights/dur/cpt/",
+        },
+        'restaurants': [place(i, 'Restaurant') for i in range(3)],
+        'business_venues': [dict(place(i, 'Venue'), category='💼 Coworking Space') for i in range(3)],
+        'attractions': [dict(place(i, 'Attraction'), category='🏛️ Museum', place_types=['museum', 'point_of_interest'])
+                        for i in range(3)],
+        'live_events': [{
+            'name': f"Cape Town Jazz Night {i} - Tickets and Dates",
+            'description': text(30),
+            'date': "12 Nov 2026",
+            'website': f"https://www.quicket.co.za/events/{1000 + i}",
+            'link_type': "🎫 **Ticket Booking Site** - Purchase tickets directly",
+            'link_text': "Buy Tickets",
+            'category': 'Concerts & Shows',
+            'icon': '🎵',
+        } for i in range(12)],
+        'local_info': [{
+            'category': category,
+            'icon': '🌤️',
+            'summary': f"{text(20)}... | {text(20)}...",
+            'sources': [{'title': 'Cape Town Weather Guide', 'link': 'https://www.example.com/weather'}] * 2,
+            'full_description': text(60),
+        } for category in ('Weather', 'Culture', 'Safety', 'Transport')],
+        'research': "## Destination insights\n" + "\n".join(f"- {text(25)}" for _ in range(25)),
+        'itinerary': "# Day-by-day itinerary\n" + "\n".join(f"**{8 + i % 12:02d}:00** - {text(18)}" for i in range(60)),
+        'car_rental_url': "https://www.skyscanner.com/carhire/results/CPT/CPT/2026-11-18T10:00/2026-11-23T10:00/30/",
+    }
+
+def read_plans(path):
+    """Plans from a JSON plan file or batch_planner JSONL output"""
+    with open(path, 'r', encoding='utf-8') as file:
+        if path.endswith('.json'):
+            return [json.load(file)]
+        records = [json.loads(line) for line in file if line.strip()]
+    return [record.get('plan', record) for record in records if record.get('plan', record)]
+
+def time_per_call(fn, values, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for value in values:
+            fn(value)
+    return (time.perf_counter() - started) / (rounds * len(values)) * 1e6
+
+def benchmark(plans, rounds):
+    """
+    Size and speed of each format over the given plans
+
+    Returns:
+        list: Result dicts (format, bytes, encode_us, decode_us), current JSON first
+    """
+    formats = [('json (current)', lambda plan: json.dumps(plan, default=str).encode('utf-8'), json.loads)]
+    codecs = ['j'] + (['m'] if plan_codec.msgpack else [])
+    for codec in codecs:
+        for compress in (False, True):
+            sample = plan_codec.encode(plans[0], compress=compress, codec=codec)
+            name = f"plan_codec {'msgpack' if codec == 'm' else 'json'}+{COMPRESSION_NAMES[chr(sample[plan_codec.HEADER_SIZE - 1])]}"
+            formats.append((name, lambda plan, c=codec, z=compress: plan_codec.encode(plan, compress=z, codec=c),
+                            plan_codec.decode))
+
+    results = []
+    for name, encode, decode in formats:
+        encoded = [encode(plan) for plan in plans]
+        results.append({
+            'format': name,
+            'bytes': sum(len(payload) for payload in encoded) / len(encoded),
+            'encode_us': time_per_call(encode, plans, rounds),
+            'decode_us': time_per_call(decode, encoded, rounds),
+        })
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark plan_codec against JSON plan storage")
+    parser.add_argument('plans', nargs='?', help="Plan .json file or batch_planner .jsonl output (default: synthetic plan)")
+    parser.add_argument('-n', '--rounds', type=int, default=200, help="Encode/decode rounds per plan (default: 200)")
+    args = parser.parse_args(argv)
+
+    plans = read_plans(args.plans) if args.plans else [synthetic_plan()]
+    if not plans:
+        print("No plans found in input", file=sys.stderr)
+        return 1
+
+    results = benchmark(plans, args.rounds)
+    baseline = results[0]['bytes']
+    print(f"{len(plans)} plan(s), {args.rounds} rounds (msgpack {'on' if plan_codec.msgpack else 'not installed'}, "
+          f"zstd {'on' if plan_codec.zstandard else 'not installed'})")
+    print(f"{'format':<28}{'bytes':>10}{'vs json':>10}{'encode µs':>12}{'decode µs':>12}")
+    for result in results:
+        print(f"{result['format']:<28}{result['bytes']:>10.0f}{result['bytes'] / baseline:>10.0%}"
+              f"{result['encode_us']:>12.1f}{result['decode_us']:>12.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+City autocomplete for AI Travel Planner
+Typo-tolerant suggestions for the departure and destination pickers: a trigram index over every
+gazetteer city (with its country, airport names and codes) narrows candidates, and a prefix-aware
+edit distance with a per-length typo budget ranks them. Trigram postings are NumPy arrays, so counting
+overlaps stays fast with the full world gazetteer (about 6,700 cities).
+"""
+
+import threading
+from collections import defaultdict
+import numpy as np
+from airports import airports, normalize
+
+# Candidates kept from the trigram pass for edit-distance ranking
+CANDIDATE_POOL = 60
+
+def trigrams(text, closed=True):
+    """Trigrams of a normalized term; queries are left open at the end so partial words match"""
+    padded = f"  {text} " if closed else f"  {text}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def typo_budget(query):
+    """Edits tolerated for a query of this length"""
+    return 0 if len(query) < 4 else 1 if len(query) < 8 else 2
+
+def prefix_distance(query, term, limit):
+    """
+    Edit distance between query and the closest prefix of term, or limit + 1 once it is exceeded
+
+    Args:
+        query (str): Normalized query
+        term (str): Normalized candidate term
+        limit (int): Largest distance of interest (rows stop early past it)
+    """
+    term = term[:len(query) + limit]  # longer prefixes are more than limit edits away
+    previous = list(range(len(term) + 1))
+    for i, query_char in enumerate(query, 1):
+        current = [i]
+        for j, term_char in enumerate(term, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (query_char != term_char)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous)
+
+class CityAutocomplete:
+    """
+    Trigram index of (label, term) pairs
+
+    Every label ("Cape Town, South Africa") is indexed under several terms: the label itself, the bare
+    city, each word start within it, and its airports' names and codes. Terms the label starts with rank
+    ahead of the others, so "lon" suggests London before East London.
+    """
+
+    def __init__(self, entries_fn):
+        self.entries_fn = entries_fn
+        self.lock = threading.Lock()
+        self.terms = None
+
+    def _build(self):
+        if self.terms is not None:
+            return
+        with self.lock:
+            if self.terms is not None:
+                return
+            labels, terms, postings = [], [], defaultdict(list)
+            for label, label_terms in self.entries_fn():
+                label_index = len(labels)
+                labels.append(label)
+                normalized_label = normalize(label)
+                for term in dict.fromkeys(normalize(term) for term in label_terms if term):
+                    for gram in trigrams(term):
+                        postings[gram].append(len(terms))
+                    terms.append((term, label_index, not normalized_label.startswith(term)))
+            self.labels = labels
+            self.postings = {gram: np.array(term_indexes, dtype=np.int32) for gram, term_indexes in postings.items()}
+            self.terms = terms
+
+    def suggest(self, query, limit=10):
+        """
+        Labels best matching a partly typed, possibly misspelt query
+
+        Args:
+            query (str): Text typed so far ("cpe tow", "jnb", "heathrow")
+            limit (int): Maximum suggestions
+
+        Returns:
+            list: Labels, best match first (exact prefixes before typo matches, label starts before inner words)
+        """
+        self._build()
+        query = normalize(query)
+        if not query:
+            return []
+
+        postings = [self.postings[gram] for gram in trigrams(query, closed=False) if gram in self.postings]
+        if not postings:
+            return []
+        overlap = np.bincount(np.concatenate(postings), minlength=len(self.terms))
+        # Most shared trigrams first, earlier (featured) terms first among equals
+        score = overlap.astype(np.int64) * len(self.terms) - np.arange(len(self.terms))
+        pool = np.flatnonzero(overlap)
+        if len(pool) > CANDIDATE_POOL:
+            pool = np.argpartition(-score, CANDIDATE_POOL)[:CANDIDATE_POOL]
+        pool = pool[np.argsort(-score[pool])].tolist()
+
+        budget = typo_budget(query)
+        best = {}
+        for term_index in pool:
+            term, label_index, inner = self.terms[term_index]
+            distance = 0 if term.startswith(query) else prefix_distance(query, term, budget)
+            if distance > budget:
+                continue
+            rank = (distance, inner, -overlap[term_index], label_index)
+            if label_index not in best or rank < best[label_index]:
+                best[label_index] = rank
+        return [self.labels[label_index] for label_index in sorted(best, key=best.get)[:limit]]
+
+def gazetteer_entries():
+    """(label, terms) for every city in the airport gazetteer"""
+    cities = {}
+    for airport in airports.all():
+        words = airport.city_country.split()
+        terms = cities.setdefault(airport.city_country, [' '.join(words[i:]) for i in range(len(words))])
+        terms.extend([airport.city, airport.name, airport.iata])
+    return cities.items()
+
+# Shared index, built on first suggestion
+city_autocomplete = CityAutocomplete(gazetteer_entries)
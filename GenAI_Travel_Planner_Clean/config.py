@@ -50,6 +50,96 @@ class Config:
     # Get your free API key from: https://rapidapi.com/emir12/api/kiwi-com-cheap-flights/
     RAPIDAPI_KEY = get_api_key("RAPIDAPI_KEY")
     
+    # Plan generation service (Optional)
+    # When set, the Streamlit app submits plans to this plan_api URL instead of running them in-process
+    PLAN_API_URL = get_api_key("PLAN_API_URL")
+    PLAN_WORKERS = int(get_api_key("PLAN_WORKERS") or 4)
+    # SQLite file where in-process plan jobs persist progress and finished stages
+    PLAN_JOB_DB = get_api_key("PLAN_JOB_DB") or "user_data/plan_jobs.db"
+    
+    # Provider rate limits shared by all sessions and worker processes on this host
+    # Override per provider with e.g. GOOGLE_PLACES_QPS=5 or GEMINI_DAILY_QUOTA=1000 (0 = no daily ceiling)
+    RATE_LIMIT_DB = get_api_key("RATE_LIMIT_DB") or "user_data/rate_limits.db"
+    RATE_LIMIT_TIMEOUT = float(get_api_key("RATE_LIMIT_TIMEOUT") or 30)
+    PROVIDER_LIMITS = {
+        provider: {
+            'qps': float(get_api_key(f"{provider.upper()}_QPS") or qps),
+            'daily_quota': int(get_api_key(f"{provider.upper()}_DAILY_QUOTA") or daily_quota),
+        }
+        for provider, qps, daily_quota in [
+            ('google_places', 10, 0),
+            ('serpapi', 2, 0),
+            ('gemini', 0.25, 1500),
+            ('amadeus', 10, 0),
+        ]
+    }
+    
+    # Provider lookup cache: an in-memory LRU per process over this SQLite file (warmed nightly by prefetch_destinations.py)
+    FETCH_CACHE_DB = get_api_key("FETCH_CACHE_DB") or "user_data/fetch_cache.db"
+    CACHE_MEMORY_ENTRIES = int(get_api_key("CACHE_MEMORY_ENTRIES") or 2000)
+    # TTL in seconds per data type (fares: the shared fare cache); override with e.g. FARES_CACHE_TTL=300
+    CACHE_TTLS = {
+        data_type: float(get_api_key(f"{data_type.upper()}_CACHE_TTL") or ttl)
+        for data_type, ttl in [
+            ('fares', 10 * 60),
+            ('events', 6 * 3600),
+            ('places', 7 * 24 * 3600),
+            ('local_info', 30 * 24 * 3600),
+            ('geocode', 90 * 24 * 3600),
+            ('default', 3600),
+        ]
+    }
+    # Seconds past its TTL an entry is still served while it refreshes in the background (0 = refetch synchronously)
+    # Override with e.g. PLACES_CACHE_MAX_STALE=86400
+    CACHE_MAX_STALE = {
+        data_type: float(get_api_key(f"{data_type.upper()}_CACHE_MAX_STALE") or max_stale)
+        for data_type, max_stale in [
+            ('places', 14 * 24 * 3600),
+            ('local_info', 30 * 24 * 3600),
+            ('events', 12 * 3600),
+        ]
+    }
+    
+    # Per-session memory: session state is capped and plan payloads above SESSION_OFFLOAD_KB move to this SQLite file
+    SESSION_MEMORY_CAP_KB = int(get_api_key("SESSION_MEMORY_CAP_KB") or 256)
+    SESSION_OFFLOAD_KB = int(get_api_key("SESSION_OFFLOAD_KB") or 16)
+    SESSION_PAYLOAD_DB = get_api_key("SESSION_PAYLOAD_DB") or "user_data/session_payloads.db"
+    
+    # Flight search: fares are requested in one currency so offers from different providers compare directly.
+    # The aggregator returns once FLIGHT_GOOD_ENOUGH_OFFERS live offers are in, and hedges a provider call that
+    # runs past its FLIGHT_HEDGE_PERCENTILE latency (FLIGHT_HEDGE_AFTER seconds until enough samples exist)
+    FARE_CURRENCY = get_api_key("FARE_CURRENCY") or "ZAR"
+    # Prices are converted to DISPLAY_CURRENCY before offers are ranked, merged or shown, using the offline rate
+    # table in FX_RATES_FILE (import one with `python currency.py import rates.csv`; the bundled table is used until then)
+    DISPLAY_CURRENCY = get_api_key("DISPLAY_CURRENCY") or FARE_CURRENCY
+    FX_RATES_FILE = get_api_key("FX_RATES_FILE") or "user_data/fx_rates.json"
+    # Amadeus searches request up to AMADEUS_MAX_OFFERS offers and keep the best AMADEUS_KEEP_OFFERS per departure window
+    AMADEUS_MAX_OFFERS = int(get_api_key("AMADEUS_MAX_OFFERS") or 250)
+    AMADEUS_KEEP_OFFERS = int(get_api_key("AMADEUS_KEEP_OFFERS") or 10)
+    # Multi-city trips visit at most MULTI_CITY_MAX_DESTINATIONS cities; ordering them prices every pair of cities
+    # with a small AMADEUS_LEG_MAX_OFFERS search, since only the cheapest fare and shortest flight are used
+    MULTI_CITY_MAX_DESTINATIONS = int(get_api_key("MULTI_CITY_MAX_DESTINATIONS") or 8)
+    AMADEUS_LEG_MAX_OFFERS = int(get_api_key("AMADEUS_LEG_MAX_OFFERS") or 20)
+    # Amadeus API host ('production' or 'test'); every worker on the host shares one OAuth token through
+    # AMADEUS_TOKEN_DB, renewed AMADEUS_TOKEN_REFRESH_AHEAD seconds before expiry, over AMADEUS_POOL_SIZE pooled connections
+    AMADEUS_HOSTNAME = get_api_key("AMADEUS_HOSTNAME") or "production"
+    AMADEUS_TOKEN_DB = get_api_key("AMADEUS_TOKEN_DB") or "user_data/amadeus_tokens.db"
+    AMADEUS_TOKEN_REFRESH_AHEAD = float(get_api_key("AMADEUS_TOKEN_REFRESH_AHEAD") or 120)
+    AMADEUS_POOL_SIZE = int(get_api_key("AMADEUS_POOL_SIZE") or 16)
+    FLIGHT_GOOD_ENOUGH_OFFERS = int(get_api_key("FLIGHT_GOOD_ENOUGH_OFFERS") or 5)
+    FLIGHT_SEARCH_TIMEOUT = float(get_api_key("FLIGHT_SEARCH_TIMEOUT") or 12)
+    FLIGHT_HEDGE_PERCENTILE = float(get_api_key("FLIGHT_HEDGE_PERCENTILE") or 90)
+    FLIGHT_HEDGE_AFTER = float(get_api_key("FLIGHT_HEDGE_AFTER") or 4)
+    # Fare and leg matrix cells run on their own FLIGHT_MATRIX_WORKERS threads, with at most FLIGHT_MATRIX_MAX_CELLS
+    # cells queued or running across every matrix in the process (the rest wait for a slot until the matrix times out)
+    FLIGHT_MATRIX_WORKERS = int(get_api_key("FLIGHT_MATRIX_WORKERS") or 4)
+    FLIGHT_MATRIX_MAX_CELLS = int(get_api_key("FLIGHT_MATRIX_MAX_CELLS") or 24)
+    # Fare searches are shared across processes and hosts through this store (entries live FARES_CACHE_TTL seconds):
+    # a SQLite path or a redis:// URL (see fare_cache.py for which deployments need Redis). FARE_CACHE_DB is the
+    # SQLite file used by default and when FARE_CACHE_URL is a Redis URL but the redis package is missing
+    FARE_CACHE_DB = get_api_key("FARE_CACHE_DB") or "user_data/fare_cache.db"
+    FARE_CACHE_URL = get_api_key("FARE_CACHE_URL") or FARE_CACHE_DB
+    
     @classmethod
     def validate_required_keys(cls):
         """
@@ -0,0 +1,30 @@
+"""
+Test setup for AI Travel Planner
+Points every shared store at a temporary directory and supplies placeholder API keys before config is
+imported, so tests never touch user_data/ or call a real provider.
+"""
+
+import os
+import sys
+import tempfile
+
+_data_dir = tempfile.mkdtemp(prefix="travel-planner-tests-")
+
+for _name, _value in {
+    'GOOGLE_API_KEY': "AIza-test",
+    'GOOGLE_PLACES_API_KEY': "AIza-test",
+    'AMADEUS_CLIENT_ID': "test-client",
+    'AMADEUS_CLIENT_SECRET': "test-secret",
+    'SERPAPI_KEY': "test-serpapi",
+    'PLAN_JOB_DB': os.path.join(_data_dir, "plan_jobs.db"),
+    'RATE_LIMIT_DB': os.path.join(_data_dir, "rate_limits.db"),
+    'FETCH_CACHE_DB': os.path.join(_data_dir, "fetch_cache.db"),
+    'SESSION_PAYLOAD_DB': os.path.join(_data_dir, "session_payloads.db"),
+    'FX_RATES_FILE': os.path.join(_data_dir, "fx_rates.json"),
+    'AMADEUS_TOKEN_DB': os.path.join(_data_dir, "amadeus_tokens.db"),
+    'FARE_CACHE_DB': os.path.join(_data_dir, "fare_cache.db"),
+}.items():
+    os.environ[_name] = _value
+os.environ.pop('PLAN_API_URL', None)
+
+sys.path.insert(0, os.path.dirname(__file__))
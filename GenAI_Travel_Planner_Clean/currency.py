@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Currency conversion for AI Travel Planner
+Offline FX rate table (the bundled data/fx_rates.json, replaced by FX_RATES_FILE once a newer table is
+imported) and vectorized conversion of prices to the display currency, so offers priced in different
+currencies rank, merge and compare on one scale.
+
+Usage:
+    python currency.py import rates.csv     # "currency,rate" rows (units per 1 base currency) or a JSON table
+    python currency.py show
+"""
+
+import csv
+import dataclasses
+import json
+import os
+import re
+import sys
+import threading
+import time
+from datetime import date
+from pathlib import Path
+import numpy as np
+from config import config
+
+DATA_PATH = Path(__file__).parent / "data" / "fx_rates.json"
+
+# Currency implied by a price string's leading symbol when it has no ISO code, longest symbols first; rand
+# needs "R " with a space so "Rs 4,500", "RM 90" and "R$ 300" are not read as rand
+SYMBOLS = {'R$': 'BRL', 'Rs': 'INR', 'RM': 'MYR', 'R ': 'ZAR', '$': 'USD', '€': 'EUR', '£': 'GBP', '₹': 'INR', '¥': 'JPY'}
+_CODE = re.compile(r'\b([A-Z]{3})\b')
+
+class FxTable:
+    """
+    Rates as units of each currency per one unit of the base currency
+
+    The imported table (override_path) wins over the bundled one and is reloaded when its file changes,
+    checked at most every check_seconds.
+    """
+
+    def __init__(self, bundled_path, override_path, check_seconds=60):
+        self.bundled_path = Path(bundled_path)
+        self.override_path = Path(override_path)
+        self.check_seconds = check_seconds
+        self.lock = threading.Lock()
+        self.table = None
+        self.loaded_mtime = None
+        self.checked_at = 0.0
+        self.warned = set()
+
+    def _current(self):
+        now = time.time()
+        if self.table is not None and now - self.checked_at < self.check_seconds:
+            return self.table
+        with self.lock:
+            self.checked_at = now
+            path = self.override_path if self.override_path.exists() else self.bundled_path
+            mtime = (str(path), path.stat().st_mtime)
+            if self.table is None or mtime != self.loaded_mtime:
+                with open(path, 'r', encoding='utf-8') as file:
+                    table = json.load(file)
+                table['rates'] = {code.upper(): float(rate) for code, rate in table['rates'].items()}
+                table['path'] = str(path)
+                self.table, self.loaded_mtime = table, mtime
+            return self.table
+
+    def rate(self, from_currency, to_currency):
+        """Units of to_currency per unit of from_currency; NaN if either currency is not in the table"""
+        if from_currency == to_currency:
+            return 1.0
+        rates = self._current()['rates']
+        for code in (from_currency, to_currency):
+            if code not in rates and code not in self.warned:
+                self.warned.add(code)
+                print(f"💱 No FX rate for {code}; its prices cannot be converted")
+        if from_currency not in rates or to_currency not in rates:
+            return float('nan')
+        return rates[to_currency] / rates[from_currency]
+
+    def convert(self, amounts, currencies, to_currency):
+        """
+        Convert many amounts at once
+
+        Args:
+            amounts (sequence): Numeric amounts (NaN for missing)
+            currencies (sequence): ISO code per amount
+            to_currency (str): Target ISO code
+
+        Returns:
+            numpy.ndarray: Converted amounts (NaN where a rate is missing)
+        """
+        amounts = np.asarray(amounts, dtype=float)
+        if not len(amounts):
+            return amounts
+        codes, inverse = np.unique(np.asarray(currencies, dtype=str), return_inverse=True)
+        factors = np.array([self.rate(code, to_currency) for code in codes])
+        return amounts * factors[inverse]
+
+    def info(self):
+        """base, as_of, source, path and the number of currencies in the current table"""
+        table = self._current()
+        return {'base': table['base'], 'as_of': table.get('as_of'), 'source': table.get('source', ''),
+                'path': table['path'], 'currencies': len(table['rates'])}
+
+# Shared rate table
+fx = FxTable(DATA_PATH, config.FX_RATES_FILE)
+
+def offer_currency(offer, default=None):
+    """
+    ISO currency of an offer: its currency field, its price dict's currency, or the code or symbol in
+    its price text ("ZAR 1500", "$850", "R 1500"); default (FARE_CURRENCY) when none is given
+    """
+    currency = offer.get('currency')
+    price = offer.get('price')
+    if not currency and isinstance(price, dict):
+        currency = price.get('currency')
+    if not currency and price:
+        text = str(price).strip()
+        match = _CODE.search(text)
+        currency = match.group(1) if match else next((code for symbol, code in SYMBOLS.items() if text.startswith(symbol)), None)
+    return (currency or default or config.FARE_CURRENCY).upper()
+
+def format_price(amount, currency):
+    return f"{currency} {amount:,.2f}"
+
+def normalize_offers(offers, currency=None):
+    """
+    FlightOffer records re-priced in one currency
+
+    Args:
+        offers (list): FlightOffer records
+        currency (str): Target currency (default DISPLAY_CURRENCY)
+
+    Returns:
+        list: Records in the same order; offers already in currency are returned as they are, offers
+            whose currency has no rate keep their price text but lose their amount
+    """
+    currency = currency or config.DISPLAY_CURRENCY
+    amounts = [np.nan if offer.amount is None else offer.amount for offer in offers]
+    converted = fx.convert(amounts, [offer_currency(offer) for offer in offers], currency)
+    normalized = []
+    for offer, amount in zip(offers, converted):
+        if offer.currency == currency or offer.amount is None:
+            normalized.append(offer)
+        elif np.isnan(amount):
+            normalized.append(dataclasses.replace(offer, amount=None))
+        else:
+            amount = round(float(amount), 2)
+            normalized.append(dataclasses.replace(offer, amount=amount, currency=currency, price=format_price(amount, currency)))
+    return normalized
+
+def read_rates(path):
+    """Rate table from JSON ({"base", "rates", ...}) or CSV rows of currency,rate (base = the currency with rate 1)"""
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        if path.lower().endswith('.json'):
+            table = json.load(file)
+        else:
+            rows = [row for row in csv.reader(file) if row and not row[0].startswith('#')]
+            if rows and rows[0][0].strip().lower() in ('currency', 'code'):
+                rows = rows[1:]
+            rates = {code.strip().upper(): float(rate) for code, rate, *_ in rows}
+            table = {'base': next((code for code, rate in rates.items() if rate == 1.0), None), 'rates': rates}
+    table['rates'] = {code.upper(): float(rate) for code, rate in table.get('rates', {}).items()}
+    if not table.get('base') or table['rates'].get(table['base']) != 1.0:
+        raise ValueError("Rate table needs a base currency with rate 1")
+    if any(not rate > 0 for rate in table['rates'].values()):
+        raise ValueError("Rates must be positive")
+    table.setdefault('as_of', date.today().isoformat())
+    table.setdefault('source', f"Imported from {os.path.basename(path)}")
+    return table
+
+def import_rates(path, target=None):
+    """Validate a rate table and install it as FX_RATES_FILE (atomically, so running apps never read half a file)"""
+    table = read_rates(path)
+    target = Path(target or config.FX_RATES_FILE)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temporary = target.with_suffix('.tmp')
+    with open(temporary, 'w', encoding='utf-8') as file:
+        json.dump(table, file, indent=2)
+    os.replace(temporary, target)
+    return table
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) == 2 and argv[0] == 'import':
+        table = import_rates(argv[1])
+        print(f"✅ Imported {len(table['rates'])} rates (base {table['base']}, as of {table['as_of']}) to {config.FX_RATES_FILE}")
+        return 0
+    if argv == ['show']:
+        info = fx.info()
+        print(f"{info['path']}: {info['currencies']} currencies, base {info['base']}, as of {info['as_of']}")
+        for code, rate in sorted(fx._current()['rates'].items()):
+            print(f"{code} {rate:g}")
+        return 0
+    print(__doc__.split("Usage:")[1], file=sys.stderr)
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,11 +7,34 @@ import os
 import streamlit as st
 from datetime import datetime
 import json
+import base64
 from dotenv import load_dotenv
+import plan_codec
 
 # Load environment variables
 load_dotenv()
 
+# Trip fields kept queryable in travel_plans.plan_data; the full plan lives in plan_snapshot
+PLAN_SUMMARY_FIELDS = (
+    'source', 'destination', 'departure_date', 'return_date', 'travel_theme',
+    'num_travelers', 'budget', 'flight_class', 'trip_duration',
+)
+
+def encode_bytea(data):
+    """
+    BYTEA value for the Supabase REST API, which carries bytes as Postgres hex text ("\\x...");
+    the column itself stores the raw bytes
+    """
+    return '\\x' + data.hex()
+
+def decode_bytea(value):
+    """Bytes from a BYTEA value as returned by the REST API (snapshots saved before the BYTEA migration are base64)"""
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    if value.startswith('\\x'):
+        return bytes.fromhex(value[2:])
+    return base64.b64decode(value)
+
 class TravelPlannerDB:
     def __init__(self):
         """Initialize Supabase connection"""
@@ -76,7 +99,12 @@ class TravelPlannerDB:
             return False
     
     def save_travel_plan(self, email, destination, plan_data):
-        """Save generated travel plan"""
+        """
+        Save generated travel plan
+
+        The full plan is stored as a compact plan_codec snapshot in a BYTEA column;
+        plan_data keeps only the queryable trip fields.
+        """
         if not self.connected:
             return False
         
@@ -84,7 +112,10 @@ class TravelPlannerDB:
             data = {
                 'user_email': email,
                 'destination': destination,
-                'plan_data': plan_data,
+                'plan_data': json.loads(json.dumps(
+                    {key: plan_data.get(key) for key in PLAN_SUMMARY_FIELDS if key in plan_data}, default=str
+                )),
+                'plan_snapshot': encode_bytea(plan_codec.encode(plan_data)),
                 'created_at': datetime.now().isoformat()
             }
             
@@ -95,6 +126,12 @@ class TravelPlannerDB:
             print(f"Travel plan save error: {e}")
             return False
     
+    def load_travel_plan(self, plan_row):
+        """Full plan from a travel_plans row (older rows only have plan_data)"""
+        if plan_row.get('plan_snapshot'):
+            return plan_codec.decode(decode_bytea(plan_row['plan_snapshot']))
+        return plan_row.get('plan_data')
+    
     def get_analytics_data(self, days=30):
         """Get analytics data for dashboard"""
         if not self.connected:
@@ -158,9 +195,20 @@ CREATE TABLE IF NOT EXISTS travel_plans (
     user_email VARCHAR NOT NULL,
     destination VARCHAR NOT NULL,
     plan_data JSONB NOT NULL,
+    plan_snapshot BYTEA,
     created_at TIMESTAMP DEFAULT NOW()
 );
 
+-- Existing installs: add the compact plan snapshot column, converting base64 text snapshots to bytes
+ALTER TABLE travel_plans ADD COLUMN IF NOT EXISTS plan_snapshot BYTEA;
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM information_schema.columns
+               WHERE table_name = 'travel_plans' AND column_name = 'plan_snapshot' AND data_type = 'text') THEN
+        ALTER TABLE travel_plans ALTER COLUMN plan_snapshot TYPE BYTEA USING decode(plan_snapshot, 'base64');
+    END IF;
+END $$;
+
 -- Users table (for future authentication)
 CREATE TABLE IF NOT EXISTS users (
     id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
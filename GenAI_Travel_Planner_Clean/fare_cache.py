@@ -0,0 +1,222 @@
+"""
+Fare cache for AI Travel Planner
+Fare searches shared by every process and host, keyed on provider, route, dates, travelers and cabin.
+Stored in a SQLite file by default, shared by the processes of one host, or in Redis when FARE_CACHE_URL is a
+redis:// URL, which multi-host deployments must use: SQLite locking is not reliable on network file systems
+(NFS/SMB) and a shared file can be corrupted. Entries expire with the fares TTL and can be invalidated a whole
+route at a time.
+"""
+
+import functools
+import inspect
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from config import config
+import plan_codec
+from fetch_cache import is_cacheable
+
+class SQLiteFareStore:
+    """Fare entries in a SQLite file, indexed by route"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS fares (
+                    key TEXT PRIMARY KEY,
+                    route TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS fares_route ON fares (route)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key):
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM fares WHERE key = ? AND expires_at > ?", (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, route, value, ttl):
+        with self.lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO fares (key, route, value, expires_at) VALUES (?, ?, ?, ?)",
+                         (key, route, value, time.time() + ttl))
+
+    def invalidate_route(self, route):
+        with self.lock, self._connect() as conn:
+            return conn.execute("DELETE FROM fares WHERE route = ?", (route,)).rowcount
+
+    def purge_expired(self):
+        with self.lock, self._connect() as conn:
+            return conn.execute("DELETE FROM fares WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def sizes(self):
+        """(entries, bytes)"""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM fares").fetchone()
+
+class RedisFareStore:
+    """
+    Fare entries in Redis with native expiry; a set per route lists its keys for invalidation
+
+    Entry and byte counts for the admin metrics are kept alongside (an expiry index and a size per key),
+    so reading them never scans the keyspace. Concurrent rewrites of one key can skew the byte count slightly.
+    """
+
+    def __init__(self, url, prefix="fares"):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.expiry_key = f"{prefix}-expiry"   # sorted set: key -> expires_at
+        self.sizes_key = f"{prefix}-sizes"     # hash: key -> stored bytes
+        self.bytes_key = f"{prefix}-bytes"     # counter: sum of sizes
+
+    def get(self, key):
+        return self.client.get(f"{self.prefix}:{key}")
+
+    def set(self, key, route, value, ttl):
+        route_key = f"{self.prefix}-route:{route}"
+        previous = self.client.hget(self.sizes_key, key)
+        pipe = self.client.pipeline()
+        pipe.set(f"{self.prefix}:{key}", value, ex=int(ttl))
+        pipe.sadd(route_key, key)
+        pipe.expire(route_key, int(ttl))
+        pipe.zadd(self.expiry_key, {key: time.time() + ttl})
+        pipe.hset(self.sizes_key, key, len(value))
+        pipe.incrby(self.bytes_key, len(value) - int(previous or 0))
+        pipe.execute()
+
+    def _forget(self, keys):
+        """Drop keys from the expiry index and byte count"""
+        if not keys:
+            return
+        sizes = self.client.hmget(self.sizes_key, keys)
+        pipe = self.client.pipeline()
+        pipe.zrem(self.expiry_key, *keys)
+        pipe.hdel(self.sizes_key, *keys)
+        pipe.decrby(self.bytes_key, sum(int(size) for size in sizes if size is not None))
+        pipe.execute()
+
+    def invalidate_route(self, route):
+        route_key = f"{self.prefix}-route:{route}"
+        keys = [key.decode() for key in self.client.smembers(route_key)]
+        removed = self.client.delete(*[f"{self.prefix}:{key}" for key in keys]) if keys else 0
+        self.client.delete(route_key)
+        self._forget(keys)
+        return removed
+
+    def purge_expired(self):
+        """Redis expires the entries itself; this drops them from the counts"""
+        expired = [key.decode() for key in self.client.zrangebyscore(self.expiry_key, '-inf', time.time())]
+        self._forget(expired)
+        return len(expired)
+
+    def sizes(self):
+        self.purge_expired()
+        return self.client.zcard(self.expiry_key), int(self.client.get(self.bytes_key) or 0)
+
+def open_store(url):
+    """Redis store for redis:// URLs (when the redis package is installed), SQLite file otherwise"""
+    if url.startswith(("redis://", "rediss://")):
+        try:
+            return RedisFareStore(url)
+        except ImportError:
+            print("⚠️ FARE_CACHE_URL is a Redis URL but the redis package is not installed (pip install redis); "
+                  "using a local SQLite fare cache")
+            url = config.FARE_CACHE_DB
+    return SQLiteFareStore(url.removeprefix("sqlite:///"))
+
+class FareCache:
+    """Fare lookups over a shared store, with hit/miss counts for this process"""
+
+    def __init__(self, store, ttl):
+        self.store = store
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'invalidated': 0}
+
+    @staticmethod
+    def route(origin, destination):
+        return f"{str(origin).upper()}-{str(destination).upper()}"
+
+    def get(self, key):
+        """(found, value) for an unexpired entry"""
+        data = self.store.get(key)
+        with self.lock:
+            self.stats['hits' if data is not None else 'misses'] += 1
+        return (True, plan_codec.decode(data)) if data is not None else (False, None)
+
+    def set(self, key, route, value):
+        self.store.set(key, route, plan_codec.encode(value), self.ttl)
+
+    def invalidate_route(self, origin, destination):
+        """Drop every cached fare for one direction of a route; returns how many entries were removed"""
+        removed = self.store.invalidate_route(self.route(origin, destination))
+        with self.lock:
+            self.stats['invalidated'] += removed
+        return removed
+
+    def purge_expired(self):
+        return self.store.purge_expired()
+
+    def get_metrics(self):
+        """hits, misses, invalidated, hit_ratio, entries, bytes, ttl_seconds and backend"""
+        with self.lock:
+            metrics = dict(self.stats)
+        lookups = metrics['hits'] + metrics['misses']
+        metrics['hit_ratio'] = metrics['hits'] / lookups if lookups else None
+        metrics['entries'], metrics['bytes'] = self.store.sizes()
+        metrics['ttl_seconds'] = self.ttl
+        metrics['backend'] = type(self.store).__name__
+        return metrics
+
+# Shared fare cache for every process using the same FARE_CACHE_URL
+fare_cache = FareCache(open_store(config.FARE_CACHE_URL), config.CACHE_TTLS['fares'])
+
+def fare_key(provider, fn, args, kwargs):
+    """
+    Route and key for a fare search call
+
+    The fetcher's first four parameters are origin, destination, departure and return date; adults and
+    travel_class fill the traveler and cabin parts, and any other parameters are appended.
+    """
+    bound = inspect.signature(fn).bind(*args, **kwargs)
+    bound.apply_defaults()
+    values = list(bound.arguments.items())
+    origin, destination, departure_date, return_date = (value for _, value in values[:4])
+    extras = {name: value for name, value in values[4:]}
+    route = FareCache.route(origin, destination)
+    parts = [provider, route, str(departure_date), str(return_date), str(extras.pop('adults', 1)),
+             str(extras.pop('travel_class', 'economy')).lower()]
+    parts.extend(f"{name}={value}" for name, value in extras.items())
+    return route, "|".join(parts)
+
+def fare_cached(provider):
+    """
+    Decorator serving a fare fetcher from the shared fare cache before calling the provider
+
+    The wrapped function also gets cache_key(*args, **kwargs) and is_cached(*args, **kwargs).
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            route, key = fare_key(provider, fn, args, kwargs)
+            found, value = fare_cache.get(key)
+            if found:
+                return value
+            value = fn(*args, **kwargs)
+            if is_cacheable(value):
+                fare_cache.set(key, route, value)
+            return value
+
+        wrapper.cache_key = lambda *args, **kwargs: fare_key(provider, fn, args, kwargs)[1]
+        wrapper.is_cached = lambda *args, **kwargs: fare_cache.store.get(wrapper.cache_key(*args, **kwargs)) is not None
+        return wrapper
+
+    return decorator
@@ -0,0 +1,312 @@
+"""
+Fetch cache for AI Travel Planner
+Two-tier cache of provider lookups (fares, geocodes, Places, SerpAPI): an in-process LRU over a
+SQLite file shared by the Streamlit app, plan workers, the batch CLI and the nightly prefetch job.
+Data types with a max staleness are served stale while a background refresh replaces them.
+"""
+
+import functools
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from config import config
+import plan_codec
+from single_flight import canonical_key
+
+class MemoryCache:
+    """Least-recently-used in-process tier holding encoded entries (see plan_codec)"""
+
+    def __init__(self, max_entries=2000):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (data_type, serialized value, expires_at)
+
+    def get(self, key, max_stale=0):
+        """Serialized value and expiry of an entry expired no more than max_stale seconds ago, or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] + max_stale <= time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1], entry[2]
+
+    def set(self, key, data_type, serialized, expires_at):
+        with self.lock:
+            self.entries[key] = (data_type, serialized, expires_at)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def sizes(self):
+        """data_type -> (entries, bytes)"""
+        sizes = {}
+        with self.lock:
+            for data_type, serialized, expires_at in self.entries.values():
+                entries, size = sizes.get(data_type, (0, 0))
+                sizes[data_type] = (entries + 1, size + len(serialized))
+        return sizes
+
+class DiskCache:
+    """SQLite tier shared by every process on the host"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    data_type TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key, max_stale=0):
+        """Serialized value and expiry of an entry expired no more than max_stale seconds ago, or None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] + max_stale <= time.time():
+            return None
+        return row[0], row[1]
+
+    def set(self, key, data_type, serialized, expires_at):
+        with self.lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, data_type, value, expires_at) VALUES (?, ?, ?, ?)",
+                (key, data_type, serialized, expires_at)
+            )
+
+    def expires_at(self, key):
+        with self._connect() as conn:
+            row = conn.execute("SELECT expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0.0
+
+    def sizes(self):
+        """data_type -> (entries, bytes)"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT data_type, COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM entries GROUP BY data_type"
+            ).fetchall()
+        return {data_type: (entries, size) for data_type, entries, size in rows}
+
+    def purge_expired(self, max_stale=None):
+        """
+        Delete entries that can no longer be served and return how many were removed
+
+        Args:
+            max_stale (dict): data_type -> seconds an expired entry may still be served
+        """
+        max_stale = max_stale or {}
+        now = time.time()
+        removed = 0
+        with self.lock, self._connect() as conn:
+            for data_type, seconds in max_stale.items():
+                removed += conn.execute("DELETE FROM entries WHERE data_type = ? AND expires_at <= ?",
+                                        (data_type, now - seconds)).rowcount
+            placeholders = ", ".join("?" * len(max_stale))
+            removed += conn.execute(f"DELETE FROM entries WHERE expires_at <= ? AND data_type NOT IN ({placeholders})",
+                                    (now, *max_stale)).rowcount
+        return removed
+
+class TieredCache:
+    """
+    Memory LRU over the disk cache with per-data-type TTLs.
+
+    Reads check memory first, then disk (promoting disk hits into memory); writes go to both tiers.
+    Data types with a max staleness keep expired entries servable for that long after expiry.
+    """
+
+    def __init__(self, memory, disk, ttls, max_stale=None):
+        self.memory = memory
+        self.disk = disk
+        self.ttls = ttls
+        self.max_stale = max_stale or {}
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def _count(self, data_type, outcome):
+        with self.lock:
+            stats = self.stats.setdefault(data_type, {
+                'memory_hits': 0, 'disk_hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0,
+            })
+            stats[outcome] += 1
+
+    def ttl_for(self, data_type):
+        return self.ttls.get(data_type, self.ttls['default'])
+
+    def max_stale_for(self, data_type):
+        return self.max_stale.get(data_type, 0)
+
+    def lookup(self, key, data_type):
+        """
+        Look up an entry, including one past its TTL but within the data type's max staleness
+
+        Returns:
+            tuple: (found, value, fresh)
+        """
+        max_stale = self.max_stale_for(data_type)
+        entry = self.memory.get(key, max_stale)
+        tier = 'memory_hits'
+        if entry is None or entry[1] <= time.time():
+            # Another process may already have refreshed a stale entry on disk
+            disk_entry = self.disk.get(key, max_stale)
+            if disk_entry is not None and (entry is None or disk_entry[1] > entry[1]):
+                entry = disk_entry
+                tier = 'disk_hits'
+                self.memory.set(key, data_type, *entry)
+        if entry is None:
+            self._count(data_type, 'misses')
+            return False, None, False
+
+        fresh = entry[1] > time.time()
+        self._count(data_type, tier if fresh else 'stale_hits')
+        return True, plan_codec.decode(entry[0]), fresh
+
+    def get(self, key, data_type):
+        """
+        Look up a fresh entry
+
+        Returns:
+            tuple: (found, value)
+        """
+        found, value, fresh = self.lookup(key, data_type)
+        return found and fresh, value if fresh else None
+
+    def set(self, key, value, data_type, ttl=None):
+        serialized = plan_codec.encode(value)
+        expires_at = time.time() + (self.ttl_for(data_type) if ttl is None else ttl)
+        self.memory.set(key, data_type, serialized, expires_at)
+        self.disk.set(key, data_type, serialized, expires_at)
+
+    def ttl_remaining(self, key):
+        """Seconds until the entry expires (0 if missing or expired)"""
+        return max(0.0, self.disk.expires_at(key) - time.time())
+
+    def get_metrics(self):
+        """
+        Hit ratio and size per data type
+
+        Returns:
+            dict: data_type -> metrics dict
+        """
+        memory_sizes = self.memory.sizes()
+        disk_sizes = self.disk.sizes()
+        with self.lock:
+            stats = {data_type: dict(counts) for data_type, counts in self.stats.items()}
+
+        metrics = {}
+        for data_type in sorted(set(stats) | set(memory_sizes) | set(disk_sizes)):
+            counts = stats.get(data_type, {
+                'memory_hits': 0, 'disk_hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0,
+            })
+            lookups = counts['memory_hits'] + counts['disk_hits'] + counts['stale_hits'] + counts['misses']
+            metrics[data_type] = dict(
+                counts,
+                hit_ratio=round((lookups - counts['misses']) / lookups, 3) if lookups else None,
+                ttl_seconds=self.ttl_for(data_type),
+                max_stale_seconds=self.max_stale_for(data_type),
+                memory_entries=memory_sizes.get(data_type, (0, 0))[0],
+                memory_bytes=memory_sizes.get(data_type, (0, 0))[1],
+                disk_entries=disk_sizes.get(data_type, (0, 0))[0],
+                disk_bytes=disk_sizes.get(data_type, (0, 0))[1],
+            )
+        return metrics
+
+    def purge_expired(self):
+        """Delete disk entries past their TTL plus max staleness"""
+        return self.disk.purge_expired(self.max_stale)
+
+def is_cacheable(value):
+    """Only cache real provider data: skip failures, empty results and mock/demo fallbacks"""
+    if value is None or value == [] or value == {}:
+        return False
+    if isinstance(value, list):
+        return not any(
+            isinstance(item, dict) and (item.get('mock_data') or 'Demo' in str(item.get('source', '')))
+            for item in value
+        )
+    return True
+
+# Shared cache for this process (memory tier) and host (disk tier)
+cache = TieredCache(MemoryCache(config.CACHE_MEMORY_ENTRIES), DiskCache(config.FETCH_CACHE_DB),
+                    config.CACHE_TTLS, config.CACHE_MAX_STALE)
+
+# Background refreshes of stale entries, at most one queued per key
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+def _refresh(key, data_type, ttl, fn, args, kwargs):
+    try:
+        value = fn(*args, **kwargs)
+        if is_cacheable(value):
+            cache.set(key, value, data_type, ttl)
+            cache._count(data_type, 'refreshes')
+    except Exception as e:
+        print(f"Background refresh of {key} failed: {e}")
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+def refresh_in_background(key, data_type, ttl, fn, *args, **kwargs):
+    """Queue a refetch of a stale entry unless one is already queued or running"""
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    _refresh_executor.submit(_refresh, key, data_type, ttl, fn, args, kwargs)
+
+def cached(data_type, ttl=None, ignore=()):
+    """
+    Decorator caching a fetcher's result under its canonical request key
+
+    Args:
+        data_type (str): Kind of data cached ('fares', 'events', 'places', ...), which sets its TTL policy
+        ttl (float): Optional TTL in seconds overriding the data type's policy
+        ignore (tuple): Argument names left out of the key (e.g. values derived from other arguments)
+
+    Expired entries within the data type's max staleness are returned immediately while a background
+    refresh replaces them; older entries are refetched synchronously.
+
+    The wrapped function also gets warm(*args, min_ttl=0, **kwargs), which refetches only when
+    the entry is missing or expires within min_ttl seconds and returns whether it fetched.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = canonical_key(fn, args, kwargs, ignore)
+            found, value, fresh = cache.lookup(key, data_type)
+            if found:
+                if not fresh:
+                    refresh_in_background(key, data_type, ttl, fn, *args, **kwargs)
+                return value
+            value = fn(*args, **kwargs)
+            if is_cacheable(value):
+                cache.set(key, value, data_type, ttl)
+            return value
+
+        def warm(*args, min_ttl=0, **kwargs):
+            key = canonical_key(fn, args, kwargs, ignore)
+            if cache.ttl_remaining(key) > min_ttl:
+                return False
+            value = fn(*args, **kwargs)
+            if is_cacheable(value):
+                cache.set(key, value, data_type, ttl)
+            return True
+
+        wrapper.warm = warm
+        wrapper.cache_key = lambda *args, **kwargs: canonical_key(fn, args, kwargs, ignore)
+        return wrapper
+
+    return decorator
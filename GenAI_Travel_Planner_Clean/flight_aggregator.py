@@ -0,0 +1,360 @@
+"""
+Flight aggregator for AI Travel Planner
+Queries Amadeus and Skyscanner concurrently and merges their live offers into one deduplicated list,
+ranked by price, duration, stops and fit with the traveler's time windows (flight_ranking). Returns as soon as enough offers are in, and hedges a provider call that runs
+past its usual latency with a duplicate request (whichever answers first wins).
+
+Also builds flexible-date fare matrices (the cheapest Amadeus fare for every departure/return pair
+around the chosen dates) and multi-city leg matrices (cheapest one-way fare and shortest duration
+between every pair of cities), each cell cached on its own. Provider results come from the shared
+fare cache (fare_cache) when another search, process or host has already fetched them. Cached fares
+stay in the provider's currency; offers are converted to the display currency (currency) as they are read,
+before merging, ranking or picking the cheapest.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config import config
+from travel_records import FlightOffer
+from currency import fx, normalize_offers
+from flight_ranking import rank_offers
+from airports import airports
+from trip_routing import estimated_leg
+from travel_services import (
+    should_use_amadeus,
+    fetch_amadeus_flights,
+    fetch_skyscanner_flights,
+    parse_amadeus_flights,
+)
+
+logger = logging.getLogger(__name__)
+
+# Latency samples needed before a provider's percentile replaces FLIGHT_HEDGE_AFTER
+MIN_LATENCY_SAMPLES = 5
+
+class LatencyTracker:
+    """Recent call latencies per provider, for hedge timing"""
+
+    def __init__(self, window=50):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(lambda: deque(maxlen=window))
+        self.counts = defaultdict(lambda: {'calls': 0, 'hedges': 0, 'hedge_wins': 0, 'failures': 0})
+
+    def record(self, provider, seconds):
+        with self.lock:
+            self.samples[provider].append(seconds)
+
+    def count(self, provider, event):
+        with self.lock:
+            self.counts[provider][event] += 1
+
+    def hedge_delay(self, provider):
+        """Seconds after which a call to provider is hedged: its latency percentile, or the default"""
+        with self.lock:
+            samples = sorted(self.samples[provider])
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return config.FLIGHT_HEDGE_AFTER
+        return samples[min(len(samples) - 1, int(len(samples) * config.FLIGHT_HEDGE_PERCENTILE / 100))]
+
+    def get_metrics(self):
+        """Per provider: call counts, hedges, hedge wins, failures and current hedge delay"""
+        with self.lock:
+            providers = set(self.samples) | set(self.counts)
+            metrics = {provider: dict(self.counts[provider]) for provider in providers}
+        for provider, metric in metrics.items():
+            metric['hedge_after_seconds'] = round(self.hedge_delay(provider), 2)
+        return metrics
+
+latency = LatencyTracker()
+
+# Provider calls; abandoned calls already running finish in the background and still fill the fare cache
+_flight_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="flight-search")
+
+# Fare and leg matrix cells get their own pool, and a process-wide cap on cells queued or running
+_matrix_executor = ThreadPoolExecutor(max_workers=config.FLIGHT_MATRIX_WORKERS, thread_name_prefix="fare-matrix")
+_matrix_slots = threading.BoundedSemaphore(config.FLIGHT_MATRIX_MAX_CELLS)
+
+def live_offers(result):
+    """FlightOffer records from a provider result in the display currency (mock/demo fallbacks are dropped)"""
+    return normalize_offers([offer for offer in result or [] if isinstance(offer, FlightOffer)])
+
+def fetch_cells(cells, timeout):
+    """
+    Fetch matrix cells with fetch_amadeus_flights on the matrix pool
+
+    A cell is submitted only once it holds one of the FLIGHT_MATRIX_MAX_CELLS slots shared by every matrix in
+    the process. Cells without a slot or a result by the deadline are cancelled if they have not started.
+
+    Args:
+        cells (dict): Cell key -> fetch_amadeus_flights arguments
+        timeout (float): Seconds to wait for slots and results
+
+    Returns:
+        dict: Cell key -> provider result, for the cells fetched in time
+    """
+    deadline = time.time() + timeout
+    queued, pending, results = deque(cells.items()), {}, {}
+
+    def collect(done):
+        for future in done:
+            key = pending.pop(future)
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                source, destination, departure, return_ = cells[key][:4]
+                logger.warning("Fare matrix cell %s → %s %s / %s failed: %s", source, destination, departure, return_, e)
+
+    try:
+        while queued and time.time() < deadline:
+            # Block for a slot only when none of this matrix's cells is in flight to wait on instead
+            if _matrix_slots.acquire(timeout=0 if pending else max(0, deadline - time.time())):
+                key, args = queued.popleft()
+                future = _matrix_executor.submit(fetch_amadeus_flights, *args)
+                future.add_done_callback(lambda _: _matrix_slots.release())
+                pending[future] = key
+            elif pending:
+                done, _ = wait(list(pending), timeout=max(0, deadline - time.time()), return_when=FIRST_COMPLETED)
+                collect(done)
+        done, _ = wait(list(pending), timeout=max(0, deadline - time.time()))
+        collect(done)
+    finally:
+        for future in pending:
+            future.cancel()
+    return results
+
+def offer_key(offer):
+    """Identity of a flight across providers: same times and stops means the same flight (or a codeshare)"""
+    if offer.departure_time != 'N/A' and offer.arrival_time != 'N/A':
+        return (offer.departure_time[:16], offer.arrival_time[:16], offer.stops)
+    return (offer.source, offer.airline, offer.price)
+
+def merge_offers(offer_lists):
+    """
+    Merge provider offers, keeping the cheapest copy of each flight
+
+    Returns:
+        list: FlightOffer records, cheapest first
+    """
+    price = lambda offer: offer.amount if offer.amount is not None else float('inf')
+    merged = {}
+    for offers in offer_lists:
+        for offer in offers:
+            key = offer_key(offer)
+            if key not in merged or price(offer) < price(merged[key]):
+                merged[key] = offer
+    return sorted(merged.values(), key=price)
+
+def flight_providers(source_iata, destination_iata, departure_date, return_date, adults=1,
+                     departure_time_pref="⏰ Any Time", return_time_pref="⏰ Any Time", travel_class="economy"):
+    """Configured providers as name -> (fetcher, args, parser)"""
+    providers = {}
+    if should_use_amadeus():
+        providers['amadeus'] = (fetch_amadeus_flights, (source_iata, destination_iata, departure_date, return_date, adults,
+                                                         travel_class), parse_amadeus_flights)
+    if config.RAPIDAPI_KEY and return_date:  # round-trip endpoint only
+        providers['skyscanner'] = (fetch_skyscanner_flights, (source_iata, destination_iata, departure_date, return_date,
+                                                              departure_time_pref, return_time_pref, travel_class), list)
+    return providers
+
+def search_flights(source_iata, destination_iata, departure_date, return_date, adults=1,
+                   departure_time_pref="⏰ Any Time", return_time_pref="⏰ Any Time", travel_class="economy",
+                   good_enough=None, timeout=None):
+    """
+    Live flight offers from every configured provider
+
+    Args:
+        source_iata (str): Departure airport
+        destination_iata (str): Arrival airport
+        departure_date (date): Outbound date
+        return_date (date): Return date, or None for one-way fares
+        adults (int): Travelers
+        departure_time_pref (str): Departure time preference (Skyscanner)
+        return_time_pref (str): Return time preference (Skyscanner)
+        travel_class (str): Cabin: "economy", "business" or "first"
+        good_enough (int): Return once this many distinct offers are in (default FLIGHT_GOOD_ENOUGH_OFFERS)
+        timeout (float): Give up on slower providers after this many seconds (default FLIGHT_SEARCH_TIMEOUT)
+
+    Returns:
+        list: FlightOffer records, best first (empty when no provider returned live offers)
+    """
+    good_enough = good_enough or config.FLIGHT_GOOD_ENOUGH_OFFERS
+    deadline = time.time() + (timeout or config.FLIGHT_SEARCH_TIMEOUT)
+    providers = flight_providers(source_iata, destination_iata, departure_date, return_date, adults,
+                                 departure_time_pref, return_time_pref, travel_class)
+
+    results = {}
+    pending = {}  # future -> (provider, started, is_hedge)
+
+    def submit(name, is_hedge=False):
+        fetch, args, _ = providers[name]
+        latency.count(name, 'hedges' if is_hedge else 'calls')
+        pending[_flight_executor.submit(fetch, *args)] = (name, time.time(), is_hedge)
+
+    for name, (fetch, args, parse) in providers.items():
+        # Cached fares need no thread, and their near-zero latency must not skew hedge timing
+        if fetch.is_cached(*args):
+            results[name] = live_offers(parse(fetch(*args) or []))
+        else:
+            submit(name)
+
+    hedged = set()
+    while pending and len(merge_offers(results.values())) < good_enough and time.time() < deadline:
+        now = time.time()
+        next_event = deadline
+        for name, started, is_hedge in pending.values():
+            if name not in hedged:
+                next_event = min(next_event, started + latency.hedge_delay(name))
+        done, _ = wait(list(pending), timeout=max(0, next_event - now), return_when=FIRST_COMPLETED)
+
+        for future in done:
+            name, started, is_hedge = pending.pop(future)
+            try:
+                offers = live_offers(providers[name][2](future.result() or []))
+            except Exception as e:
+                logger.warning("%s flight search failed: %s", name, e)
+                latency.count(name, 'failures')
+                offers = None
+            if offers is None and any(other == name for other, _, _ in pending.values()):
+                continue  # the other call for this provider may still succeed
+            if name in results:
+                continue
+            results[name] = offers or []
+            if offers is not None:
+                latency.record(name, time.time() - started)
+                if is_hedge:
+                    latency.count(name, 'hedge_wins')
+            for other_future, (other, _, _) in list(pending.items()):
+                if other == name:
+                    del pending[other_future]
+                    other_future.cancel()
+
+        now = time.time()
+        for name, started, is_hedge in list(pending.values()):
+            if name not in hedged and name not in results and now - started >= latency.hedge_delay(name):
+                hedged.add(name)
+                submit(name, is_hedge=True)
+
+    # Calls still queued are dropped; running ones finish in the background
+    for future in pending:
+        future.cancel()
+    return rank_offers(merge_offers(results.values()), departure_time_pref, return_time_pref)
+
+def fare_matrix(source_iata, destination_iata, departure_date, return_date, flex_days=2, adults=1,
+                travel_class="economy", timeout=None):
+    """
+    Cheapest Amadeus fare for each departure/return pair within ±flex_days of the chosen dates
+
+    Each cell is one fetch_amadeus_flights call, cached like any other fare search: cells already cached
+    are read directly and only missing cells are fetched, concurrently and under the Amadeus rate limit.
+
+    Args:
+        source_iata (str): Departure airport
+        destination_iata (str): Arrival airport
+        departure_date (date): Chosen outbound date
+        return_date (date): Chosen return date
+        flex_days (int): Days either side of each date to search
+        adults (int): Travelers
+        travel_class (str): Cabin: "economy", "business" or "first"
+        timeout (float): Leave cells still being fetched after this many seconds empty (default FLIGHT_SEARCH_TIMEOUT)
+
+    Returns:
+        dict: departure_dates and return_dates (ISO strings), prices[i][j] for departure i and return j
+            (None where there is no fare or the return precedes the departure), currency and fetched count;
+            None when Amadeus is not configured
+    """
+    if not should_use_amadeus():
+        return None
+
+    shifts = range(-flex_days, flex_days + 1)
+    departure_dates = [departure_date + timedelta(days=shift) for shift in shifts]
+    return_dates = [return_date + timedelta(days=shift) for shift in shifts]
+
+    def cheapest(result):
+        offers = [offer for offer in live_offers(parse_amadeus_flights(result or [])) if offer.amount is not None]
+        return min((offer.amount for offer in offers), default=None)
+
+    prices = [[None] * len(return_dates) for _ in departure_dates]
+    missing = {}
+    for i, departure in enumerate(departure_dates):
+        for j, return_ in enumerate(return_dates):
+            if return_ <= departure:
+                continue
+            args = (source_iata, destination_iata, departure, return_, adults, travel_class)
+            if fetch_amadeus_flights.is_cached(*args):
+                prices[i][j] = cheapest(fetch_amadeus_flights(*args))
+            else:
+                missing[(i, j)] = args
+
+    for (i, j), result in fetch_cells(missing, timeout or config.FLIGHT_SEARCH_TIMEOUT).items():
+        prices[i][j] = cheapest(result)
+
+    return {
+        'departure_dates': [day.isoformat() for day in departure_dates],
+        'return_dates': [day.isoformat() for day in return_dates],
+        'prices': prices,
+        'currency': config.DISPLAY_CURRENCY,
+        'fetched': len(missing),
+    }
+
+def leg_matrix(codes, departure_date, adults=1, travel_class="economy", return_home=True, timeout=None):
+    """
+    Cheapest one-way fare and shortest flight time between every pair of airports, for ordering a multi-city trip
+
+    Every leg is priced on departure_date so visit orders compare on equal terms, with a search of at most
+    AMADEUS_LEG_MAX_OFFERS offers; the chosen legs are searched again on their own dates. Legs are fetched concurrently through the fare cache. Legs without
+    a live fare (all of them when Amadeus is not configured) are estimated from great-circle distance.
+
+    Args:
+        codes (list): Airport codes, home first
+        departure_date (date): Date every leg is priced on
+        adults (int): Travelers
+        travel_class (str): Cabin: "economy", "business" or "first"
+        return_home (bool): Also price legs back to home
+        timeout (float): Estimate legs still being fetched after this many seconds (default FLIGHT_SEARCH_TIMEOUT)
+
+    Returns:
+        dict: codes, prices[i][j] and minutes[i][j] for flying from codes[i] to codes[j] (0 on the diagonal),
+            currency, fetched (legs requested from Amadeus) and estimated (legs without a live fare)
+    """
+    size = len(codes)
+    legs = [(i, j) for i in range(size) for j in range(size) if i != j and (j != 0 or return_home)]
+    results, missing = {}, {}
+    if should_use_amadeus():
+        for i, j in legs:
+            args = (codes[i], codes[j], departure_date, None, adults, travel_class, config.AMADEUS_LEG_MAX_OFFERS)
+            if fetch_amadeus_flights.is_cached(*args):
+                results[(i, j)] = fetch_amadeus_flights(*args)
+            else:
+                missing[(i, j)] = args
+        results.update(fetch_cells(missing, timeout or config.FLIGHT_SEARCH_TIMEOUT))
+
+    prices = [[0.0] * size for _ in range(size)]
+    minutes = [[0.0] * size for _ in range(size)]
+    estimated = 0
+    # Estimates are in USD; unconvertible ones are left as they are (they only order the route)
+    usd_rate = fx.rate('USD', config.DISPLAY_CURRENCY)
+    usd_rate = 1.0 if math.isnan(usd_rate) else usd_rate
+    for i, j in legs:
+        offers = [offer for offer in live_offers(parse_amadeus_flights(results.get((i, j)) or [])) if offer.amount is not None]
+        estimate_fare, estimate_minutes = estimated_leg(airports.distance_km(codes[i], codes[j]) or 1500)
+        if offers:
+            durations = [offer.duration_minutes for offer in offers if offer.duration_minutes]
+            prices[i][j] = min(offer.amount for offer in offers)
+            minutes[i][j] = min(durations) if durations else estimate_minutes
+        else:
+            prices[i][j], minutes[i][j] = estimate_fare * usd_rate, estimate_minutes
+            estimated += 1
+
+    return {
+        'codes': list(codes),
+        'prices': prices,
+        'minutes': minutes,
+        'currency': config.DISPLAY_CURRENCY,
+        'fetched': len(missing),
+        'estimated': estimated,
+    }
@@ -0,0 +1,185 @@
+"""
+Flight offer ranking for AI Travel Planner
+Columnar offer table (numeric price, duration, stops, departure and return hour) and a vectorized
+multi-criteria scorer that weighs them against the traveler's departure/return time windows, plus
+bounded-heap selection that keeps the best k offers of a large result while it is being parsed.
+Prices are compared in one currency: the price column is converted to the display currency first.
+"""
+
+import heapq
+import re
+import numpy as np
+from config import config
+from currency import fx, offer_currency
+from travel_records import FlightOffer
+
+# Relative importance of each criterion; scores are weighted sums of criteria normalized to 0..1
+DEFAULT_WEIGHTS = {'price': 0.4, 'duration': 0.2, 'stops': 0.15, 'time': 0.25}
+
+# Standalone cost for streaming selection: the price inflated by per-stop and per-minute penalties
+STOP_PENALTY = 0.15       # +15% per stop
+MINUTE_PENALTY = 0.0005   # +3% per hour of travel
+
+_HOUR = re.compile(r'T?(\d{1,2}):(\d{2})')
+_AMOUNT = re.compile(r'\d[\d,]*(?:\.\d+)?')
+_WINDOW = re.compile(r'\((\d{2}):\d{2}-(\d{2}):\d{2}\)')
+
+def parse_hour(value):
+    """Hour of day (fractional) from "2026-11-01T06:30:00" or "06:30"; NaN when missing"""
+    if value and len(value) >= 16 and value[10] == 'T' and value[13] == ':':
+        return int(value[11:13]) + int(value[14:16]) / 60
+    match = _HOUR.search(value or '')
+    return int(match.group(1)) + int(match.group(2)) / 60 if match else np.nan
+
+def parse_amount(offer):
+    """Numeric price of an offer: its amount, else the number in "ZAR 1500" / "$850" / {'total': '1500'}"""
+    amount = offer.get('amount')
+    if amount is not None:
+        return float(amount)
+    price = offer.get('price')
+    if isinstance(price, dict):
+        price = price.get('total')
+    match = _AMOUNT.search(str(price or ''))
+    return float(match.group().replace(',', '')) if match else np.nan
+
+def parse_duration_minutes(offer):
+    """Duration in minutes from duration_minutes, "8h 30m" or "275 min"; NaN when missing"""
+    if offer.get('duration_minutes') is not None:
+        return float(offer['duration_minutes'])
+    text = str(offer.get('total_duration') or offer.get('duration') or '')
+    hours = re.search(r'(\d+)\s*h', text)
+    minutes = re.search(r'(\d+)\s*m', text)
+    if not hours and not minutes:
+        return np.nan
+    return float((int(hours.group(1)) * 60 if hours else 0) + (int(minutes.group(1)) if minutes else 0))
+
+def time_window(preference):
+    """(start_hour, end_hour) for a form time preference such as "🌅 Morning (06:00-12:00)"; None for any time"""
+    match = _WINDOW.search(preference or '')
+    if not match:
+        return None
+    start, end = int(match.group(1)), int(match.group(2))
+    return start, end if end > start else end + 24
+
+class OfferTable:
+    """Offers as parallel NumPy columns, in input order; prices converted to currency when one is given"""
+
+    def __init__(self, offers, currency=None):
+        self.offers = list(offers)
+        columns = np.array([self._row(offer) for offer in self.offers], dtype=float).reshape(-1, 5).T
+        self.price, self.duration, self.stops, self.departure_hour, self.return_hour = columns
+        if currency and len(self.offers):
+            self.price = fx.convert(self.price, [offer_currency(offer) for offer in self.offers], currency)
+
+    @staticmethod
+    def _row(offer):
+        """(price, duration, stops, departure hour, return hour); records are read directly"""
+        if isinstance(offer, FlightOffer) and offer.amount is not None and offer.duration_minutes is not None:
+            return (offer.amount, offer.duration_minutes, offer.stops,
+                    parse_hour(offer.departure_time), parse_hour(offer.return_time))
+        return (parse_amount(offer), parse_duration_minutes(offer), offer.get('stops') or 0,
+                parse_hour(offer.get('departure_time')), parse_hour(offer.get('return_time')))
+
+    def __len__(self):
+        return len(self.offers)
+
+def _normalized(column):
+    """Scale to 0..1 (lower is better); missing values score worst, constant columns score 0"""
+    if not np.isfinite(column).any():
+        return np.zeros_like(column)
+    low, high = np.nanmin(column), np.nanmax(column)
+    scaled = (column - low) / (high - low) if high > low else np.zeros_like(column)
+    return np.where(np.isnan(scaled), 1.0, scaled)
+
+def window_distance(hours, window):
+    """Hours outside a time window (0 inside, wrapping past midnight), scaled to 0..1; 0 for no window"""
+    if window is None:
+        return np.zeros_like(hours)
+    start, end = window
+    # Shift hours into the window's frame so windows crossing midnight compare correctly
+    shifted = np.where(hours < start, hours + 24, hours)
+    outside = np.where(shifted <= end, 0.0, np.minimum(shifted - end, start + 24 - shifted))
+    return np.where(np.isnan(hours), 1.0, outside / 12)
+
+def score_offers(table, departure_time_pref=None, return_time_pref=None, weights=None):
+    """
+    Score every offer in one pass (lower is better)
+
+    Args:
+        table (OfferTable): Offers to score
+        departure_time_pref (str): Departure time preference from the form
+        return_time_pref (str): Return time preference from the form
+        weights (dict): Criterion weights (default DEFAULT_WEIGHTS); missing criteria weigh 0
+
+    Returns:
+        numpy.ndarray: Score per offer
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    time_penalty = window_distance(table.departure_hour, time_window(departure_time_pref))
+    return_window = time_window(return_time_pref)
+    if return_window is not None:
+        has_return = ~np.isnan(table.return_hour)
+        time_penalty = (time_penalty + np.where(has_return, window_distance(table.return_hour, return_window), 0)) / 2
+    return (weights.get('price', 0) * _normalized(table.price)
+            + weights.get('duration', 0) * _normalized(table.duration)
+            + weights.get('stops', 0) * _normalized(table.stops)
+            + weights.get('time', 0) * time_penalty)
+
+def rank_offers(offers, departure_time_pref=None, return_time_pref=None, weights=None, top=None, currency=None):
+    """
+    Offers ordered best first by weighted price, duration, stops and time-window fit
+
+    Args:
+        offers (list): FlightOffer records or offer dicts
+        departure_time_pref (str): Departure time preference from the form
+        return_time_pref (str): Return time preference from the form
+        weights (dict): Criterion weights (default DEFAULT_WEIGHTS)
+        top (int): Keep only the best top offers
+        currency (str): Currency prices are compared in (default DISPLAY_CURRENCY)
+
+    Returns:
+        list: Ranked offers
+    """
+    table = OfferTable(offers, currency or config.DISPLAY_CURRENCY)
+    if not len(table):
+        return []
+    scores = score_offers(table, departure_time_pref, return_time_pref, weights)
+    # Ties keep cheaper offers first, then input order
+    order = np.lexsort((np.arange(len(table)), np.nan_to_num(table.price, nan=np.inf), scores))
+    return [table.offers[index] for index in order[:top]]
+
+def offer_cost(offer):
+    """Price with stop and duration penalties; needs no other offers, so it can rank a stream"""
+    price, duration, stops, _, _ = OfferTable._row(offer)
+    if np.isnan(price):
+        return float('inf')
+    return price * (1 + STOP_PENALTY * stops + MINUTE_PENALTY * (0 if np.isnan(duration) else duration))
+
+def top_offers(offers, k, bucket_hours=6):
+    """
+    Best k offers per departure-time bucket from an iterable, holding at most k per bucket
+
+    Keeping the best of each bucket (rather than overall) leaves candidates for every departure time
+    preference, since preferences are applied later by rank_offers.
+
+    Args:
+        offers (iterable): FlightOffer records (None items are skipped), consumed once
+        k (int): Offers kept per bucket
+        bucket_hours (int): Width of the departure-hour buckets
+
+    Returns:
+        list: Kept offers, lowest cost first
+    """
+    heaps = {}
+    for sequence, offer in enumerate(offers):
+        if offer is None:
+            continue
+        hour = parse_hour(offer.get('departure_time'))
+        heap = heaps.setdefault(-1 if np.isnan(hour) else int(hour // bucket_hours), [])
+        entry = (-offer_cost(offer), -sequence, offer)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    kept = [entry for heap in heaps.values() for entry in heap]
+    return [offer for _, _, offer in sorted(kept, key=lambda entry: (-entry[0], -entry[1]))]
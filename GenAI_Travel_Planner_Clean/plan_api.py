@@ -0,0 +1,92 @@
+"""
+Plan generation HTTP API for AI Travel Planner
+ASGI service that queues plan requests and exposes job progress and results
+
+Run:
+    uvicorn plan_api:app --host 0.0.0.0 --port 8000
+
+Endpoints:
+    POST /plans                   Submit a plan request, returns {"job_id": ...}
+    GET  /plans/{id}              Job status and latest progress event
+    GET  /plans/{id}/events       Progress events (?since=N&wait=seconds for long polling)
+    GET  /plans/{id}/stream       Progress events as Server-Sent Events
+    GET  /plans/{id}/result       Finished plan (409 while the job is still running)
+"""
+
+import json
+from typing import List, Optional
+from fastapi import FastAPI, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from config import config
+from plan_jobs import create_local_queue, JobNotFound, JOB_DONE, JOB_FAILED
+from travel_records import RECORD_TYPES
+
+class PlanRequest(BaseModel):
+    job_id: Optional[str] = None  # Resubmitting a known plan id reattaches to that job
+    source: Optional[str] = None
+    destination: Optional[str] = None
+    destinations: Optional[List[str]] = None  # Multi-city: every city to visit, in any order
+    departure_date: str
+    return_date: str
+    travel_theme: Optional[str] = None
+    activity_preferences: Optional[str] = None
+    departure_time_pref: Optional[str] = None
+    return_time_pref: Optional[str] = None
+    num_travelers: Optional[int] = None
+    budget: Optional[str] = None
+    flight_class: Optional[str] = None
+    flex_days: Optional[int] = None  # Also search fares this many days either side of the chosen dates
+    optimize_for: Optional[str] = None  # Multi-city visit order: 'price' (default) or 'duration'
+
+app = FastAPI(title="AI Travel Planner API")
+
+# The API process always runs jobs itself; scale by running more API workers
+job_queue = create_local_queue()
+
+def _lookup(fn, *args, **kwargs):
+    try:
+        return fn(*args, **kwargs)
+    except JobNotFound:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+@app.post("/plans", status_code=202)
+def submit_plan(request: PlanRequest):
+    trip = request.model_dump(exclude_none=True)
+    if not trip.get('destination') and not trip.get('destinations'):
+        raise HTTPException(status_code=422, detail="destination or destinations is required")
+    if len(trip.get('destinations', [])) > config.MULTI_CITY_MAX_DESTINATIONS:
+        raise HTTPException(status_code=422,
+                            detail=f"destinations allows at most {config.MULTI_CITY_MAX_DESTINATIONS} cities")
+    job_id = trip.pop('job_id', None)
+    return {'job_id': job_queue.submit(trip, job_id=job_id)}
+
+@app.get("/plans/{job_id}")
+def get_plan_status(job_id: str):
+    return _lookup(job_queue.get_status, job_id)
+
+@app.get("/plans/{job_id}/events")
+def get_plan_events(job_id: str, since: int = 0, wait: float = 0):
+    return _lookup(job_queue.get_events, job_id, since, wait=min(wait, 60))
+
+@app.get("/plans/{job_id}/stream")
+def stream_plan_events(job_id: str):
+    _lookup(job_queue.get_status, job_id)
+
+    def event_stream():
+        for event in job_queue.iter_events(job_id):
+            yield f"id: {event['seq']}\nevent: {event['stage']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@app.get("/plans/{job_id}/result")
+def get_plan_result(job_id: str):
+    status = _lookup(job_queue.get_status, job_id)
+    if status['status'] == JOB_FAILED:
+        raise HTTPException(status_code=500, detail=status['error'])
+    if status['status'] != JOB_DONE:
+        raise HTTPException(status_code=409, detail=f"Job is {status['status']}")
+    # Records are sent as the plain dicts they replace, without unset fields
+    return jsonable_encoder(job_queue.get_result(job_id),
+                            custom_encoder={record_type: record_type.to_dict for record_type in RECORD_TYPES.values()})
@@ -0,0 +1,126 @@
+"""
+Plan serialization for AI Travel Planner
+Versioned compact binary format for plans, stage results and cache entries:
+msgpack when installed (compact JSON otherwise), with zstd or zlib compression for larger payloads.
+Travel records (travel_records) are stored as tagged maps and come back as records; so are bytes in JSON
+payloads (msgpack stores them natively).
+
+Layout: b"TPC" + format version + codec ('m' msgpack, 'j' JSON) + compression ('n' none, 's' zstd, 'z' zlib) + body
+"""
+
+import base64
+import json
+import zlib
+from dataclasses import fields
+from datetime import date, datetime
+from travel_records import RecordMixin, RECORD_TYPES
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MAGIC = b"TPC"
+# 1: plain values; 2: adds tagged travel records
+FORMAT_VERSION = 2
+RECORD_TAG = '__record__'
+BYTES_TAG = '__bytes__'
+HEADER_SIZE = len(MAGIC) + 3
+
+# Payloads smaller than this are stored uncompressed; compression rarely pays off below it
+COMPRESS_MIN_BYTES = 512
+
+def _default(value):
+    """
+    Records become tagged maps of their set fields; other values msgpack/JSON cannot represent
+    natively are stored as strings, as json.dumps(default=str) did
+    """
+    if isinstance(value, RecordMixin):
+        tagged = {RECORD_TAG: type(value).__name__}
+        for field in fields(value):
+            field_value = getattr(value, field.name)
+            if field_value is not None:
+                tagged[field.name] = field_value
+        return tagged
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        return {BYTES_TAG: base64.b64encode(value).decode('ascii')}
+    return str(value)
+
+def _revive(mapping):
+    """Rebuild tagged maps into records (and bytes)"""
+    if BYTES_TAG in mapping:
+        return base64.b64decode(mapping[BYTES_TAG])
+    record_type = RECORD_TYPES.get(mapping.get(RECORD_TAG))
+    return record_type.from_dict(mapping) if record_type else mapping
+
+def encode(value, compress=True, codec=None):
+    """
+    Serialize a plan, stage result or cache entry
+
+    Args:
+        value: JSON-like value (dicts, lists, strings, numbers, dates)
+        compress (bool): Compress payloads of COMPRESS_MIN_BYTES or more
+        codec (str): Force 'm' (msgpack) or 'j' (JSON); defaults to msgpack when installed
+
+    Returns:
+        bytes: Encoded payload with format header
+    """
+    codec = codec or ('m' if msgpack else 'j')
+    if codec == 'm':
+        body = msgpack.packb(value, default=_default, use_bin_type=True)
+    else:
+        body = json.dumps(value, default=_default, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    compression = 'n'
+    if compress and len(body) >= COMPRESS_MIN_BYTES:
+        if zstandard:
+            packed, method = zstandard.ZstdCompressor(level=3).compress(body), 's'
+        else:
+            packed, method = zlib.compress(body, 6), 'z'
+        if len(packed) < len(body):
+            body, compression = packed, method
+
+    return MAGIC + bytes([FORMAT_VERSION]) + codec.encode('ascii') + compression.encode('ascii') + body
+
+def decode(data):
+    """
+    Deserialize a payload written by encode, or legacy JSON text/bytes
+
+    Args:
+        data (bytes or str): Stored payload
+
+    Returns:
+        Decoded value (dates come back as ISO strings, records as records)
+    """
+    if isinstance(data, str):
+        return json.loads(data)
+    data = bytes(data)
+    if not data.startswith(MAGIC):
+        return json.loads(data.decode('utf-8'))
+
+    version = data[len(MAGIC)]
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Unsupported plan format version {version} (this build reads up to {FORMAT_VERSION})")
+    codec = chr(data[len(MAGIC) + 1])
+    compression = chr(data[len(MAGIC) + 2])
+    body = data[HEADER_SIZE:]
+
+    if compression == 's':
+        if zstandard is None:
+            raise RuntimeError("📦 Payload is zstd compressed: pip install zstandard")
+        body = zstandard.ZstdDecompressor().decompress(body)
+    elif compression == 'z':
+        body = zlib.decompress(body)
+
+    if codec == 'm':
+        if msgpack is None:
+            raise RuntimeError("📦 Payload is msgpack encoded: pip install msgpack")
+        return msgpack.unpackb(body, raw=False, strict_map_key=False, object_hook=_revive)
+    return json.loads(body.decode('utf-8'), object_hook=_revive)
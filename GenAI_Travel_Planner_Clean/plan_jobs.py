@@ -0,0 +1,451 @@
+"""
+Plan generation job queue for AI Travel Planner
+Runs plan_pipeline off the request thread, records progress events per job and
+persists finished stages so interrupted jobs resume instead of starting over
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+import requests
+from config import config
+import plan_codec
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+FINISHED_STATES = (JOB_DONE, JOB_FAILED)
+
+# Unfinished jobs with no progress for this long are assumed orphaned and resumed
+STALE_JOB_SECONDS = 120
+
+# Running jobs touch their stored row this often, so a long stage (e.g. the cities of a multi-city
+# plan) never looks orphaned to other processes
+JOB_HEARTBEAT_SECONDS = 30
+
+# Finished jobs kept in memory (least recently used beyond this are dropped and reloaded from the store on demand)
+FINISHED_JOBS_IN_MEMORY = 32
+
+class JobNotFound(KeyError):
+    """Raised when a job id is unknown to the queue"""
+
+class JobStore:
+    """SQLite persistence for jobs, their progress events and finished stage results (plan_codec encoded)"""
+
+    def __init__(self, path, retention_days=7):
+        self.path = path
+        self.lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    request TEXT NOT NULL,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS job_stages (
+                    job_id TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    PRIMARY KEY (job_id, stage)
+                );
+                CREATE TABLE IF NOT EXISTS job_events (
+                    job_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    event TEXT NOT NULL,
+                    PRIMARY KEY (job_id, seq)
+                );
+            """)
+        self.purge(retention_days)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _write(self, sql, params):
+        with self.lock, self._connect() as conn:
+            conn.execute(sql, params)
+
+    def save_job(self, job):
+        self._write(
+            "INSERT OR REPLACE INTO jobs (id, status, request, error, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job['id'], job['status'], json.dumps(job['request'], default=str), job['error'], job['created_at'], job['updated_at'])
+        )
+
+    def touch(self, job_id, updated_at):
+        self._write("UPDATE jobs SET updated_at = ? WHERE id = ?", (updated_at, job_id))
+
+    def claim(self, job_id, seen_updated_at, updated_at):
+        """
+        Queue a stale job for this process, unless it changed since it was read as seen_updated_at
+        (its owner is still alive, or another process claimed it first)
+
+        Returns:
+            bool: True if this process now owns the job
+        """
+        with self.lock, self._connect() as conn:
+            cursor = conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND updated_at = ?",
+                                  (JOB_QUEUED, updated_at, job_id, seen_updated_at))
+            return cursor.rowcount == 1
+
+    def save_stage(self, job_id, stage, result):
+        self._write(
+            "INSERT OR REPLACE INTO job_stages (job_id, stage, result) VALUES (?, ?, ?)",
+            (job_id, stage, plan_codec.encode(result))
+        )
+
+    def save_event(self, job_id, event):
+        self._write(
+            "INSERT OR REPLACE INTO job_events (job_id, seq, event) VALUES (?, ?, ?)",
+            (job_id, event['seq'], json.dumps(event))
+        )
+
+    def load_job(self, job_id):
+        """Job dict with its events and stage results, or None if unknown"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, status, request, error, created_at, updated_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            events = conn.execute("SELECT event FROM job_events WHERE job_id = ? ORDER BY seq", (job_id,)).fetchall()
+            stages = conn.execute("SELECT stage, result FROM job_stages WHERE job_id = ?", (job_id,)).fetchall()
+        return {
+            'id': row[0],
+            'status': row[1],
+            'request': json.loads(row[2]),
+            'error': row[3],
+            'created_at': row[4],
+            'updated_at': row[5],
+            'events': [json.loads(event) for (event,) in events],
+            'stages': {stage: plan_codec.decode(result) for stage, result in stages},
+        }
+
+    def purge(self, retention_days):
+        """Delete jobs not updated within the retention window"""
+        cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat()
+        with self.lock, self._connect() as conn:
+            stale = "SELECT id FROM jobs WHERE updated_at < ?"
+            conn.execute(f"DELETE FROM job_stages WHERE job_id IN ({stale})", (cutoff,))
+            conn.execute(f"DELETE FROM job_events WHERE job_id IN ({stale})", (cutoff,))
+            conn.execute("DELETE FROM jobs WHERE updated_at < ?", (cutoff,))
+
+class LocalJobQueue:
+    """
+    In-process job queue backed by a thread pool (default backend)
+
+    Queued and running jobs stay in memory; finished jobs are kept in a small LRU and reloaded from the
+    store after eviction (without a store they are never evicted).
+    """
+
+    def __init__(self, workers=4, store=None, finished_in_memory=FINISHED_JOBS_IN_MEMORY,
+                 heartbeat_seconds=JOB_HEARTBEAT_SECONDS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="plan-worker")
+        self.store = store
+        self.heartbeat_seconds = heartbeat_seconds
+        self.jobs = {}
+        self.finished = OrderedDict()
+        self.finished_in_memory = finished_in_memory
+        self.condition = threading.Condition()
+
+    def submit(self, trip, job_id=None):
+        """
+        Queue a plan request and return its job id
+
+        Args:
+            trip (dict): Trip request
+            job_id (str): Optional plan id; submitting a known id reattaches to that job instead of starting another
+
+        Returns:
+            str: Job id
+        """
+        if job_id:
+            try:
+                self._job(job_id)
+                return job_id
+            except JobNotFound:
+                pass
+        with self.condition:
+            if job_id in self.jobs:
+                return job_id
+            job_id = job_id or uuid.uuid4().hex
+            now = datetime.now().isoformat()
+            job = {
+                'id': job_id,
+                'status': JOB_QUEUED,
+                'request': trip,
+                'events': [],
+                'stages': {},
+                'result': None,
+                'error': None,
+                'created_at': now,
+                'updated_at': now,
+            }
+            self.jobs[job_id] = job
+        if self.store:
+            self.store.save_job(job)
+        self.executor.submit(self._run, job_id)
+        return job_id
+
+    def _cached(self, job_id):
+        """In-memory job or None (caller must hold self.condition)"""
+        if job_id in self.jobs:
+            return self.jobs[job_id]
+        if job_id in self.finished:
+            self.finished.move_to_end(job_id)
+            return self.finished[job_id]
+        return None
+
+    def _retire(self, job):
+        """Move a finished job to the LRU, dropping the least recently used beyond finished_in_memory (hold self.condition)"""
+        if self.store is None:
+            return  # nothing to reload it from
+        self.jobs.pop(job['id'], None)
+        self.finished[job['id']] = job
+        while len(self.finished) > self.finished_in_memory:
+            self.finished.popitem(last=False)
+
+    def _load(self, job_id):
+        """
+        Job from the store, with finished plans rebuilt from their stored stages (no API or LLM calls).
+        Runs without self.condition held so a rebuild never blocks other callers.
+
+        Returns:
+            dict: The job, or None if unknown
+        """
+        job = self.store.load_job(job_id) if self.store else None
+        if job is None:
+            return None
+        job['result'] = None
+        if job['status'] == JOB_DONE:
+            from plan_pipeline import generate_travel_plan
+            job['result'] = generate_travel_plan(job['request'], completed=job['stages'])
+        return job
+
+    def _job(self, job_id):
+        """
+        The job, loading it from the store if it is not in memory.
+        Unfinished jobs that stopped updating (their process died) are resumed from their saved stages,
+        by whichever process claims them first. Must be called without self.condition held.
+        """
+        with self.condition:
+            job = self._cached(job_id)
+        if job is not None:
+            return job
+
+        job = self._load(job_id)
+        if job is None:
+            raise JobNotFound(job_id)
+        with self.condition:
+            cached = self._cached(job_id)
+            if cached is not None:
+                return cached  # another thread loaded it meanwhile
+            if job['status'] in FINISHED_STATES:
+                self._retire(job)
+                return job
+            idle_seconds = (datetime.now() - datetime.fromisoformat(job['updated_at'])).total_seconds()
+            if idle_seconds < STALE_JOB_SECONDS:
+                return job  # Still running in another process - serve a snapshot without taking it over
+
+        claimed_at = datetime.now().isoformat()
+        if not self.store.claim(job_id, job['updated_at'], claimed_at):
+            return job  # Touched or claimed since it was loaded
+        with self.condition:
+            cached = self._cached(job_id)
+            if cached is not None:
+                return cached
+            job['status'] = JOB_QUEUED
+            job['updated_at'] = claimed_at
+            self.jobs[job_id] = job
+        self.executor.submit(self._run, job_id)
+        return job
+
+    def _record_event(self, job_id, stage, percent, message, status=None):
+        job = self._job(job_id)
+        with self.condition:
+            if status:
+                job['status'] = status
+            job['updated_at'] = datetime.now().isoformat()
+            event = {
+                'seq': len(job['events']),
+                'stage': stage,
+                'percent': percent,
+                'message': message,
+                'time': job['updated_at'],
+            }
+            job['events'].append(event)
+            self.condition.notify_all()
+        if self.store:
+            self.store.save_event(job_id, event)
+            if status:
+                self.store.save_job(job)
+        if status in FINISHED_STATES:
+            with self.condition:
+                self._retire(job)
+
+    def _record_stage(self, job_id, stage, result):
+        job = self._job(job_id)
+        with self.condition:
+            job['stages'][stage] = result
+        if self.store:
+            self.store.save_stage(job_id, stage, result)
+
+    def _heartbeat(self, job, stopped):
+        """Touch a running job every heartbeat_seconds until stopped is set"""
+        while not stopped.wait(self.heartbeat_seconds):
+            with self.condition:
+                job['updated_at'] = datetime.now().isoformat()
+            self.store.touch(job['id'], job['updated_at'])
+
+    def _run(self, job_id):
+        from plan_pipeline import generate_travel_plan
+
+        job = self._job(job_id)
+        resumed = bool(job['stages'])
+        self._record_event(job_id, 'started', 0,
+                           "♻️ Resuming your travel plan..." if resumed else "🚀 Starting your travel plan...",
+                           status=JOB_RUNNING)
+        stopped = threading.Event()
+        if self.store:
+            threading.Thread(target=self._heartbeat, args=(job, stopped), daemon=True,
+                             name=f"plan-heartbeat-{job_id[:8]}").start()
+        try:
+            result = generate_travel_plan(
+                job['request'],
+                progress=lambda stage, percent, message: self._record_event(job_id, stage, percent, message),
+                completed=dict(job['stages']),
+                on_result=lambda stage, result: self._record_stage(job_id, stage, result)
+            )
+        except Exception as e:
+            with self.condition:
+                job['error'] = str(e)
+            self._record_event(job_id, 'failed', 100, f"❌ Plan generation failed: {e}", status=JOB_FAILED)
+            return
+        finally:
+            stopped.set()
+
+        with self.condition:
+            job['result'] = result
+        self._record_event(job_id, 'finished', 100, "✅ Travel plan ready!", status=JOB_DONE)
+
+    def get_status(self, job_id):
+        """Job metadata without the result payload"""
+        job = self._job(job_id)
+        with self.condition:
+            return {
+                'id': job['id'],
+                'status': job['status'],
+                'created_at': job['created_at'],
+                'updated_at': job['updated_at'],
+                'error': job['error'],
+                'completed_stages': sorted(job['stages']),
+                'progress': job['events'][-1] if job['events'] else None,
+            }
+
+    def get_events(self, job_id, since=0, wait=0):
+        """
+        Progress events with seq >= since
+
+        Args:
+            job_id (str): Job id
+            since (int): First event sequence number to return
+            wait (float): Seconds to block for new events when none are available (long polling)
+
+        Returns:
+            list: Event dicts
+        """
+        deadline = time.monotonic() + wait
+        while True:
+            # Re-read each round (outside the lock) so jobs owned by other processes are refreshed
+            job = self._job(job_id)
+            with self.condition:
+                remaining = deadline - time.monotonic()
+                if len(job['events']) > since or job['status'] in FINISHED_STATES or remaining <= 0:
+                    return list(job['events'][since:])
+                # Wake up at least every second
+                self.condition.wait(min(remaining, 1))
+
+    def get_result(self, job_id):
+        """Finished plan, or None while the job is still running"""
+        job = self._job(job_id)
+        with self.condition:
+            return job['result']
+
+    def iter_events(self, job_id, poll_seconds=15):
+        """Yield progress events until the job finishes"""
+        since = 0
+        while True:
+            events = self.get_events(job_id, since, wait=poll_seconds)
+            for event in events:
+                yield event
+            since += len(events)
+            if self.get_status(job_id)['status'] in FINISHED_STATES and not self.get_events(job_id, since):
+                return
+
+class RemoteJobQueue:
+    """Client for a plan_api service exposing the same interface as LocalJobQueue"""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _get(self, path, **params):
+        response = self.session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout + params.get('wait', 0))
+        if response.status_code == 404:
+            raise JobNotFound(path)
+        response.raise_for_status()
+        return response.json()
+
+    def submit(self, trip, job_id=None):
+        payload = dict(trip, job_id=job_id) if job_id else trip
+        response = self.session.post(f"{self.base_url}/plans", data=json.dumps(payload, default=str),
+                                     headers={'Content-Type': 'application/json'}, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()['job_id']
+
+    def get_status(self, job_id):
+        return self._get(f"/plans/{job_id}")
+
+    def get_events(self, job_id, since=0, wait=0):
+        return self._get(f"/plans/{job_id}/events", since=since, wait=wait)
+
+    def get_result(self, job_id):
+        response = self.session.get(f"{self.base_url}/plans/{job_id}/result", timeout=self.timeout)
+        if response.status_code == 409:
+            return None  # Not finished yet
+        if response.status_code == 404:
+            raise JobNotFound(job_id)
+        response.raise_for_status()
+        return response.json()
+
+    iter_events = LocalJobQueue.iter_events
+
+_local_queue = None
+_local_queue_lock = threading.Lock()
+
+def create_local_queue():
+    """In-process queue persisting job progress to PLAN_JOB_DB"""
+    return LocalJobQueue(workers=config.PLAN_WORKERS, store=JobStore(config.PLAN_JOB_DB))
+
+def get_job_queue():
+    """
+    Job queue for this process: the remote plan API when PLAN_API_URL is set,
+    otherwise a shared in-process queue
+    """
+    global _local_queue
+    if config.PLAN_API_URL:
+        return RemoteJobQueue(config.PLAN_API_URL)
+    with _local_queue_lock:
+        if _local_queue is None:
+            _local_queue = create_local_queue()
+        return _local_queue
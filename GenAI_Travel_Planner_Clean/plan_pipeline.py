@@ -0,0 +1,452 @@
+"""
+Plan generation pipeline for AI Travel Planner
+Runs the fetch and AI stages for one trip outside of any UI so Streamlit, batch and API callers share it.
+Multi-city trips pick their visit order first and then plan every city concurrently.
+"""
+
+import os
+import dataclasses
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime
+from agno.agent import Agent
+from agno.models.google import Gemini
+from config import config
+from rate_limiter import limiter, QuotaExceeded, RateLimitTimeout
+from travel_services import (
+    get_iata_code,
+    geocode_location,
+    generate_flight_summary,
+    generate_multi_city_summary,
+    fetch_google_restaurants,
+    fetch_business_venues,
+    fetch_google_attractions,
+    fetch_live_events,
+    fetch_google_local_info,
+)
+from flight_aggregator import search_flights, fare_matrix, leg_matrix
+from trip_routing import best_order, split_stays
+from travel_records import RecordMixin
+
+# Set environment variables for libraries that need them
+os.environ["GOOGLE_API_KEY"] = config.GOOGLE_API_KEY or ""
+
+# AI Agents
+researcher = Agent(
+    name="Researcher",
+    instructions=[
+        "Identify the travel destination specified by the user.",
+        "Gather detailed information on the destination, including climate, culture, and safety tips.",
+        "Find popular attractions, landmarks, and must-visit places.",
+        "Search for activities that match the user’s interests and travel style.",
+        "Prioritize information from reliable sources and official travel guides.",
+        "Provide well-structured summaries with key insights and recommendations."
+    ],
+    model=Gemini(id="gemini-1.5-flash"),
+    add_datetime_to_instructions=True,
+)
+
+planner = Agent(
+    name="Planner",
+    instructions=[
+        "Gather details about the user's travel preferences and budget.",
+        "Create a detailed itinerary with scheduled activities and estimated costs.",
+        "Ensure the itinerary includes transportation options and travel time estimates.",
+        "Optimize the schedule for convenience and enjoyment.",
+        "Present the itinerary in a structured format."
+    ],
+    model=Gemini(id="gemini-1.5-flash"),
+    add_datetime_to_instructions=True,
+)
+
+hotel_restaurant_finder = Agent(
+    name="Hotel & Restaurant Finder",
+    instructions=[
+        "Identify key locations in the user's travel itinerary.",
+        "Search for highly rated hotels near those locations.",
+        "Search for top-rated restaurants based on cuisine preferences and proximity.",
+        "Prioritize results based on user preferences, ratings, and availability.",
+        "Provide direct booking links or reservation options where possible."
+    ],
+    model=Gemini(id="gemini-1.5-flash"),
+    add_datetime_to_instructions=True,
+)
+
+# Defaults for trip fields the form always provides
+TRIP_DEFAULTS = {
+    'source': "Durban, South Africa",
+    'destination': "Johannesburg, South Africa",
+    'travel_theme': "💼 Business Trip",
+    'activity_preferences': "",
+    'departure_time_pref': "⏰ Any Time",
+    'return_time_pref': "⏰ Any Time",
+    'num_travelers': 1,
+    'budget': "Economy",
+    'flight_class': "economy",
+    'flex_days': 0,
+    'optimize_for': "price",
+}
+
+# Cities of a multi-city trip planned at the same time
+CITY_WORKERS = 4
+
+# Stage results used when a provider is out of quota or capacity (stages not listed fall back to an empty list)
+UNAVAILABLE_RESULTS = {'flights': [], 'fare_matrix': None, 'coords': None, 'research': "", 'itinerary': ""}
+
+def acquire_llm():
+    """
+    Take a Gemini token, waiting as long as the LLM calls already queued in this process need
+
+    Multi-city plans queue two calls per city at a fraction of a call per second, so a fixed timeout would fail
+    the later cities; the wait allowed grows with the queue instead.
+    """
+    limiter.acquire('gemini', timeout=limiter.queue_wait('gemini') + config.RATE_LIMIT_TIMEOUT)
+
+def to_date(value):
+    """Accept date objects or YYYY-MM-DD strings"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value).strip(), "%Y-%m-%d").date()
+
+def normalize_trip(trip):
+    """
+    Fill defaults and coerce types for a trip request
+
+    Args:
+        trip (dict): Trip fields as entered in the form, a CSV row or a JSON object
+
+    Returns:
+        dict: Trip with IATA codes, date objects and an integer traveler count
+
+    Raises:
+        ValueError: If the source or a destination has no known airport
+    """
+    normalized = dict(TRIP_DEFAULTS)
+    normalized.update({key: value for key, value in trip.items() if value not in (None, "")})
+    normalized['departure_date'] = to_date(normalized['departure_date'])
+    normalized['return_date'] = to_date(normalized['return_date'])
+    normalized['num_travelers'] = int(normalized['num_travelers'])
+    normalized['flex_days'] = int(normalized['flex_days'])
+    if normalized['optimize_for'] not in ('price', 'duration'):
+        raise ValueError(f"optimize_for must be 'price' or 'duration', not '{normalized['optimize_for']}'")
+
+    # Multi-city trips list their cities in destinations (a list, or "A; B; C" from CSV)
+    destinations = normalized.get('destinations')
+    if isinstance(destinations, str):
+        destinations = [city.strip() for city in destinations.split(';') if city.strip()]
+    if destinations:
+        normalized['destinations'] = list(dict.fromkeys(destinations))
+        normalized['destination'] = normalized['destinations'][0]
+        normalized['destination_iatas'] = [get_iata_code(city) for city in normalized['destinations']]
+        for city, code in zip(normalized['destinations'], normalized['destination_iatas']):
+            if not code:
+                raise ValueError(f"No airport found for destination '{city}'")
+    else:
+        normalized.pop('destinations', None)
+
+    for field in ('source', 'destination'):
+        normalized[f'{field}_iata'] = get_iata_code(normalized[field])
+        if not normalized[f'{field}_iata']:
+            raise ValueError(f"No airport found for {field} '{normalized[field]}'")
+    return normalized
+
+def get_car_rental_url(destination_iata, departure_date, return_date):
+    """Generate Skyscanner car hire URL for the destination airport"""
+    pickup_date_str = departure_date.strftime('%Y-%m-%dT10:00')
+    dropoff_date_str = return_date.strftime('%Y-%m-%dT10:00')
+    # Note: Using generic location ID format - Skyscanner will redirect properly
+    return f"https://www.skyscanner.com/carhire/results/{destination_iata}/{destination_iata}/{pickup_date_str}/{dropoff_date_str}/30/"
+
+def fetch_destination_data(destination, activity_preferences_list=("",)):
+    """
+    Fetch the destination-level data that every trip to a destination shares
+
+    Args:
+        destination (str): City, Country string
+        activity_preferences_list (iterable): Distinct activity preferences to fetch attractions for
+
+    Returns:
+        dict: coords, local_info and attractions keyed by activity preferences
+    """
+    coords = geocode_location(destination)
+    return {
+        'coords': coords,
+        'local_info': fetch_google_local_info(destination),
+        'attractions': {
+            prefs: fetch_google_attractions(destination, prefs, coords=coords)
+            for prefs in activity_preferences_list
+        }
+    }
+
+def _run_research(trip, results):
+    attraction_data = results['attractions']
+    live_events = results['live_events']
+    local_info = results['local_info']
+    research_prompt = (
+        f"Based on real-time data for {trip['destination']}, provide comprehensive travel insights:\n"
+        f"- Popular Attractions: {', '.join([a.get('name', 'Attraction') for a in attraction_data[:5]]) if attraction_data else 'Research local attractions'}\n"
+        f"- Upcoming Events: {', '.join([e.get('title', 'Event') for e in live_events[:3]]) if live_events else 'Check local event listings'}\n"
+        f"- Local Highlights: {', '.join([info.get('category', 'Local info') for info in local_info[:3]]) if local_info else 'General destination information'}\n"
+        f"Create a detailed guide covering:\n"
+        f"1. Must-visit attractions and activities for a {trip['travel_theme'].lower()} trip\n"
+        f"2. Live events and happenings during travel dates\n"
+        f"3. Local culture and customs\n"
+        f"4. Weather and best time to visit\n"
+        f"5. Safety tips and transportation\n"
+        f"6. Recommendations based on traveler preferences: {trip['activity_preferences']}\n"
+        f"Trip duration: {results['trip_duration']} days, Budget: {trip['budget']}, Flight Class: {trip['flight_class']}\n"
+        f"Focus on providing practical, actionable travel advice without technical data."
+    )
+    acquire_llm()
+    return researcher.run(research_prompt, stream=False).content
+
+def _run_itinerary(trip, results):
+    restaurant_data = results['restaurants']
+    attraction_data = results['attractions']
+    live_events = results['live_events']
+
+    # Create a clean summary for the AI instead of raw JSON
+    flight_info_summary = f"Flight booking available from {trip['source_iata']} to {trip['destination_iata']}, check Skyscanner for current prices and availability"
+    if results.get('flights'):
+        cheapest = results['flights'][0]
+        flight_info_summary = (f"Live fares from {trip['source_iata']} to {trip['destination_iata']} start at {cheapest.get('price')} "
+                               f"({cheapest.get('airline')}, {cheapest.get('stops', 0)} stop(s), {cheapest.get('total_duration')})")
+    car_rental_summary = "Car rental options available via Skyscanner"
+    restaurant_summary = f"Featured restaurants include {', '.join([r.get('name', 'Restaurant') for r in restaurant_data[:3]]) if restaurant_data else 'local dining options'}"
+    attraction_summary = f"Top attractions include {', '.join([a.get('name', 'Attraction') for a in attraction_data[:3]]) if attraction_data else 'local points of interest'}"
+    events_summary = f"Live events during your visit: {', '.join([e.get('title', 'Various events') for e in live_events[:3]]) if live_events else 'Check local listings'}"
+
+    planning_prompt = (
+        f"Create a detailed {results['trip_duration']}-day itinerary for a {trip['travel_theme'].lower()} trip to {trip['destination']}. "
+        f"Use this information to create recommendations:\n\n"
+        f"AVAILABLE SERVICES:\n"
+        f"- Flights: {flight_info_summary}\n"
+        f"- Transportation: {car_rental_summary}\n"
+        f"- Dining: {restaurant_summary}\n"
+        f"- Attractions: {attraction_summary}\n"
+        f"- Events: {events_summary}\n\n"
+        f"TRAVELER PREFERENCES:\n"
+        f"- Activities: {trip['activity_preferences']}\n"
+        f"- Budget: {trip['budget']}\n"
+        f"- Flight Class: {trip['flight_class']}\n"
+        f"- Departure Time Preference: {trip['departure_time_pref']}\n"
+        f"- Return Time Preference: {trip['return_time_pref']}\n\n"
+        f"RESEARCH INSIGHTS:\n{results['research']}\n\n"
+        f"CRITICAL FORMATTING INSTRUCTIONS:\n"
+        f"- Use ONLY plain text and basic markdown formatting\n"
+        f"- NO HTML tags whatsoever (no <div>, <span>, <style>, etc.)\n"
+        f"- NO CSS styling or HTML formatting\n"
+        f"- Use simple markdown: # for headers, ** for bold, - for bullets\n"
+        f"- Create clear, readable text that displays properly in a travel app\n"
+        f"- Focus on practical travel information with specific times and locations\n\n"
+        f"Create a detailed day-by-day itinerary including recommended restaurants, attractions, and events from the available data."
+    )
+    acquire_llm()
+    return planner.run(planning_prompt, stream=False).content
+
+# Plan stages in execution order: (key, progress percent, status message, runner)
+PLAN_STAGES = [
+    ('flight_summary', 10, "🛫 Preparing flight booking information...",
+     lambda trip, results: generate_flight_summary(trip['source_iata'], trip['destination_iata'], trip['departure_date'], trip['return_date'], trip['num_travelers'], trip['flight_class'])),
+    ('flights', 15, "✈️ Comparing live flight offers...",
+     lambda trip, results: search_flights(trip['source_iata'], trip['destination_iata'], trip['departure_date'], trip['return_date'], trip['num_travelers'], trip['departure_time_pref'], trip['return_time_pref'], trip['flight_class'])),
+    ('fare_matrix', 18, "📅 Comparing nearby travel dates...",
+     lambda trip, results: fare_matrix(trip['source_iata'], trip['destination_iata'], trip['departure_date'], trip['return_date'], trip['flex_days'], trip['num_travelers'], trip['flight_class']) if trip['flex_days'] else None),
+    ('coords', 20, "📍 Locating your destination...",
+     lambda trip, results: geocode_location(trip['destination'])),
+    ('restaurants', 25, "🍽️ Discovering local restaurants...",
+     lambda trip, results: fetch_google_restaurants(trip['destination'], budget=trip['budget'], travel_theme=trip['travel_theme'], coords=results['coords'])),
+    ('business_venues', 40, "💼 Finding business venues...",
+     lambda trip, results: fetch_business_venues(trip['destination'], coords=results['coords']) if "Business" in trip['travel_theme'] else []),
+    ('attractions', 55, "🎯 Exploring attractions and activities...",
+     lambda trip, results: fetch_google_attractions(trip['destination'], trip['activity_preferences'], coords=results['coords'])),
+    ('live_events', 70, "🎉 Checking for live events...",
+     lambda trip, results: fetch_live_events(trip['destination'], trip['departure_date'], trip['return_date'])),
+    ('local_info', 80, "ℹ️ Gathering local insights...",
+     lambda trip, results: fetch_google_local_info(trip['destination'])),
+    ('research', 90, "🔍 Analyzing destination data...", _run_research),
+    ('itinerary', 95, "🗺️ Creating your personalized itinerary...", _run_itinerary),
+]
+
+def generate_travel_plan(trip, progress=None, completed=None, on_result=None):
+    """
+    Run every plan stage for a trip
+
+    Args:
+        trip (dict): Trip request (see normalize_trip)
+        progress (callable): Optional progress(stage, percent, message) callback
+        completed (dict): Stage results already available, e.g. shared destination data
+            or stages saved by an interrupted job; these stages are skipped
+        on_result (callable): Optional on_result(stage, result) callback after each stage finishes
+
+    Returns:
+        dict: The normalized trip plus one entry per stage, the car rental URL and trip duration
+    """
+    trip = normalize_trip(trip)
+    if trip.get('destinations'):
+        return generate_multi_city_plan(trip, progress, completed, on_result)
+    results = dict(completed or {})
+
+    # Calculate trip duration from dates
+    trip_duration = (trip['return_date'] - trip['departure_date']).days
+    results['trip_duration'] = trip_duration if trip_duration > 0 else 1  # Minimum 1 day trip
+
+    for stage, percent, message, runner in PLAN_STAGES:
+        if stage in results:
+            continue
+        if progress:
+            progress(stage, percent, message)
+        try:
+            results[stage] = runner(trip, results)
+        except (QuotaExceeded, RateLimitTimeout) as e:
+            # Plan without this stage; it is not reported as completed, so a resumed job tries it again
+            results[stage] = UNAVAILABLE_RESULTS.get(stage, [])
+            results.setdefault('unavailable', {})[stage] = str(e)
+            continue
+        if on_result:
+            on_result(stage, results[stage])
+
+    plan = dict(trip)
+    plan.update(results)
+    plan['car_rental_url'] = get_car_rental_url(trip['destination_iata'], trip['departure_date'], trip['return_date'])
+    return plan
+
+def _labelled(item, city):
+    """Local info item with its category prefixed by the city it describes"""
+    category = f"{city.split(',')[0]}: {item.get('category', 'Local info')}"
+    return dataclasses.replace(item, category=category) if isinstance(item, RecordMixin) else dict(item, category=category)
+
+def generate_multi_city_plan(trip, progress=None, completed=None, on_result=None):
+    """
+    Plan a trip through several destinations, visiting them in the cheapest or quickest order
+
+    The order comes from a pairwise leg matrix (exact for small trips, heuristic beyond; see trip_routing).
+    The trip's nights are then split across the cities and every city is planned concurrently as a stay
+    reached by a one-way flight from the previous city. City plans are combined into one plan shaped like
+    a single-destination plan, with the route, legs and per-city plans added.
+
+    Args:
+        trip (dict): Normalized trip with destinations and destination_iatas
+        progress (callable): Optional progress(stage, percent, message) callback
+        completed (dict): Stage results already available ('route', 'city:<IATA>', 'return_flights')
+        on_result (callable): Optional on_result(stage, result) callback after each stage finishes
+
+    Returns:
+        dict: The trip plus route, legs and cities, and the single-destination plan keys over all cities
+
+    Raises:
+        ValueError: If the trip has more than MULTI_CITY_MAX_DESTINATIONS destinations
+    """
+    if len(trip['destinations']) > config.MULTI_CITY_MAX_DESTINATIONS:
+        raise ValueError(f"A multi-city trip can visit at most {config.MULTI_CITY_MAX_DESTINATIONS} destinations, "
+                         f"not {len(trip['destinations'])}")
+    progress = progress or (lambda stage, percent, message: None)
+    on_result = on_result or (lambda stage, result: None)
+    results = dict(completed or {})
+    home = trip['source_iata']
+
+    if 'route' not in results:
+        progress('route', 10, "🗺️ Finding the best order to visit your cities...")
+        codes = [home] + trip['destination_iatas']
+        matrix = leg_matrix(codes, trip['departure_date'], trip['num_travelers'], trip['flight_class'])
+        order, total, method = best_order(matrix['minutes' if trip['optimize_for'] == 'duration' else 'prices'])
+        results['route'] = {
+            'cities': [trip['destinations'][index - 1] for index in order],
+            'codes': [codes[index] for index in order],
+            'objective': trip['optimize_for'],
+            'total': round(total, 2),
+            'currency': matrix['currency'],
+            'method': method,
+            'estimated_legs': matrix['estimated'],
+        }
+        on_result('route', results['route'])
+
+    route = results['route']
+    stays = split_stays(trip['departure_date'], trip['return_date'], len(route['codes']))
+    sources = [trip['source']] + route['cities'][:-1]
+    source_codes = [home] + route['codes'][:-1]
+    legs = [(source_codes[index], code, stays[index][0]) for index, code in enumerate(route['codes'])]
+    legs.append((route['codes'][-1], home, stays[-1][1]))
+
+    def plan_city(index):
+        origin, destination, day = legs[index]
+        city_trip = {key: value for key, value in trip.items() if key not in ('destinations', 'destination_iatas')}
+        city_trip.update(source=sources[index], destination=route['cities'][index], departure_date=stays[index][0],
+                         return_date=stays[index][1], flex_days=0)
+        return generate_travel_plan(city_trip, completed={
+            'flight_summary': generate_multi_city_summary([legs[index]], trip['num_travelers'], trip['flight_class']),
+            'flights': search_flights(origin, destination, day, None, trip['num_travelers'],
+                                      trip['departure_time_pref'], trip['return_time_pref'], trip['flight_class']),
+            'fare_matrix': None,
+        })
+
+    def return_flights():
+        origin, destination, day = legs[-1]
+        return search_flights(origin, destination, day, None, trip['num_travelers'], trip['return_time_pref'],
+                              travel_class=trip['flight_class'])
+
+    tasks = {f"city:{code}": functools.partial(plan_city, index) for index, code in enumerate(route['codes'])}
+    tasks['return_flights'] = return_flights
+    remaining = [stage for stage in tasks if stage not in results]
+    with ThreadPoolExecutor(max_workers=CITY_WORKERS, thread_name_prefix="city-plan") as pool:
+        futures = {pool.submit(tasks[stage]): stage for stage in remaining}
+        for done, future in enumerate(as_completed(futures), 1):
+            stage = futures[future]
+            results[stage] = future.result()
+            on_result(stage, results[stage])
+            name = "return flights" if stage == 'return_flights' else results[stage]['destination']
+            progress(stage, 20 + 75 * done // len(remaining), f"🏙️ Planned {name} ({done}/{len(remaining)})...")
+
+    cities = [results[f"city:{code}"] for code in route['codes']]
+    plan = dict(trip)
+    plan.update({
+        'route': route,
+        'legs': [{'from': origin, 'to': destination, 'date': day,
+                  'flights': cities[index]['flights'] if index < len(cities) else results['return_flights']}
+                 for index, (origin, destination, day) in enumerate(legs)],
+        'cities': cities,
+        'destination': " → ".join(route['cities']),
+        'destination_iata': route['codes'][0],
+        'return_date': stays[-1][1],
+        'trip_duration': (stays[-1][1] - stays[0][0]).days,
+        'flight_summary': generate_multi_city_summary(legs, trip['num_travelers'], trip['flight_class']),
+        'flights': cities[0]['flights'],
+        'fare_matrix': None,
+        'coords': cities[0]['coords'],
+        'local_info': [_labelled(item, city['destination']) for city in cities for item in city['local_info'] or []],
+        'research': "\n\n".join(f"## 📍 {city['destination']}\n\n{city['research']}" for city in cities),
+        'itinerary': "\n\n".join(
+            f"# 📍 {city['destination']} ({to_date(city['departure_date']):%b %d} - {to_date(city['return_date']):%b %d})\n\n"
+            f"{city['itinerary']}" for city in cities),
+        'car_rental_url': cities[0]['car_rental_url'],
+    })
+    for key in ('restaurants', 'business_venues', 'attractions', 'live_events'):
+        plan[key] = [item for city in cities for item in city[key] or []]
+    return plan
+
+def plan_notices(plan):
+    """
+    Notices about data a plan is missing, for the app to show on its own thread (fetchers run on worker
+    threads, where Streamlit calls have no page to render into)
+
+    Args:
+        plan (dict): Plan from generate_travel_plan
+
+    Returns:
+        list: {'level': 'warning' or 'info', 'message': str} dicts
+    """
+    notices = []
+    for city in plan.get('cities') or [plan]:
+        if 'coords' in city and not city['coords']:
+            notices.append({'level': 'warning', 'message': f"Could not find coordinates for {city['destination']}; "
+                                                           f"nearby restaurants and attractions may be missing"})
+    for city in plan.get('cities') or [plan]:
+        for stage, reason in (city.get('unavailable') or {}).items():
+            notices.append({'level': 'warning', 'message': f"{stage.replace('_', ' ').capitalize()} for {city['destination']} "
+                                                           f"is unavailable right now ({reason}); try again later"})
+    if 'flights' in plan and not plan['flights']:
+        notices.append({'level': 'info', 'message': "No live fares were found for these dates; "
+                                                    "use the Skyscanner link for current prices"})
+    return notices
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Destination prefetch for AI Travel Planner
+Warms the fetch cache for every offered destination and travel theme so interactive plans hit the cache
+
+Usage:
+    python prefetch_destinations.py --budget google_places=2000,serpapi=300
+    python prefetch_destinations.py --cities "Cape Town, South Africa" --min-ttl 86400
+
+Cron (nightly at 02:30):
+    30 2 * * * cd /path/to/GenAI_Travel_Planner_Clean && python prefetch_destinations.py >> user_data/prefetch.log 2>&1
+"""
+
+import argparse
+import sys
+import time
+from datetime import date
+from fetch_cache import cache
+from fare_cache import fare_cache
+from rate_limiter import limiter, QuotaExceeded, RateLimitTimeout
+from travel_services import (
+    FEATURED_CITIES,
+    TRAVEL_THEMES,
+    BUDGET_LEVELS,
+    should_use_google_places,
+    geocode_location,
+    get_restaurant_search_query,
+    get_price_level,
+    search_google_restaurants,
+    fetch_business_venues,
+    fetch_google_attractions,
+    fetch_google_local_info,
+    fetch_monthly_events,
+)
+
+def parse_budget(value):
+    """
+    Parse a provider call budget like "google_places=2000,serpapi=300"
+
+    Returns:
+        dict: provider -> maximum calls for this run
+    """
+    budget = {}
+    for part in filter(None, (part.strip() for part in value.split(','))):
+        provider, _, calls = part.partition('=')
+        budget[provider.strip()] = int(calls)
+    return budget
+
+def upcoming_months(count=2, today=None):
+    """Month strings ("October 2026") for this month and the following ones, as event searches use them"""
+    today = today or date.today()
+    months = []
+    for offset in range(count):
+        year, month = divmod(today.month - 1 + offset, 12)
+        months.append(date(today.year + year, month + 1, 1).strftime("%B %Y"))
+    return months
+
+def destination_tasks(city, themes=TRAVEL_THEMES, budgets=BUDGET_LEVELS, months=None):
+    """
+    Cache warm-up tasks for one destination, covering every query a plan for any theme and budget makes
+
+    Returns:
+        list: (provider, label, warm) tuples; warm(min_ttl) returns whether it fetched
+    """
+    tasks = []
+    if should_use_google_places():
+        tasks.append(('google_places', 'geocode', lambda min_ttl: geocode_location.warm(city, min_ttl=min_ttl)))
+
+        # Themes and budgets collapse to a handful of distinct restaurant searches
+        searches = sorted({(get_restaurant_search_query(travel_theme=theme), get_price_level(level))
+                           for theme in themes for level in budgets})
+        for search_query, min_price in searches:
+            tasks.append(('google_places', f"restaurants '{search_query}' price {min_price}",
+                          lambda min_ttl, q=search_query, p=min_price: search_google_restaurants.warm(
+                              city, q, p, coords=geocode_location(city), min_ttl=min_ttl)))
+
+        if any("Business" in theme for theme in themes):
+            tasks.append(('google_places', 'business venues', lambda min_ttl: fetch_business_venues.warm(
+                city, coords=geocode_location(city), min_ttl=min_ttl)))
+        tasks.append(('google_places', 'attractions', lambda min_ttl: fetch_google_attractions.warm(
+            city, "", coords=geocode_location(city), min_ttl=min_ttl)))
+
+    tasks.append(('serpapi', 'local info', lambda min_ttl: fetch_google_local_info.warm(city, min_ttl=min_ttl)))
+    for month_year in months or upcoming_months():
+        tasks.append(('serpapi', f"events {month_year}",
+                      lambda min_ttl, m=month_year: fetch_monthly_events.warm(city, m, min_ttl=min_ttl)))
+    return tasks
+
+def run_prefetch(cities, budget, min_ttl=0, log=sys.stderr):
+    """
+    Warm the cache for each city, skipping a provider's tasks once its call budget is spent
+
+    Args:
+        cities (list): City, Country strings
+        budget (dict): provider -> maximum calls for this run (providers not listed are unlimited)
+        min_ttl (float): Refresh entries expiring within this many seconds; fresher entries are left alone
+        log: Stream for progress lines
+
+    Returns:
+        dict: Counts of fetched, fresh, skipped and failed tasks, purged cache entries,
+            calls spent per provider and elapsed seconds
+    """
+    started = time.time()
+    baseline = {provider: metric['acquired'] for provider, metric in limiter.get_metrics().items()}
+    exhausted = set()
+    stats = {'fetched': 0, 'fresh': 0, 'skipped': 0, 'failed': 0}
+
+    def spent(provider):
+        return limiter.get_metrics().get(provider, {}).get('acquired', 0) - baseline.get(provider, 0)
+
+    for city in cities:
+        for provider, label, warm in destination_tasks(city):
+            if provider in exhausted or (provider in budget and spent(provider) >= budget[provider]):
+                exhausted.add(provider)
+                stats['skipped'] += 1
+                continue
+            try:
+                fetched = warm(min_ttl)
+            except (QuotaExceeded, RateLimitTimeout) as e:
+                print(f"⚠️ {city}: {label} - {e}; skipping remaining {provider} tasks", file=log)
+                exhausted.add(provider)
+                stats['skipped'] += 1
+                continue
+            except Exception as e:
+                print(f"❌ {city}: {label} - {e}", file=log)
+                stats['failed'] += 1
+                continue
+            stats['fetched' if fetched else 'fresh'] += 1
+            if fetched:
+                print(f"🔄 {city}: {label}", file=log)
+
+    stats['purged'] = cache.purge_expired() + fare_cache.purge_expired()
+    stats['spent'] = {provider: spent(provider) for provider in ('google_places', 'serpapi')}
+    stats['elapsed_seconds'] = round(time.time() - started, 1)
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm the fetch cache for every destination and travel theme")
+    parser.add_argument('--cities', nargs='+', default=FEATURED_CITIES,
+                        help="Destinations to warm (default: the featured cities offered in the planner)")
+    parser.add_argument('--budget', type=parse_budget, default={},
+                        help="Maximum provider calls for this run, e.g. google_places=2000,serpapi=300")
+    parser.add_argument('--min-ttl', type=float, default=6 * 3600,
+                        help="Refresh entries expiring within this many seconds (default: 21600)")
+    args = parser.parse_args(argv)
+
+    stats = run_prefetch(args.cities, args.budget, min_ttl=args.min_ttl)
+    spent = ", ".join(f"{provider} {calls}" for provider, calls in stats['spent'].items())
+    print(f"✅ Prefetched {len(args.cities)} destinations in {stats['elapsed_seconds']}s: "
+          f"{stats['fetched']} refreshed, {stats['fresh']} already fresh, {stats['skipped']} skipped over budget, "
+          f"{stats['failed']} failed, {stats['purged']} expired entries purged (calls: {spent})", file=sys.stderr)
+    return 0 if stats['failed'] == 0 else 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""
+Provider rate limiting for AI Travel Planner
+Token buckets and daily quota ceilings per API provider, shared across threads and
+worker processes through a local SQLite file
+"""
+
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import date
+from pathlib import Path
+from config import config
+
+class QuotaExceeded(Exception):
+    """Raised when a provider's daily quota ceiling has been reached"""
+
+class RateLimitTimeout(Exception):
+    """Raised when a token could not be acquired within the timeout"""
+
+class ProviderDisabled(QuotaExceeded):
+    """Raised for a provider configured with qps 0 (no calls allowed)"""
+
+def check_limits(limits):
+    """
+    Validate per-provider limits
+
+    Args:
+        limits (dict): provider -> {'qps', 'daily_quota', optional 'burst'}; qps 0 disables a provider
+
+    Returns:
+        dict: The limits
+
+    Raises:
+        ValueError: A qps, burst or daily quota is negative
+    """
+    for provider, limit in limits.items():
+        for name in ('qps', 'burst', 'daily_quota'):
+            if limit.get(name, 0) < 0:
+                raise ValueError(f"{provider} {name} must not be negative, got {limit[name]}")
+    return limits
+
+class RateLimiter:
+    """
+    Token bucket per provider with a daily quota ceiling.
+
+    Bucket state lives in SQLite so every thread and process on the host draws from the
+    same buckets. Waiters in a process are served first-in first-out: only the oldest
+    waiter for a provider competes for the next token.
+    """
+
+    def __init__(self, path, limits, timeout=30):
+        self.path = path
+        self.limits = check_limits(limits)
+        self.timeout = timeout
+        self.condition = threading.Condition()
+        self.waiters = {}
+        self.metrics = {}
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS buckets (
+                    provider TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS daily_usage (
+                    provider TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    used INTEGER NOT NULL,
+                    PRIMARY KEY (provider, day)
+                );
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _limit(self, provider):
+        return self.limits.get(provider, {'qps': 1.0, 'daily_quota': 0})
+
+    def _metric(self, provider):
+        return self.metrics.setdefault(provider, {
+            'acquired': 0,
+            'waited_seconds': 0.0,
+            'max_wait_seconds': 0.0,
+            'quota_rejections': 0,
+            'timeouts': 0,
+        })
+
+    def _try_take(self, provider, cost):
+        """
+        Refill and take tokens in one transaction
+
+        Returns:
+            float: 0 if tokens were taken, otherwise seconds until enough tokens are available
+        """
+        limit = self._limit(provider)
+        rate = limit['qps']
+        if rate == 0:
+            raise ProviderDisabled(f"{provider} is disabled ({provider.upper()}_QPS=0)")
+        burst = max(1.0, limit.get('burst', rate))
+        today = date.today().isoformat()
+        now = time.time()
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE provider = ?", (provider,)).fetchone()
+            tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+
+            if limit['daily_quota']:
+                used = conn.execute(
+                    "SELECT used FROM daily_usage WHERE provider = ? AND day = ?", (provider, today)
+                ).fetchone()
+                if (used[0] if used else 0) + cost > limit['daily_quota']:
+                    conn.execute("ROLLBACK")
+                    raise QuotaExceeded(f"{provider} daily quota of {limit['daily_quota']} calls reached")
+
+            if tokens < cost:
+                conn.execute("ROLLBACK")
+                return (cost - tokens) / rate
+
+            conn.execute("INSERT OR REPLACE INTO buckets (provider, tokens, updated_at) VALUES (?, ?, ?)",
+                         (provider, tokens - cost, now))
+            conn.execute("""
+                INSERT INTO daily_usage (provider, day, used) VALUES (?, ?, ?)
+                ON CONFLICT (provider, day) DO UPDATE SET used = used + excluded.used
+            """, (provider, today, cost))
+            conn.execute("COMMIT")
+            return 0
+        finally:
+            conn.close()
+
+    def acquire(self, provider, cost=1, timeout=None):
+        """
+        Block until the provider has capacity for a call
+
+        Args:
+            provider (str): Provider name, e.g. 'google_places', 'serpapi', 'gemini', 'amadeus'
+            cost (int): Tokens (calls) to take
+            timeout (float): Maximum seconds to wait; defaults to the limiter timeout
+
+        Returns:
+            float: Seconds spent waiting
+
+        Raises:
+            QuotaExceeded: The daily quota ceiling would be exceeded
+            RateLimitTimeout: No capacity within the timeout
+        """
+        started = time.monotonic()
+        deadline = started + (self.timeout if timeout is None else timeout)
+        ticket = object()
+
+        with self.condition:
+            queue = self.waiters.setdefault(provider, deque())
+            queue.append(ticket)
+        try:
+            while True:
+                with self.condition:
+                    # First in, first out: wait until this caller is the oldest waiter
+                    while queue[0] is not ticket:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self.condition.wait(remaining)
+                    is_head = queue[0] is ticket
+
+                remaining = deadline - time.monotonic()
+                if is_head:
+                    try:
+                        wait = self._try_take(provider, cost)
+                    except QuotaExceeded:
+                        with self.condition:
+                            self._metric(provider)['quota_rejections'] += 1
+                        raise
+                    if wait == 0:
+                        break
+                    if wait < remaining:
+                        time.sleep(wait)
+                        continue
+
+                with self.condition:
+                    self._metric(provider)['timeouts'] += 1
+                raise RateLimitTimeout(f"No {provider} capacity within {self.timeout if timeout is None else timeout}s")
+        finally:
+            with self.condition:
+                queue.remove(ticket)
+                self.condition.notify_all()
+
+        waited = time.monotonic() - started
+        with self.condition:
+            metric = self._metric(provider)
+            metric['acquired'] += 1
+            metric['waited_seconds'] += waited
+            metric['max_wait_seconds'] = max(metric['max_wait_seconds'], waited)
+        return waited
+
+    def queue_wait(self, provider, cost=1):
+        """
+        Seconds the callers already waiting for provider in this process need before a new caller is served
+
+        Callers queued behind their own concurrent calls (e.g. the LLM stages of a multi-city plan) add this
+        to their acquire timeout so a long queue is not mistaken for a stalled provider.
+        """
+        rate = self._limit(provider)['qps']
+        with self.condition:
+            queued = len(self.waiters.get(provider, ()))
+        return queued * cost / rate if rate else 0.0
+
+    def get_metrics(self):
+        """
+        Per-provider counters for this process plus shared daily usage
+
+        Returns:
+            dict: provider -> metrics dict
+        """
+        today = date.today().isoformat()
+        with self._connect() as conn:
+            usage = dict(conn.execute("SELECT provider, used FROM daily_usage WHERE day = ?", (today,)).fetchall())
+        with self.condition:
+            metrics = {}
+            for provider in sorted(set(self.limits) | set(self.metrics) | set(usage)):
+                metric = dict(self._metric(provider))
+                metric['queued'] = len(self.waiters.get(provider, ()))
+                metric['daily_used'] = usage.get(provider, 0)
+                metric['daily_quota'] = self._limit(provider)['daily_quota']
+                metrics[provider] = metric
+        return metrics
+
+class RateLimitedClient:
+    """Proxy that takes a provider token before every method call on an API client"""
+
+    def __init__(self, client, provider, limiter=None):
+        self._client = client
+        self._provider = provider
+        self._limiter = limiter
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def limited_call(*args, **kwargs):
+            (self._limiter or limiter).acquire(self._provider)
+            return attr(*args, **kwargs)
+
+        return limited_call
+
+# Shared limiter for this process
+limiter = RateLimiter(config.RATE_LIMIT_DB, config.PROVIDER_LIMITS, timeout=config.RATE_LIMIT_TIMEOUT)
@@ -0,0 +1,213 @@
+"""
+Session memory accounting for AI Travel Planner
+Approximate per-session state sizes, a per-session cap, and offloading of large plan payloads
+to a disk-backed store that leaves only a small handle in session state
+"""
+
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, fields, is_dataclass
+from pathlib import Path
+from config import config
+import plan_codec
+
+# Session state keys holding plan payloads that may be moved to disk; every reader of these keys must go
+# through SessionMemory.load, which resolves the handle left in their place
+OFFLOADABLE_KEYS = ('plan_snapshot', 'travel_plan_data')
+
+@dataclass(frozen=True)
+class PayloadHandle:
+    """Stands in for an offloaded session value"""
+    payload_id: str
+    size: int
+
+class PayloadStore:
+    """
+    SQLite store for offloaded session payloads, encoded with plan_codec (so tuples come back as lists and
+    dates as ISO strings, like any stored plan)
+
+    Payloads not read within retention_seconds belong to abandoned sessions; they are purged at start-up
+    and then on writes, at most every purge_interval seconds.
+    """
+
+    def __init__(self, path, retention_seconds=24 * 3600, purge_interval=3600):
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self.purge_interval = purge_interval
+        self.purged_at = 0.0
+        self.lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS payloads (
+                    id TEXT PRIMARY KEY,
+                    payload BLOB NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+        self.purge()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def put(self, value):
+        """Store a value and return its payload id"""
+        if time.time() - self.purged_at >= self.purge_interval:
+            self.purge()
+        payload_id = uuid.uuid4().hex
+        with self.lock, self._connect() as conn:
+            conn.execute("INSERT INTO payloads (id, payload, accessed_at) VALUES (?, ?, ?)",
+                         (payload_id, plan_codec.encode(value), time.time()))
+        return payload_id
+
+    def get(self, payload_id):
+        """Stored value, or None if it was purged (or written in an older format than plan_codec)"""
+        with self.lock, self._connect() as conn:
+            row = conn.execute("SELECT payload FROM payloads WHERE id = ?", (payload_id,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE payloads SET accessed_at = ? WHERE id = ?", (time.time(), payload_id))
+        try:
+            return plan_codec.decode(row[0])
+        except ValueError:
+            return None
+
+    def delete(self, payload_id):
+        with self.lock, self._connect() as conn:
+            conn.execute("DELETE FROM payloads WHERE id = ?", (payload_id,))
+
+    def purge(self):
+        """Delete payloads not read within the retention window (their sessions are long gone); returns how many"""
+        self.purged_at = time.time()
+        with self.lock, self._connect() as conn:
+            return conn.execute("DELETE FROM payloads WHERE accessed_at < ?",
+                                (self.purged_at - self.retention_seconds,)).rowcount
+
+def estimate_size(value, seen=None):
+    """
+    Approximate deep size of a value in bytes
+
+    Follows dicts, sequences, sets, dataclass records and object attributes; shared objects count once.
+    """
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, bytearray, int, float, bool)) or value is None:
+        return size
+    if isinstance(value, dict):
+        return size + sum(estimate_size(key, seen) + estimate_size(item, seen) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(estimate_size(item, seen) for item in value)
+    if is_dataclass(value):
+        return size + sum(estimate_size(getattr(value, field.name), seen) for field in fields(value))
+    if hasattr(value, '__dict__'):
+        return size + estimate_size(vars(value), seen)
+    return size
+
+class SessionMemory:
+    """
+    Per-session memory accounting with a cap.
+
+    Offloadable payloads larger than offload_bytes always go to disk; if a session is still over
+    cap_bytes, remaining offloadable payloads go too, largest first. Measuring walks all of a session's
+    state, so it runs when a plan payload is stored and when an admin views the totals, not on every rerun.
+    """
+
+    def __init__(self, store, cap_bytes, offload_bytes, offloadable=OFFLOADABLE_KEYS):
+        self.store = store
+        self.cap_bytes = cap_bytes
+        self.offload_bytes = offload_bytes
+        self.offloadable = offloadable
+        self.lock = threading.Lock()
+        self.sessions = {}
+        self.over_cap_events = 0
+
+    def account(self, session_id, state):
+        """
+        Measure a session's state, offload plan payloads as needed and record the result
+
+        Args:
+            session_id (str): Session identifier
+            state: st.session_state or any mutable mapping
+
+        Returns:
+            dict: bytes, per-key sizes, offloaded keys and whether the session is over its cap
+        """
+        sizes = {key: estimate_size(state[key]) for key in list(state.keys())}
+        candidates = sorted((key for key in self.offloadable
+                             if key in sizes and not isinstance(state[key], PayloadHandle)),
+                            key=sizes.get, reverse=True)
+        for key in candidates:
+            if sizes[key] > self.offload_bytes or sum(sizes.values()) > self.cap_bytes:
+                state[key] = PayloadHandle(self.store.put(state[key]), sizes[key])
+                sizes[key] = estimate_size(state[key])
+
+        offloaded = {key: state[key].size for key in self.offloadable
+                     if key in sizes and isinstance(state[key], PayloadHandle)}
+        total = sum(sizes.values())
+        report = {
+            'bytes': total,
+            'keys': sizes,
+            'offloaded': offloaded,
+            'over_cap': total > self.cap_bytes,
+            'updated_at': time.time(),
+        }
+        with self.lock:
+            self.sessions[session_id] = report
+            self.over_cap_events += report['over_cap']
+        return report
+
+    def load(self, state, key, default=None):
+        """Session value, read back from disk if it was offloaded"""
+        value = state.get(key, default)
+        if not isinstance(value, PayloadHandle):
+            return value
+        stored = self.store.get(value.payload_id)
+        if stored is None:
+            del state[key]
+            return default
+        return stored
+
+    def discard(self, state, key):
+        """Remove a session value and any offloaded payload behind it"""
+        value = state.get(key)
+        if isinstance(value, PayloadHandle):
+            self.store.delete(value.payload_id)
+        state.pop(key, None)
+
+    def get_metrics(self, active_seconds=3600):
+        """
+        Totals across sessions accounted within active_seconds
+
+        Returns:
+            dict: sessions, total_bytes, largest_bytes, offloaded_bytes, over_cap (sessions now over the cap),
+                over_cap_events (runs that ended over the cap since start-up), cap_bytes
+        """
+        cutoff = time.time() - active_seconds
+        with self.lock:
+            for session_id in [sid for sid, report in self.sessions.items() if report['updated_at'] < cutoff]:
+                del self.sessions[session_id]
+            reports = list(self.sessions.values())
+            over_cap_events = self.over_cap_events
+        return {
+            'sessions': len(reports),
+            'total_bytes': sum(report['bytes'] for report in reports),
+            'largest_bytes': max((report['bytes'] for report in reports), default=0),
+            'offloaded_bytes': sum(sum(report['offloaded'].values()) for report in reports),
+            'over_cap': sum(1 for report in reports if report['over_cap']),
+            'over_cap_events': over_cap_events,
+            'cap_bytes': self.cap_bytes,
+        }
+
+# Shared accounting for all sessions in this process
+session_memory = SessionMemory(
+    PayloadStore(config.SESSION_PAYLOAD_DB),
+    cap_bytes=config.SESSION_MEMORY_CAP_KB * 1024,
+    offload_bytes=config.SESSION_OFFLOAD_KB * 1024,
+)
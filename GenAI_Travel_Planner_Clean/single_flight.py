@@ -0,0 +1,94 @@
+"""
+Request coalescing for AI Travel Planner
+Concurrent identical provider calls share one in-flight request instead of each hitting the API
+"""
+
+import functools
+import inspect
+import json
+import threading
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Runs at most one call per key at a time; callers arriving mid-flight wait for and share its result"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.stats = {'executed': 0, 'coalesced': 0}
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Call fn(*args, **kwargs), or wait for the identical call already in flight
+
+        Args:
+            key (str): Canonical request key
+            fn (callable): Function performing the request
+
+        Returns:
+            The (shared) result of the single in-flight call; its exception is re-raised for every caller
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            if call is not None:
+                self.stats['coalesced'] += 1
+                leader = False
+            else:
+                call = self.calls[key] = _Call()
+                self.stats['executed'] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result
+
+def canonical_key(fn, args, kwargs, ignore=()):
+    """Stable key for a call: function name plus bound arguments with defaults, strings trimmed and case-folded"""
+    bound = inspect.signature(fn).bind(*args, **kwargs)
+    bound.apply_defaults()
+
+    def normalize(value):
+        if isinstance(value, str):
+            return " ".join(value.split()).casefold()
+        return value
+
+    arguments = {name: normalize(value) for name, value in bound.arguments.items() if name not in ignore}
+    return f"{fn.__module__}.{fn.__qualname__}:{json.dumps(arguments, sort_keys=True, default=str)}"
+
+# Shared coalescing group for provider calls in this process
+provider_calls = SingleFlight()
+
+def single_flight(fn=None, ignore=()):
+    """
+    Decorator coalescing concurrent identical calls to a fetcher
+
+    Args:
+        ignore (tuple): Argument names left out of the key (e.g. values derived from other arguments)
+    """
+    if fn is None:
+        return functools.partial(single_flight, ignore=ignore)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = canonical_key(fn, args, kwargs, ignore)
+        return provider_calls.do(key, fn, *args, **kwargs)
+
+    return wrapper
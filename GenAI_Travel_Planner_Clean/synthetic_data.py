@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Synthetic data for AI Travel Planner
+Seeded generators of realistic flight offers, places and events for load testing ranking, caching and
+rendering at scale. Items are yielded one at a time, so millions can be streamed without holding them in
+memory, and the same seed and settings always produce the same sequence.
+
+Usage:
+    python synthetic_data.py flights --route JNB-LHR --count 1000000 --seed 7 > offers.jsonl
+    python synthetic_data.py attractions --location "Cape Town, South Africa" --count 50000 --rating-mean 4.0
+    python synthetic_data.py events --count 100000 --seed 3 --output events.jsonl
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from itertools import islice
+from airports import airports
+from travel_records import Event, FlightOffer, Place, to_plain
+from trip_routing import estimated_leg
+
+# Carriers as (IATA code, name); offers name the carrier by code like Amadeus offers do
+CARRIERS = (
+    ('SA', 'South African Airways'), ('FA', 'FlySafair'), ('MN', 'Kulula'), ('GE', 'Lift'),
+    ('BA', 'British Airways'), ('EK', 'Emirates'), ('QR', 'Qatar Airways'), ('LH', 'Lufthansa'),
+    ('AF', 'Air France'), ('KL', 'KLM'), ('ET', 'Ethiopian Airlines'), ('KQ', 'Kenya Airways'),
+    ('TK', 'Turkish Airlines'), ('DL', 'Delta Air Lines'), ('UA', 'United Airlines'), ('SQ', 'Singapore Airlines'),
+)
+
+# Default distributions; every generator takes these as keyword arguments
+STOP_WEIGHTS = (0.55, 0.35, 0.10)                 # share of offers with 0, 1, 2 stops
+DEPARTURE_PEAKS = ((7, 1.5), (12, 2.5), (18, 2.0))  # (hour, spread in hours) of the daily departure waves
+PRICE_SIGMA = 0.35                               # lognormal spread of fares around the route's base fare
+RATING_MEAN, RATING_SD = 4.2, 0.35               # place ratings, clipped to 1.0-5.0
+RATINGS_MEDIAN = 300                             # median review count (lognormal)
+PRICE_LEVEL_WEIGHTS = (0.2, 0.45, 0.25, 0.1)     # share of price levels 1-4
+
+PLACE_KINDS = {
+    'restaurant': {
+        'names': ('Bistro', 'Grill', 'Kitchen', 'Trattoria', 'Brasserie', 'Eatery', 'Tavern', 'Café'),
+        'categories': (None,),
+        'types': ('restaurant', 'food', 'point_of_interest'),
+    },
+    'venue': {
+        'names': ('Hub', 'Workspace', 'Centre', 'Studio', 'Exchange', 'Commons'),
+        'categories': ('💼 Coworking Space', '🏢 Conference Center', '🏢 Business Center', '🏨 Hotel Business Center'),
+        'types': ('establishment', 'point_of_interest'),
+    },
+    'attraction': {
+        'names': ('Museum', 'Gardens', 'Park', 'Gallery', 'Aquarium', 'Lookout', 'Market', 'Zoo'),
+        'categories': ('🏛️ Museum', '🎢 Amusement Park', '🦁 Zoo', '🐠 Aquarium', '🌳 Park',
+                       '🎯 Tourist Attraction', '📍 Point of Interest'),
+        'types': ('tourist_attraction', 'point_of_interest'),
+    },
+}
+# Google Places type behind each attraction category (get_attraction_category maps them back)
+ATTRACTION_TYPES = {
+    '🏛️ Museum': 'museum', '🎢 Amusement Park': 'amusement_park', '🦁 Zoo': 'zoo', '🐠 Aquarium': 'aquarium',
+    '🌳 Park': 'park', '🎯 Tourist Attraction': 'tourist_attraction', '📍 Point of Interest': 'establishment',
+}
+PRICE_TEXT = ("$ (Inexpensive)", "$$ (Moderate)", "$$$ (Expensive)", "$$$$ (Very Expensive)")
+NAME_PREFIXES = ('Harbour', 'Old Town', 'Summit', 'Riverside', 'Garden', 'Atlantic', 'Union', 'Granite',
+                 'Lantern', 'Olive', 'Baobab', 'Station', 'Market Square', 'Lighthouse', 'Vineyard', 'Coral')
+STREETS = ('Long Street', 'Main Road', 'Church Street', 'Beach Road', 'Market Street', 'Victoria Road', 'High Street')
+
+EVENT_CATEGORIES = (
+    ('Concerts & Shows', '🎵', 0.3), ('Festivals & Cultural Events', '🎭', 0.2), ('Sports & Games', '⚽', 0.2),
+    ('Exhibitions & Museums', '🎨', 0.15), ('Nightlife & Entertainment', '🌃', 0.15),
+)
+EVENT_WORDS = ("live music night festival jazz food wine market art exhibition derby final cup comedy "
+               "open air weekend summer late classic tribute sessions showcase").split()
+
+def stream_rng(kind, seed, *parts):
+    """Random generator for one stream; string seeds hash the same in every process"""
+    return random.Random(":".join(str(part) for part in (kind, seed) + parts))
+
+def synthetic_flights(source_iata, destination_iata, departure_date, return_date, count, seed=0,
+                      price_sigma=PRICE_SIGMA, stop_weights=STOP_WEIGHTS, departure_peaks=DEPARTURE_PEAKS,
+                      currency='USD', carriers=CARRIERS):
+    """
+    Stream round-trip FlightOffer records for a route
+
+    Fares and durations scale with the route's great-circle distance (1,500 km when an airport is not in
+    the gazetteer); each stop adds a layover and discounts the fare.
+
+    Args:
+        source_iata (str): Departure airport
+        destination_iata (str): Arrival airport
+        departure_date (date): Outbound date
+        return_date (date): Return date
+        count (int): Offers to yield
+        seed (int): Stream seed
+        price_sigma (float): Lognormal spread of fares around the route's base fare
+        stop_weights (tuple): Relative frequency of 0, 1, 2... stops
+        departure_peaks (tuple): (hour, spread) daily departure waves, picked uniformly
+        currency (str): Fare currency
+        carriers (tuple): (code, name) carriers to pick from
+
+    Yields:
+        FlightOffer: Offers with source 'Synthetic Data'
+    """
+    rng = stream_rng('flights', seed, source_iata, destination_iata, departure_date, return_date)
+    base_fare, base_minutes = estimated_leg(airports.distance_km(source_iata, destination_iata) or 1500)
+    outbound_day = datetime.combine(departure_date, datetime.min.time())
+    return_day = datetime.combine(return_date, datetime.min.time())
+    stop_counts = range(len(stop_weights))
+
+    for index in range(count):
+        stops = rng.choices(stop_counts, stop_weights)[0]
+        minutes = int(base_minutes * rng.uniform(0.95, 1.15) + sum(rng.uniform(60, 240) for _ in range(stops)))
+        amount = round(base_fare * rng.lognormvariate(0, price_sigma) * (1 - 0.1 * stops), 2)
+        hour, spread = rng.choice(departure_peaks)
+        departure = outbound_day + timedelta(minutes=int(rng.gauss(hour, spread) * 60) % 1440 // 5 * 5)
+        hour, spread = rng.choice(departure_peaks)
+        return_departure = return_day + timedelta(minutes=int(rng.gauss(hour, spread) * 60) % 1440 // 5 * 5)
+        code, _ = rng.choice(carriers)
+        yield FlightOffer(
+            airline=code,
+            price=f"{currency} {amount:.2f}",
+            amount=amount,
+            currency=currency,
+            total_duration=f"{minutes} min",
+            duration_minutes=minutes,
+            departure_airport=source_iata,
+            departure_time=departure.isoformat(),
+            arrival_airport=destination_iata,
+            arrival_time=(departure + timedelta(minutes=minutes)).isoformat(),
+            return_time=return_departure.isoformat(),
+            stops=stops,
+            airline_logo=f"https://pics.avs.io/100/100/{code}.png",
+            booking_token=f"SYN-{seed}-{index}",
+            source='Synthetic Data',
+        )
+
+def synthetic_places(location, count, seed=0, kind='attraction', rating_mean=RATING_MEAN, rating_sd=RATING_SD,
+                     ratings_median=RATINGS_MEDIAN, price_level_weights=PRICE_LEVEL_WEIGHTS):
+    """
+    Stream Place records shaped like Google Places results
+
+    Args:
+        location (str): City the places are in
+        count (int): Places to yield
+        seed (int): Stream seed
+        kind (str): 'restaurant', 'venue' or 'attraction'
+        rating_mean (float): Mean rating (normal, clipped to 1.0-5.0)
+        rating_sd (float): Rating standard deviation
+        ratings_median (int): Median review count (lognormal)
+        price_level_weights (tuple): Relative frequency of price levels 1-4 (restaurants)
+
+    Yields:
+        Place: Places with unique synthetic place ids
+    """
+    shape = PLACE_KINDS[kind]
+    rng = stream_rng('places', seed, location, kind)
+    city = location.split(',')[0]
+    slug = city.lower().replace(' ', '-')
+    for index in range(count):
+        name = f"{rng.choice(NAME_PREFIXES)} {rng.choice(shape['names'])}"
+        category = rng.choice(shape['categories'])
+        yield Place(
+            name=name,
+            place_id=f"SYN-{kind}-{seed}-{index}",
+            address=f"{rng.randint(1, 400)} {rng.choice(STREETS)}, {city}",
+            phone=f"+27 21 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+            website=f"https://www.{name.lower().replace(' ', '-')}-{index}.example.com/",
+            rating=round(min(5.0, max(1.0, rng.gauss(rating_mean, rating_sd))), 1),
+            total_ratings=int(rng.lognormvariate(0, 1) * ratings_median),
+            price_level=rng.choices(PRICE_TEXT, price_level_weights)[0] if kind == 'restaurant' else None,
+            hours="Monday: 9:00 AM – 5:00 PM; Tuesday: 9:00 AM – 5:00 PM...",
+            photo_url='' if kind != 'venue' else None,
+            review_snippet='Visit Google Maps for reviews' if kind != 'venue' else None,
+            google_maps_url=f"https://maps.google.com/?q={slug}-{index}",
+            category=category,
+            place_types=(ATTRACTION_TYPES[category],) + shape['types'] if kind == 'attraction' else None,
+            source='Synthetic Data',
+        )
+
+def synthetic_events(location, count, seed=0, start_date=None, days=30, categories=EVENT_CATEGORIES):
+    """
+    Stream Event records shaped like the live event search results
+
+    Args:
+        location (str): City the events are in
+        count (int): Events to yield
+        seed (int): Stream seed
+        start_date (date): First possible event date (default today)
+        days (int): Events are spread uniformly over this many days
+        categories (tuple): (category, icon, weight) choices
+
+    Yields:
+        Event: Events with dates as "12 Nov 2026"
+    """
+    rng = stream_rng('events', seed, location)
+    start_date = start_date or date.today()
+    city = location.split(',')[0]
+    labels = [(category, icon) for category, icon, _ in categories]
+    weights = [weight for _, _, weight in categories]
+    for index in range(count):
+        category, icon = rng.choices(labels, weights)[0]
+        title = " ".join(rng.choice(EVENT_WORDS) for _ in range(3)).title()
+        yield Event(
+            name=f"{city} {title} - Tickets and Dates",
+            description=" ".join(rng.choice(EVENT_WORDS) for _ in range(rng.randint(15, 35))),
+            date=(start_date + timedelta(days=rng.randrange(days))).strftime("%d %b %Y"),
+            website=f"https://tickets.example.com/events/{seed}-{index}",
+            link_type="🎫 **Ticket Booking Site** - Purchase tickets directly",
+            link_text="Buy Tickets",
+            category=category,
+            icon=icon,
+        )
+
+def batched(items, size):
+    """Lists of up to size items from a stream, for feeding batch code paths such as rank_offers"""
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream seeded synthetic travel data as JSON lines")
+    parser.add_argument('kind', choices=['flights', 'restaurants', 'venues', 'attractions', 'events'])
+    parser.add_argument('--count', type=int, default=1000, help="Items to generate (default: 1000)")
+    parser.add_argument('--seed', type=int, default=0, help="Stream seed (default: 0)")
+    parser.add_argument('--route', default="JNB-CPT", help="Flights: SOURCE-DESTINATION (default: JNB-CPT)")
+    parser.add_argument('--location', default="Cape Town, South Africa", help="Places and events: city")
+    parser.add_argument('--price-sigma', type=float, default=PRICE_SIGMA, help="Flights: fare spread")
+    parser.add_argument('--rating-mean', type=float, default=RATING_MEAN, help="Places: mean rating")
+    parser.add_argument('--output', help="Write to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    departure = date.today() + timedelta(days=30)
+    if args.kind == 'flights':
+        source, destination = args.route.upper().split('-', 1)
+        items = synthetic_flights(source, destination, departure, departure + timedelta(days=5), args.count,
+                                  args.seed, price_sigma=args.price_sigma)
+    elif args.kind == 'events':
+        items = synthetic_events(args.location, args.count, args.seed, start_date=departure)
+    else:
+        items = synthetic_places(args.location, args.count, args.seed, kind=args.kind.rstrip('s'),
+                                 rating_mean=args.rating_mean)
+
+    started = time.time()
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for item in items:
+            output.write(json.dumps(item.to_dict(), default=to_plain, ensure_ascii=False) + "\n")
+    finally:
+        if args.output:
+            output.close()
+    print(f"✅ {args.count} {args.kind} in {time.time() - started:.1f}s", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
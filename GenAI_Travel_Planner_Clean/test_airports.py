@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline airport gazetteer, its nearest-airport KD-tree and the airport helpers built on it
+"""
+
+import math
+import random
+import pytest
+import travel_services
+from airports import EARTH_RADIUS_KM, AirportIndex, airports, normalize
+from travel_services import get_airport_coordinates, get_airport_display_name, get_iata_code, get_nearest_airport_code
+
+def test_code_and_city_lookup():
+    assert airports.get("cpt").city_country == "Cape Town, South Africa"
+    assert airports.get("XXX") is None and airports.get(None) is None
+    assert [airport.iata for airport in airports.city_airports("London, United Kingdom")][:2] == ["LHR", "LGW"]
+    assert airports.city_airports("london")[0].iata == "LHR"
+
+def test_prefix_search_matches_codes_cities_and_names():
+    assert [airport.iata for airport in airports.search("heath")] == ["LHR"]
+    assert [airport.iata for airport in airports.search("johannes")][:2] == ["JNB", "HLA"]  # featured rows first
+    assert airports.search("jnb")[0].iata == "JNB"
+    assert len(airports.search("l", limit=3)) == 3
+    assert airports.search("  ") == []
+
+def test_normalize_strips_accents_and_case():
+    assert normalize(" Bogotá ") == "bogota"
+
+def test_primary_airport_is_the_first_listed():
+    assert AirportIndex().city_codes()["Johannesburg, South Africa"] == "JNB"
+
+def test_world_airports_extend_the_featured_cities():
+    featured, every_city = airports.city_codes(featured_only=True), airports.city_codes()
+    assert "Cape Town, South Africa" in featured and len(featured) < 300
+    assert len(every_city) > 5000 and set(featured) <= set(every_city)
+    assert airports.get("QRA").city_country == "Johannesburg, South Africa"
+    assert "Longreach, Australia" in every_city and "Longreach, Australia" not in featured
+
+def test_curated_rows_win_over_world_rows(tmp_path):
+    header = "iata\tname\tcity\tcountry\tlat\tlng\n"
+    (tmp_path / "curated.tsv").write_text(header + "CPT\tCape Town International\tCape Town\tSouth Africa\t-33.97\t18.60\n")
+    (tmp_path / "world.tsv").write_text(header + "CPT\tCape Town Airport\tKaapstad\tSouth Africa\t-33.97\t18.60\n"
+                                        "GRJ\tGeorge Airport\tGeorge\tSouth Africa\t-34.01\t22.38\n")
+    index = AirportIndex(tmp_path / "curated.tsv", tmp_path / "world.tsv")
+    assert [airport.iata for airport in index.all()] == ["CPT", "GRJ"]
+    assert index.get("CPT").city == "Cape Town"
+    assert index.city_codes(featured_only=True) == {"Cape Town, South Africa": "CPT"}
+    assert AirportIndex(tmp_path / "curated.tsv", world_path=None).get("GRJ") is None
+
+def test_helpers_read_the_gazetteer(monkeypatch):
+    monkeypatch.setattr(travel_services, 'geocode_location', lambda location: None)
+    assert get_iata_code("Cape Town, South Africa") == "CPT"
+    assert get_iata_code("London") == "LHR"
+    assert get_iata_code("LGW") == "LGW"
+    assert get_iata_code("Atlantis, Nowhere") is None  # no guessed code for unknown places
+    assert get_airport_coordinates("CPT") == {'lat': -33.9715, 'lng': 18.6021}
+    assert get_airport_coordinates("XXX") is None
+    assert get_airport_display_name("CPT") == "Cape Town International"
+    assert get_airport_display_name("LHR") == "London (Heathrow)"
+
+def brute_force_nearest(lat, lng, k):
+    return sorted(airports.all(), key=lambda airport: haversine_km(lat, lng, airport.lat, airport.lng))[:k]
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+def test_kdtree_matches_brute_force():
+    generator = random.Random(38)
+    for _ in range(200):
+        lat, lng = generator.uniform(-60, 70), generator.uniform(-180, 180)
+        found = airports.nearest(lat, lng, k=3)
+        assert [airport for airport, _ in found] == brute_force_nearest(lat, lng, 3)
+        for airport, distance in found:
+            assert distance == pytest.approx(haversine_km(lat, lng, airport.lat, airport.lng), rel=1e-6)
+
+def test_nearest_respects_max_distance():
+    assert airports.nearest(-33.97, 18.60, k=1)[0][0].iata == "CPT"
+    assert airports.nearest(-48.0, -130.0, k=2, max_km=300) == []
+
+def test_unlisted_destinations_use_the_nearest_airport(monkeypatch):
+    places = {"Stellenbosch, South Africa": (-33.93, 18.86), "Point Nemo": (-48.88, -123.39)}
+    monkeypatch.setattr(travel_services, 'geocode_location', places.get)
+    assert get_iata_code("Stellenbosch, South Africa") == "CPT"
+    assert get_nearest_airport_code("Point Nemo") is None
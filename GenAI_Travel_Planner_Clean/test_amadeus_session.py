@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Tests for the pooled Amadeus session and its shared token store
+"""
+
+import json
+import os
+import stat
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+import pytest
+import requests
+from amadeus import AuthenticationError, ResponseError
+from amadeus_session import AmadeusSession, TokenStore
+
+class FakeResponse:
+    """urlopen-style reply"""
+
+    def __init__(self, status, body):
+        self.status = status
+        self.body = json.dumps(body).encode()
+
+    def info(self):
+        return {'Content-Type': "application/json"}
+
+    def read(self):
+        return self.body
+
+class FakeHttp:
+    """Token endpoint issuing token-1, token-2, ...; GETs answer 401 for tokens listed in rejected"""
+
+    def __init__(self, expires_in=1799):
+        self.lock = threading.Lock()
+        self.expires_in = expires_in
+        self.issued = 0
+        self.rejected = set()
+        self.calls = []
+
+    def __call__(self, request):
+        authorization = request.get_header('Authorization')
+        if authorization is None:
+            with self.lock:
+                self.issued += 1
+                return FakeResponse(200, {'access_token': f"token-{self.issued}", 'expires_in': self.expires_in})
+        token = authorization.split()[1]
+        with self.lock:
+            self.calls.append(token)
+        if token in self.rejected:
+            return FakeResponse(401, {'errors': [{'detail': "invalid token"}]})
+        params = {key: values[0] for key, values in parse_qs(urlparse(request.full_url).query).items()}
+        return FakeResponse(200, {'data': [params]})
+
+def make_session(http, store=None, **options):
+    session = AmadeusSession("client", "secret", hostname='test', store=store, **options)
+    session.http = http
+    return session
+
+def reply(status, body):
+    response = requests.Response()
+    response.status_code, response._content = status, json.dumps(body).encode()
+    response.headers['Content-Type'] = "application/json"
+    return response
+
+def test_pooled_connections_feed_the_sdk():
+    session = AmadeusSession("client", "secret", hostname='test')
+    replies = iter([reply(200, {'access_token': "token-1", 'expires_in': 1799}), reply(200, {'data': [{'iataCode': "LHR"}]})])
+    requested = []
+    session.http.session.request = lambda method, url, **kwargs: requested.append((method, url)) or next(replies)
+
+    assert session.reference_data.locations.get(keyword="LON").data == [{'iataCode': "LHR"}]
+    assert [method for method, _ in requested] == ['POST', 'GET']
+    assert requested[1][1].startswith("https://test.api.amadeus.com/v1/reference-data/locations?")
+
+def test_sessions_share_a_stored_token(tmp_path):
+    http = FakeHttp()
+    store = TokenStore(str(tmp_path / "tokens.db"))
+    first, second = make_session(http, store), make_session(http, store)
+
+    assert first.access_token.current() == second.access_token.current() == "token-1"
+    assert http.issued == 1
+    assert first.get_metrics()['token_requests'] == 1
+    assert second.get_metrics()['shared_tokens'] == 1
+
+def test_token_file_is_private(tmp_path):
+    path = str(tmp_path / "tokens.db")
+    TokenStore(path)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+def test_rejected_token_is_replaced_and_the_call_retried(tmp_path):
+    http = FakeHttp()
+    session = make_session(http, TokenStore(str(tmp_path / "tokens.db")))
+    session.access_token.current()
+    http.rejected.add("token-1")
+
+    response = session.reference_data.locations.get(keyword="LON", subType="AIRPORT")
+
+    assert response.data == [{'keyword': "LON", 'subType': "AIRPORT"}]
+    assert http.calls == ["token-1", "token-2"]
+    assert session.get_metrics()['rejected_tokens'] == 1
+
+def test_errors_are_the_sdk_errors():
+    http = FakeHttp()
+    session = make_session(http)
+    session.access_token.current()
+    http.rejected.update({"token-1", "token-2"})
+
+    with pytest.raises(AuthenticationError) as error:
+        session.get("/v1/reference-data/locations")
+    assert isinstance(error.value, ResponseError)
+    assert error.value.response.status_code == 401
+
+def test_short_lived_tokens_do_not_make_the_refresher_spin(monkeypatch):
+    import amadeus_session
+    sleeps, release = [], threading.Event()
+    monkeypatch.setattr(amadeus_session, 'time', SimpleNamespace(
+        time=time.time, sleep=lambda seconds: (sleeps.append(seconds), release.wait(5))))
+    session = make_session(FakeHttp(expires_in=60), refresh_ahead=120)  # refresh_ahead longer than the token lives
+    session.access_token.current()
+    while not sleeps:
+        time.sleep(0.01)
+    release.set()
+    assert sleeps[0] == pytest.approx(30, abs=1)  # renewed halfway through its life, not right away
+
+def test_call_counter_is_exact_across_threads():
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        http = FakeHttp()
+        session = make_session(http)
+        session.access_token.current()
+
+        def call():
+            for _ in range(200):
+                session.get("/v1/reference-data/locations")
+
+        threads = [threading.Thread(target=call) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert session.get_metrics()['calls'] == 1600
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for batch plan generation with shared destination data
+"""
+
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import batch_planner
+import plan_pipeline
+from batch_planner import read_trips, run_batch
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """In-process pool and fake pipeline recording destination fetches and the stages each plan reused"""
+    calls = {'destinations': [], 'plans': []}
+
+    def fetch_destination_data(destination, activity_preferences_list):
+        calls['destinations'].append((destination, list(activity_preferences_list)))
+        if destination == "Atlantis":
+            raise RuntimeError("geocode failed")
+        return {'coords': (1.0, 2.0), 'local_info': ["info"],
+                'attractions': {prefs: [f"{prefs or 'any'} attraction"] for prefs in activity_preferences_list}}
+
+    def generate_travel_plan(trip, completed=None):
+        calls['plans'].append((trip.get('destination') or trip['destinations'], completed))
+        if trip.get('fail'):
+            raise ValueError("bad trip")
+        return {'destination': trip.get('destination'), 'attractions': (completed or {}).get('attractions')}
+
+    monkeypatch.setattr(batch_planner, 'ProcessPoolExecutor', ThreadPoolExecutor)
+    monkeypatch.setattr(plan_pipeline, 'fetch_destination_data', fetch_destination_data)
+    monkeypatch.setattr(plan_pipeline, 'generate_travel_plan', generate_travel_plan)
+    return calls
+
+def test_trips_read_from_csv_and_jsonl(tmp_path):
+    (tmp_path / "trips.csv").write_text("destination,budget\nParis,Economy\nRome,Luxury\n", encoding='utf-8')
+    (tmp_path / "trips.jsonl").write_text('{"destination": "Paris"}\n\n{"destination": "Rome"}\n', encoding='utf-8')
+    assert read_trips(str(tmp_path / "trips.csv")) == [{'destination': "Paris", 'budget': "Economy"},
+                                                       {'destination': "Rome", 'budget': "Luxury"}]
+    assert [trip['destination'] for trip in read_trips(str(tmp_path / "trips.jsonl"))] == ["Paris", "Rome"]
+
+def test_destination_data_is_fetched_once_per_destination(pipeline):
+    trips = [{'destination': "Paris", 'activity_preferences': "art"}, {'destination': "Paris"},
+             {'destination': "Paris", 'activity_preferences': "art"}, {'destination': "Rome"}]
+    output = io.StringIO()
+    stats = run_batch(trips, output, workers=2)
+
+    assert sorted(pipeline['destinations']) == [("Paris", ["", "art"]), ("Rome", [""])]
+    records = sorted((json.loads(line) for line in output.getvalue().splitlines()), key=lambda record: record['index'])
+    assert [record['plan']['attractions'] for record in records] == [
+        ["art attraction"], ["any attraction"], ["art attraction"], ["any attraction"]]
+    assert (stats['trips'], stats['destinations'], stats['succeeded'], stats['failed']) == (4, 2, 4, 0)
+
+def test_failures_are_reported_per_trip(pipeline):
+    trips = [{'destination': "Atlantis"}, {'destination': "Paris", 'fail': True},
+             {'destinations': ["Paris", "Rome"]}]
+    output = io.StringIO()
+    stats = run_batch(trips, output, workers=2)
+
+    records = {record['index']: record for record in map(json.loads, output.getvalue().splitlines())}
+    assert 'plan' in records[0]  # planned without shared data when the destination fetch failed
+    assert records[1]['error'] == "bad trip"
+    assert (stats['succeeded'], stats['failed'], stats['destinations']) == (2, 1, 2)
+    assert (["Paris", "Rome"], None) in pipeline['plans'] and ("Atlantis", None) in pipeline['plans']
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Tests for typo-tolerant city autocomplete
+"""
+
+from city_autocomplete import CityAutocomplete, city_autocomplete, prefix_distance, typo_budget
+
+def test_prefix_distance_measures_against_the_closest_prefix():
+    assert prefix_distance("cape", "cape town", 2) == 0
+    assert prefix_distance("cpe", "cape town", 2) == 1
+    assert prefix_distance("xyz", "cape town", 1) == 2  # stops at limit + 1
+
+def test_typo_budget_grows_with_query_length():
+    assert [typo_budget(query) for query in ("lon", "lond", "johannes")] == [0, 1, 2]
+
+def test_city_names_rank_ahead_of_inner_words():
+    suggestions = city_autocomplete.suggest("london")
+    assert suggestions[0] == "London, United Kingdom"  # featured first among equal matches
+    east_london = suggestions.index("East London, South Africa")
+    assert all(label.startswith("London") for label in suggestions[:east_london])
+
+def test_typos_airport_names_and_codes_find_the_city():
+    assert city_autocomplete.suggest("cpe town")[0] == "Cape Town, South Africa"
+    assert city_autocomplete.suggest("jnb")[0] == "Johannesburg, South Africa"
+    assert city_autocomplete.suggest("heathrow")[0] == "London, United Kingdom"
+
+def test_exact_prefixes_rank_before_typo_matches():
+    index = CityAutocomplete(lambda: [("Paris, France", ["Paris, France", "Paris"]),
+                                      ("Parma, Italy", ["Parma, Italy", "Parma"])])
+    assert index.suggest("parm") == ["Parma, Italy", "Paris, France"]
+    assert index.suggest("par", limit=1) == ["Paris, France"]
+    assert index.suggest("") == []
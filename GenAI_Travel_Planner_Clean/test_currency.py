@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for offline FX conversion to the display currency
+"""
+
+import json
+import math
+import os
+import pytest
+from currency import DATA_PATH, FxTable, format_price, import_rates, normalize_offers, offer_currency, read_rates
+from travel_records import FlightOffer
+
+@pytest.fixture
+def table(tmp_path):
+    return FxTable(DATA_PATH, tmp_path / "fx_rates.json", check_seconds=0)
+
+def write_rates(path, rates, base='USD'):
+    path.write_text(json.dumps({'base': base, 'rates': rates}), encoding='utf-8')
+
+def test_rates_convert_through_the_base_currency(table):
+    assert table.rate('USD', 'USD') == 1.0
+    assert table.rate('USD', 'ZAR') == pytest.approx(18.6)
+    assert table.rate('EUR', 'ZAR') == pytest.approx(18.6 / 0.92)
+    assert math.isnan(table.rate('XXX', 'ZAR'))
+
+def test_vectorized_conversion_marks_missing_rates(table):
+    converted = table.convert([10, 20, 30], ['USD', 'ZAR', 'XXX'], 'ZAR')
+    assert converted[:2].tolist() == pytest.approx([186.0, 20.0]) and math.isnan(converted[2])
+    assert len(table.convert([], [], 'ZAR')) == 0
+
+def test_imported_table_replaces_the_bundled_one_when_it_changes(table, tmp_path):
+    assert table.info()['path'] == str(DATA_PATH)
+    write_rates(tmp_path / "fx_rates.json", {'USD': 1, 'ZAR': 20})
+    assert table.rate('USD', 'ZAR') == 20
+    write_rates(tmp_path / "fx_rates.json", {'USD': 1, 'ZAR': 10})
+    os.utime(tmp_path / "fx_rates.json", (1, 1))
+    assert table.rate('USD', 'ZAR') == 10
+
+def test_offer_currency_reads_fields_codes_and_symbols():
+    assert offer_currency({'currency': "eur"}) == "EUR"
+    assert offer_currency({'price': {'total': "10", 'currency': "GBP"}}) == "GBP"
+    assert offer_currency({'price': "ZAR 1500"}) == "ZAR"
+    assert offer_currency({'price': "$850"}) == "USD"
+    assert offer_currency({'price': "R 1 500"}) == "ZAR"
+    assert [offer_currency({'price': price}) for price in ("Rs 4,500", "RM 90", "R$ 300")] == ["INR", "MYR", "BRL"]
+    assert offer_currency({'price': "850"}, default="ZAR") == "ZAR"
+
+def test_offers_are_repriced_in_the_display_currency():
+    dollars = FlightOffer(airline="BA", price="$100.00", amount=100.0, currency="USD")
+    rand = FlightOffer(airline="FA", price="ZAR 900", amount=900.0, currency="ZAR")
+    unknown = FlightOffer(airline="XX", price="XXX 5", amount=5.0, currency="XXX")
+    converted = normalize_offers([dollars, rand, unknown], "ZAR")
+    assert (converted[0].amount, converted[0].price) == (1860.0, format_price(1860.0, "ZAR"))
+    assert converted[1] is rand
+    assert (converted[2].amount, converted[2].price) == (None, "XXX 5")
+
+def test_csv_imports_are_validated(tmp_path):
+    source = tmp_path / "rates.csv"
+    source.write_text("currency,rate\nUSD,1\nZAR,18.2\n", encoding='utf-8')
+    table = import_rates(str(source), target=tmp_path / "installed.json")
+    assert (table['base'], table['rates']['ZAR']) == ("USD", 18.2)
+    assert json.loads((tmp_path / "installed.json").read_text(encoding='utf-8'))['source'] == "Imported from rates.csv"
+
+    source.write_text("ZAR,18.2\nEUR,0\n", encoding='utf-8')
+    with pytest.raises(ValueError):
+        read_rates(str(source))
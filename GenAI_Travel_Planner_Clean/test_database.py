@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for travel plan snapshots in the Supabase database layer
+"""
+
+import base64
+import plan_codec
+from database import TravelPlannerDB, decode_bytea, encode_bytea
+
+PLAN = {
+    'source': "Durban, South Africa",
+    'destination': "Cape Town, South Africa",
+    'departure_date': "2026-11-01",
+    'itinerary': "Day 1: Table Mountain",
+}
+
+class FakeTable:
+    """Records inserted rows like supabase.table(...).insert(...).execute()"""
+
+    def __init__(self):
+        self.rows = []
+
+    def insert(self, row):
+        self.rows.append(row)
+        return self
+
+    def execute(self):
+        return self
+
+class FakeSupabase:
+    def __init__(self):
+        self.tables = {}
+
+    def table(self, name):
+        return self.tables.setdefault(name, FakeTable())
+
+def connected_db():
+    db = TravelPlannerDB()
+    db.supabase, db.connected = FakeSupabase(), True
+    return db
+
+def test_bytea_round_trip():
+    data = plan_codec.encode(PLAN)
+    value = encode_bytea(data)
+    assert value.startswith('\\x')
+    assert decode_bytea(value) == data
+    assert decode_bytea(data) == data
+
+def test_saved_plan_loads_back():
+    db = connected_db()
+    assert db.save_travel_plan("traveler@example.com", PLAN['destination'], PLAN)
+    row = db.supabase.tables['travel_plans'].rows[0]
+    assert row['plan_data']['destination'] == PLAN['destination']
+    assert 'itinerary' not in row['plan_data']
+    assert db.load_travel_plan(row) == PLAN
+
+def test_base64_snapshots_from_before_bytea_still_load():
+    legacy = {'plan_snapshot': base64.b64encode(plan_codec.encode(PLAN)).decode('ascii')}
+    assert connected_db().load_travel_plan(legacy) == PLAN
+
+def test_rows_without_snapshot_fall_back_to_plan_data():
+    assert connected_db().load_travel_plan({'plan_data': {'destination': "Cape Town"}}) == {'destination': "Cape Town"}
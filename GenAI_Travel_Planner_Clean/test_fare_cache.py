@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared fare cache: keying, hits, route invalidation and store sizes
+"""
+
+import time
+from datetime import date
+import pytest
+import fare_cache
+from fare_cache import FareCache, RedisFareStore, SQLiteFareStore, fare_cached, fare_key
+
+def search(origin, destination, departure_date, return_date, adults=1, travel_class="economy"):
+    return [f"{origin}-{destination} {departure_date} {return_date} x{adults} {travel_class}"]
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    cache = FareCache(SQLiteFareStore(str(tmp_path / "fares.db")), ttl=600)
+    monkeypatch.setattr(fare_cache, 'fare_cache', cache)
+    return cache
+
+def test_fare_key_names_route_dates_travelers_and_cabin():
+    route, key = fare_key('amadeus', search, ("jnb", "cpt", date(2026, 11, 1), date(2026, 11, 5)),
+                          {'adults': 2, 'travel_class': "BUSINESS"})
+    assert route == "JNB-CPT"
+    assert key == "amadeus|JNB-CPT|2026-11-01|2026-11-05|2|business"
+
+def test_positional_and_keyword_calls_share_a_key():
+    positional = fare_key('amadeus', search, ("JNB", "CPT", "2026-11-01", None, 1), {})
+    keyword = fare_key('amadeus', search, ("JNB", "CPT"), {'departure_date': "2026-11-01", 'return_date': None})
+    assert positional == keyword
+
+def test_cached_fetcher_calls_the_provider_once(cache):
+    calls = []
+
+    @fare_cached('amadeus')
+    def fetch(origin, destination, departure_date, return_date, adults=1):
+        calls.append(origin)
+        return [f"{origin}-{destination}"]
+
+    assert not fetch.is_cached("JNB", "CPT", "2026-11-01", None)
+    assert fetch("JNB", "CPT", "2026-11-01", None) == ["JNB-CPT"]
+    assert fetch("JNB", "CPT", "2026-11-01", None) == ["JNB-CPT"]
+    assert fetch.is_cached("JNB", "CPT", "2026-11-01", None)
+    assert calls == ["JNB"]
+    metrics = cache.get_metrics()
+    assert (metrics['hits'], metrics['misses'], metrics['entries']) == (1, 1, 1)
+
+def test_empty_results_are_not_cached(cache):
+    fetch = fare_cached('amadeus')(lambda origin, destination, departure_date, return_date: [])
+    fetch("JNB", "CPT", "2026-11-01", None)
+    assert cache.get_metrics()['entries'] == 0
+
+def test_invalidate_route_only_drops_that_direction(cache):
+    cached_search = fare_cached('amadeus')(search)
+    cached_search("JNB", "CPT", "2026-11-01", None)
+    cached_search("JNB", "CPT", "2026-11-02", None)
+    cached_search("CPT", "JNB", "2026-11-05", None)
+    assert cache.invalidate_route("jnb", "cpt") == 2
+    assert not cached_search.is_cached("JNB", "CPT", "2026-11-01", None)
+    assert cached_search.is_cached("CPT", "JNB", "2026-11-05", None)
+
+def test_sqlite_entries_expire_and_purge(tmp_path):
+    store = SQLiteFareStore(str(tmp_path / "fares.db"))
+    store.set("k", "JNB-CPT", b"value", ttl=0.05)
+    time.sleep(0.1)
+    assert store.get("k") is None
+    assert store.purge_expired() == 1
+    assert store.sizes() == (0, 0)
+
+def test_redis_url_without_redis_falls_back_to_the_configured_file(monkeypatch, tmp_path):
+    def missing_redis(url):
+        raise ImportError("No module named 'redis'")
+    monkeypatch.setattr(fare_cache, 'RedisFareStore', missing_redis)
+    monkeypatch.setattr(fare_cache.config, 'FARE_CACHE_DB', str(tmp_path / "fallback.db"))
+
+    store = fare_cache.open_store("redis://cache:6379/0")
+    assert isinstance(store, SQLiteFareStore)
+    assert store.path == str(tmp_path / "fallback.db")
+
+@pytest.fixture
+def redis_store(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    import redis
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis.Redis, 'from_url', lambda url, **options: fakeredis.FakeRedis(server=server))
+    store = RedisFareStore("redis://cache:6379/0")
+    monkeypatch.setattr(store.client, 'scan_iter', lambda *args, **kwargs: pytest.fail("sizes() scanned the keyspace"))
+    return store
+
+def test_redis_sizes_are_counted_without_scanning(redis_store):
+    redis_store.set("a", "JNB-CPT", b"12345", ttl=60)
+    redis_store.set("b", "JNB-CPT", b"123", ttl=60)
+    redis_store.set("a", "JNB-CPT", b"1234567", ttl=60)  # rewrite replaces the old size
+    redis_store.set("c", "CPT-JNB", b"1", ttl=60)
+    assert redis_store.sizes() == (3, 11)
+    assert redis_store.invalidate_route("JNB-CPT") == 2
+    assert redis_store.get("a") is None
+    assert redis_store.sizes() == (1, 1)
+
+def test_redis_expired_entries_leave_the_counts(redis_store):
+    redis_store.set("a", "JNB-CPT", b"12345", ttl=1)
+    redis_store.set("b", "JNB-CPT", b"123", ttl=60)
+    time.sleep(1.1)
+    assert redis_store.get("a") is None
+    assert redis_store.sizes() == (1, 3)
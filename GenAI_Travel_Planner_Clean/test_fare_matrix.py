@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the flexible-date fare matrix
+"""
+
+import threading
+import time
+from datetime import date
+import pytest
+import flight_aggregator
+from config import config
+from flight_aggregator import fare_matrix, leg_matrix
+from travel_records import FlightOffer
+
+@pytest.fixture
+def amadeus(monkeypatch):
+    """Fake cached Amadeus search pricing a trip at 1000 + 10 per day away from the chosen dates"""
+    cached, calls = set(), []
+
+    def fetch(source, destination, departure, return_, adults, travel_class):
+        calls.append((departure, return_))
+        amount = 1000.0 + 10 * abs((departure - date(2026, 12, 10)).days) + 10 * abs((return_ - date(2026, 12, 15)).days)
+        if departure == date(2026, 12, 9):
+            amount -= 100
+        return [FlightOffer(airline="FA", price=f"{config.DISPLAY_CURRENCY} {amount}", amount=amount,
+                            currency=config.DISPLAY_CURRENCY)]
+
+    fetch.is_cached = lambda *args: (args[2], args[3]) in cached
+    fetch.calls, fetch.cached = calls, cached
+    monkeypatch.setattr(flight_aggregator, 'fetch_amadeus_flights', fetch)
+    monkeypatch.setattr(flight_aggregator, 'should_use_amadeus', lambda: True)
+    return fetch
+
+def test_matrix_prices_every_valid_date_pair(amadeus):
+    matrix = fare_matrix("JNB", "CPT", date(2026, 12, 10), date(2026, 12, 15), flex_days=1)
+    assert matrix['departure_dates'] == ["2026-12-09", "2026-12-10", "2026-12-11"]
+    assert matrix['return_dates'] == ["2026-12-14", "2026-12-15", "2026-12-16"]
+    assert matrix['prices'][1][1] == 1000.0
+    assert matrix['prices'][0][1] == 910.0
+    assert (matrix['fetched'], matrix['currency']) == (9, config.DISPLAY_CURRENCY)
+
+def test_returns_before_departure_are_left_empty(amadeus):
+    matrix = fare_matrix("JNB", "CPT", date(2026, 12, 10), date(2026, 12, 11), flex_days=1)
+    assert matrix['prices'][2][0] is None and matrix['prices'][1][0] is None
+    assert len(amadeus.calls) == 6
+
+def test_cached_cells_are_read_without_a_fetch_thread(amadeus):
+    amadeus.cached.add((date(2026, 12, 10), date(2026, 12, 15)))
+    matrix = fare_matrix("JNB", "CPT", date(2026, 12, 10), date(2026, 12, 15), flex_days=1)
+    assert matrix['fetched'] == 8
+    assert matrix['prices'][1][1] == 1000.0
+
+def test_no_matrix_without_amadeus(monkeypatch):
+    monkeypatch.setattr(flight_aggregator, 'should_use_amadeus', lambda: False)
+    assert fare_matrix("JNB", "CPT", date(2026, 12, 10), date(2026, 12, 15)) is None
+
+def test_cells_in_flight_are_capped_across_the_process(amadeus, monkeypatch):
+    lock, running, peak = threading.Lock(), [0], [0]
+    priced = amadeus
+
+    def fetch(*args):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return priced(*args)
+
+    fetch.is_cached = lambda *args: False
+    monkeypatch.setattr(flight_aggregator, 'fetch_amadeus_flights', fetch)
+    monkeypatch.setattr(flight_aggregator, '_matrix_slots', threading.BoundedSemaphore(2))
+    matrix = fare_matrix("JNB", "CPT", date(2026, 12, 10), date(2026, 12, 15), flex_days=1)
+    assert matrix['prices'][1][1] == 1000.0
+    assert peak[0] == 2
+
+def test_cells_without_a_slot_are_left_empty(amadeus, monkeypatch):
+    monkeypatch.setattr(flight_aggregator, '_matrix_slots', threading.BoundedSemaphore(1))
+    flight_aggregator._matrix_slots.acquire()  # held by another matrix for the whole call
+    matrix = fare_matrix("JNB", "CPT", date(2026, 12, 10), date(2026, 12, 15), flex_days=1, timeout=0.2)
+    assert all(price is None for row in matrix['prices'] for price in row)
+    assert amadeus.calls == []
+
+def test_legs_are_priced_with_a_small_search(monkeypatch):
+    searches = []
+
+    def fetch(*args):
+        searches.append(args)
+        return []
+
+    fetch.is_cached = lambda *args: False
+    monkeypatch.setattr(flight_aggregator, 'fetch_amadeus_flights', fetch)
+    monkeypatch.setattr(flight_aggregator, 'should_use_amadeus', lambda: True)
+    matrix = leg_matrix(["JNB", "CPT", "DUR"], date(2026, 12, 10))
+    assert (matrix['fetched'], matrix['estimated']) == (6, 6)
+    assert {args[-1] for args in searches} == {config.AMADEUS_LEG_MAX_OFFERS}
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the tiered memory/disk fetch cache
+"""
+
+import threading
+import time
+import pytest
+import fetch_cache
+from fetch_cache import DiskCache, MemoryCache, TieredCache, cached, is_cacheable
+
+@pytest.fixture
+def tiered(tmp_path, monkeypatch):
+    """Fresh cache installed as the shared one, so decorated fetchers use it"""
+    cache = TieredCache(MemoryCache(3), DiskCache(str(tmp_path / "fetch_cache.db")),
+                        {'default': 60, 'geocode': 3600}, {'places': 120})
+    monkeypatch.setattr(fetch_cache, 'cache', cache)
+    return cache
+
+def test_memory_tier_evicts_least_recently_used():
+    memory = MemoryCache(2)
+    expires_at = time.time() + 60
+    for key in ("a", "b"):
+        memory.set(key, 'places', key, expires_at)
+    memory.get("a")
+    memory.set("c", 'places', "c", expires_at)
+    assert [key for key in ("a", "b", "c") if memory.get(key)] == ["a", "c"]
+    assert memory.sizes() == {'places': (2, 2)}
+
+def test_disk_hits_are_promoted_to_memory(tiered):
+    tiered.set("key", {'lat': 1.5}, 'geocode')
+    tiered.memory.entries.clear()
+    assert tiered.get("key", 'geocode') == (True, {'lat': 1.5})
+    assert "key" in tiered.memory.entries
+    assert tiered.get("key", 'geocode') == (True, {'lat': 1.5})
+    metrics = tiered.get_metrics()['geocode']
+    assert (metrics['disk_hits'], metrics['memory_hits'], metrics['ttl_seconds']) == (1, 1, 3600)
+
+def test_expired_entries_miss_and_are_purged(tiered):
+    tiered.set("old", ["value"], 'events', ttl=-1)
+    assert tiered.get("old", 'events') == (False, None)
+    assert tiered.purge_expired() == 1
+    assert tiered.disk.sizes() == {}
+
+def test_only_real_provider_data_is_cacheable():
+    assert is_cacheable([{'name': "Table Mountain"}])
+    assert not any(is_cacheable(value) for value in (None, [], {}, [{'mock_data': True}], [{'source': "Demo data"}]))
+
+def test_decorator_caches_by_canonical_key(tiered):
+    calls = []
+
+    @cached('geocode', ignore=('session',))
+    def geocode(city, session=None):
+        calls.append(city)
+        return {'city': city} if city != "Nowhere" else None
+
+    assert geocode("Cape Town", session=1) == geocode(" cape  town ", session=2) == {'city': "Cape Town"}
+    geocode("Nowhere")
+    geocode("Nowhere")
+    assert calls == ["Cape Town", "Nowhere", "Nowhere"]
+
+def test_warm_refetches_only_entries_close_to_expiry(tiered):
+    calls = []
+
+    @cached('geocode')
+    def geocode(city):
+        calls.append(city)
+        return {'city': city}
+
+    assert geocode.warm("Paris") is True
+    assert geocode.warm("Paris", min_ttl=60) is False
+    assert geocode.warm("Paris", min_ttl=7200) is True
+    assert calls == ["Paris", "Paris"]
+
+def wait_for_refreshes():
+    deadline = time.time() + 5
+    while fetch_cache._refreshing and time.time() < deadline:
+        time.sleep(0.01)
+
+def test_stale_entries_are_served_while_refreshing(tiered):
+    versions = iter(["v2", "v3"])
+    release = threading.Event()
+
+    @cached('places')
+    def attractions(city):
+        release.wait(5)
+        return [next(versions)]
+
+    tiered.set(attractions.cache_key("Paris"), ["v1"], 'places', ttl=-1)
+    assert attractions("Paris") == ["v1"]
+    assert attractions("Paris") == ["v1"]  # the refresh already queued is not queued again
+    release.set()
+    wait_for_refreshes()
+    assert attractions("Paris") == ["v2"]
+    assert tiered.get_metrics()['places']['refreshes'] == 1
+
+def test_failed_refresh_keeps_serving_the_stale_entry(tiered):
+    @cached('places')
+    def attractions(city):
+        raise RuntimeError("provider down")
+
+    tiered.set(attractions.cache_key("Paris"), ["v1"], 'places', ttl=-1)
+    assert attractions("Paris") == ["v1"]
+    wait_for_refreshes()
+    assert attractions("Paris") == ["v1"]
+    assert tiered.get_metrics()['places']['stale_hits'] == 2
+
+def test_entries_past_max_staleness_are_refetched_synchronously(tiered):
+    @cached('places')
+    def attractions(city):
+        return ["fresh"]
+
+    tiered.set(attractions.cache_key("Paris"), ["ancient"], 'places', ttl=-300)
+    assert attractions("Paris") == ["fresh"]
+
+def test_types_without_max_staleness_never_serve_stale(tiered):
+    @cached('events')
+    def events(city):
+        return ["fresh"]
+
+    tiered.set(events.cache_key("Paris"), ["stale"], 'events', ttl=-1)
+    assert events("Paris") == ["fresh"]
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for merging and hedging live flight searches across providers
+"""
+
+import time
+from datetime import date
+import pytest
+import flight_aggregator
+from config import config
+from flight_aggregator import LatencyTracker, merge_offers, offer_key, search_flights
+from travel_records import FlightOffer
+
+def offer(airline, amount, departs="2026-12-01T07:00", stops=0, source='Amadeus API'):
+    return FlightOffer(airline=airline, price=f"{config.DISPLAY_CURRENCY} {amount}", amount=amount,
+                       currency=config.DISPLAY_CURRENCY, departure_time=departs, arrival_time=departs[:11] + "09:05",
+                       duration_minutes=125, stops=stops, source=source)
+
+def fetcher(*results, delays=()):
+    """Provider fetch returning results[n] (after delays[n] seconds) on its nth call"""
+    calls = []
+
+    def fetch(*args):
+        call = len(calls)
+        calls.append(call)
+        if call < len(delays):
+            time.sleep(delays[call])
+        result = results[min(call, len(results) - 1)]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    fetch.is_cached = lambda *args: False
+    fetch.calls = calls
+    return fetch
+
+@pytest.fixture
+def providers(monkeypatch):
+    """Install fake providers: providers['name'] = fetch"""
+    installed = {}
+    monkeypatch.setattr(flight_aggregator, 'flight_providers',
+                        lambda *args, **kwargs: {name: (fetch, (), list) for name, fetch in installed.items()})
+    monkeypatch.setattr(flight_aggregator, 'latency', LatencyTracker())
+    monkeypatch.setattr(config, 'FLIGHT_HEDGE_AFTER', 0.1)
+    return installed
+
+def search(**kwargs):
+    return search_flights("JNB", "CPT", date(2026, 12, 1), date(2026, 12, 5), **kwargs)
+
+def test_same_flight_from_two_providers_keeps_the_cheaper_copy():
+    amadeus = offer("FA", 1200.0)
+    skyscanner = offer("FlySafair", 1100.0, source='Skyscanner API')
+    other = offer("SA", 1500.0, departs="2026-12-01T12:00")
+    assert offer_key(amadeus) == offer_key(skyscanner)
+    assert merge_offers([[amadeus, other], [skyscanner]]) == [skyscanner, other]
+
+def test_offers_from_every_provider_are_merged_without_demo_data(providers):
+    providers['amadeus'] = fetcher([offer("FA", 1200.0), offer("SA", 1500.0, departs="2026-12-01T12:00")])
+    providers['skyscanner'] = fetcher([offer("FlySafair", 1100.0, source='Skyscanner API'), {'airline': "Demo", 'mock_data': True}])
+    results = search()
+    assert sorted(result.amount for result in results) == [1100.0, 1500.0]
+
+def test_failed_provider_does_not_block_the_others(providers, caplog):
+    providers['amadeus'] = fetcher(RuntimeError("down"))
+    providers['skyscanner'] = fetcher([offer("FlySafair", 1100.0)])
+    assert [result.amount for result in search()] == [1100.0]
+    assert flight_aggregator.latency.get_metrics()['amadeus']['failures'] == 1
+    assert "amadeus flight search failed: down" in caplog.text
+
+def test_provider_without_offers_is_not_a_failure(providers):
+    providers['amadeus'] = fetcher(None)
+    providers['skyscanner'] = fetcher([offer("FlySafair", 1100.0)])
+    assert [result.amount for result in search()] == [1100.0]
+    assert flight_aggregator.latency.get_metrics()['amadeus']['failures'] == 0
+
+def test_slow_calls_are_hedged_and_the_first_answer_wins(providers):
+    providers['amadeus'] = fetcher([offer("FA", 1200.0)], delays=(2, 0))
+    started = time.time()
+    assert [result.amount for result in search(good_enough=1)] == [1200.0]
+    assert time.time() - started < 1.5
+    metrics = flight_aggregator.latency.get_metrics()['amadeus']
+    assert (metrics['calls'], metrics['hedges'], metrics['hedge_wins']) == (1, 1, 1)
+
+def test_search_returns_at_the_deadline_without_slow_providers(providers):
+    providers['amadeus'] = fetcher([offer("FA", 1200.0)])
+    providers['skyscanner'] = fetcher([offer("FlySafair", 900.0, departs="2026-12-01T12:00")], delays=(3, 3))
+    started = time.time()
+    assert [result.amount for result in search(timeout=0.5)] == [1200.0]
+    assert time.time() - started < 1.5
+
+def test_latency_percentile_replaces_the_default_hedge_delay(monkeypatch):
+    monkeypatch.setattr(config, 'FLIGHT_HEDGE_PERCENTILE', 90)
+    tracker = LatencyTracker()
+    assert tracker.hedge_delay('amadeus') == config.FLIGHT_HEDGE_AFTER
+    for seconds in (1, 2, 3, 4, 5, 6, 7, 8, 9, 10):
+        tracker.record('amadeus', seconds)
+    assert tracker.hedge_delay('amadeus') == 10
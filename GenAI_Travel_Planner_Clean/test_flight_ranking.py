@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for vectorized flight offer ranking and bounded top-k selection
+"""
+
+import math
+import random
+import numpy as np
+import pytest
+from flight_ranking import (
+    OfferTable,
+    offer_cost,
+    parse_amount,
+    parse_duration_minutes,
+    parse_hour,
+    rank_offers,
+    time_window,
+    top_offers,
+    window_distance,
+)
+from travel_records import FlightOffer
+
+MORNING = "🌅 Morning (06:00-12:00)"
+LATE_NIGHT = "🦉 Late Night (00:00-06:00)"
+EVENING = "🌙 Evening (18:00-00:00)"
+
+def offer(airline, amount, departs="07:00", minutes=120, stops=0, currency="ZAR"):
+    return FlightOffer(airline=airline, price=f"{currency} {amount}", amount=amount, currency=currency,
+                       departure_time=f"2026-12-01T{departs}:00", duration_minutes=minutes, stops=stops)
+
+def test_fields_parse_from_records_and_legacy_dicts():
+    assert parse_hour("2026-11-01T06:30:00") == 6.5 and parse_hour("18:15") == 18.25
+    assert math.isnan(parse_hour(None))
+    assert parse_amount({'price': "ZAR 1,500.50"}) == 1500.5
+    assert parse_amount({'price': {'total': "850"}}) == 850.0
+    assert parse_duration_minutes({'total_duration': "8h 30m"}) == 510
+    assert parse_duration_minutes({'duration': "275 min"}) == 275
+    assert math.isnan(parse_duration_minutes({}))
+
+def test_time_windows_wrap_past_midnight():
+    assert time_window(MORNING) == (6, 12)
+    assert time_window(EVENING) == (18, 24)
+    assert time_window("⏰ Any Time") is None
+    hours = np.array([7.0, 13.0, 23.0, np.nan])
+    assert list(window_distance(hours, (22, 26))) == [pytest.approx(5 / 12), pytest.approx(9 / 12), 0.0, 1.0]
+
+def test_price_only_ranking_is_cheapest_first():
+    offers = [offer("A", 1500.0), offer("B", 900.0), offer("C", 1200.0)]
+    assert [ranked.airline for ranked in rank_offers(offers, weights={'price': 1})] == ["B", "C", "A"]
+
+def test_time_preference_outweighs_a_small_price_difference():
+    offers = [offer("Night", 1000.0, departs="02:00"), offer("Morning", 1050.0, departs="08:00"),
+              offer("Pricey", 2000.0, departs="09:00")]
+    assert rank_offers(offers)[0].airline == "Night"
+    assert rank_offers(offers, departure_time_pref=MORNING)[0].airline == "Morning"
+    assert rank_offers(offers, departure_time_pref=LATE_NIGHT)[0].airline == "Night"
+
+def test_stops_and_duration_count_against_an_offer():
+    offers = [offer("Connecting", 1000.0, minutes=400, stops=2), offer("Direct", 1000.0)]
+    assert [ranked.airline for ranked in rank_offers(offers, top=1)] == ["Direct"]
+
+def test_prices_are_compared_in_one_currency():
+    offers = [offer("Dollars", 100.0, currency="USD"), offer("Rand", 1000.0)]
+    table = OfferTable(offers, "ZAR")
+    assert table.price[0] > 1000.0
+    assert rank_offers(offers, weights={'price': 1}, currency="ZAR")[0].airline == "Rand"
+
+def test_missing_values_rank_last_and_dicts_are_accepted():
+    offers = [{'airline': "Unknown", 'price': "N/A"}, {'airline': "Known", 'price': "ZAR 1200", 'total_duration': "2h"}]
+    assert [ranked['airline'] for ranked in rank_offers(offers)] == ["Known", "Unknown"]
+    assert rank_offers([]) == []
+
+def test_top_offers_keeps_the_best_k_per_departure_bucket():
+    generator = random.Random(43)
+    offers = [offer(f"O{index}", generator.uniform(500, 3000), departs=f"{generator.randrange(24):02d}:00",
+                    minutes=generator.randrange(60, 600), stops=generator.randrange(3)) for index in range(300)]
+    expected = []
+    for bucket in range(4):
+        members = [item for item in offers if int(parse_hour(item.departure_time) // 6) == bucket]
+        expected.extend(sorted(members, key=offer_cost)[:5])
+    kept = top_offers(iter(offers + [None]), 5)
+    assert kept == sorted(expected, key=offer_cost)
+
+def test_top_offers_keeps_input_order_for_equal_costs():
+    offers = [offer(name, 1000.0) for name in "ABC"]
+    assert [kept.airline for kept in top_offers(offers, 2)] == ["A", "B"]
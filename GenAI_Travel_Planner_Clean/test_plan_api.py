@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for the plan generation API request model
+"""
+
+from fastapi.testclient import TestClient
+import plan_api
+from config import config
+from plan_api import PlanRequest
+from plan_pipeline import TRIP_DEFAULTS
+
+TRIP = {
+    'source': "Durban, South Africa",
+    'destination': "Cape Town, South Africa",
+    'departure_date': "2026-11-01",
+    'return_date': "2026-11-05",
+    'flight_class': "business",
+    'flex_days': 2,
+    'optimize_for': "duration",
+}
+
+class RecordingQueue:
+    def __init__(self):
+        self.trips = []
+
+    def submit(self, trip, job_id=None):
+        self.trips.append(trip)
+        return job_id or "job-1"
+
+def test_request_model_keeps_every_trip_field():
+    missing = set(TRIP_DEFAULTS) - set(PlanRequest.model_fields)
+    assert not missing, f"PlanRequest drops {sorted(missing)}"
+
+def test_submitted_trip_keeps_flex_days(monkeypatch):
+    queue = RecordingQueue()
+    monkeypatch.setattr(plan_api, 'job_queue', queue)
+    response = TestClient(plan_api.app).post("/plans", json=TRIP)
+    assert response.status_code == 202
+    assert queue.trips[0]['flex_days'] == 2
+    assert queue.trips[0]['optimize_for'] == "duration"
+
+def test_destination_is_required(monkeypatch):
+    monkeypatch.setattr(plan_api, 'job_queue', RecordingQueue())
+    trip = {key: value for key, value in TRIP.items() if key != 'destination'}
+    assert TestClient(plan_api.app).post("/plans", json=trip).status_code == 422
+
+def test_oversized_multi_city_requests_are_rejected(monkeypatch):
+    queue = RecordingQueue()
+    monkeypatch.setattr(plan_api, 'job_queue', queue)
+    monkeypatch.setattr(config, 'MULTI_CITY_MAX_DESTINATIONS', 2)
+    trip = dict(TRIP, destinations=["Cape Town", "Durban", "Paris"])
+    assert TestClient(plan_api.app).post("/plans", json=trip).status_code == 422
+    assert queue.trips == []
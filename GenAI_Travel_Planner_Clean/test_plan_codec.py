@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the versioned plan serialization format
+"""
+
+import json
+import zlib
+from datetime import date
+import msgpack
+import pytest
+import plan_codec
+from travel_records import FlightOffer, Link, LocalInfo, Place
+
+PLAN = {
+    'destination': "Cape Town, South Africa",
+    'departure_date': date(2026, 12, 1),
+    'num_travelers': 2,
+    'attractions': [Place(name="Table Mountain", rating=4.8, place_types=('park', 'tourist_attraction'))],
+    'flights': [FlightOffer(airline="SA", price="ZAR 1500", amount=1500.0, currency="ZAR")],
+    'local_info': [LocalInfo(category="Transport", sources=(Link(title="MyCiTi", link="https://myciti.org.za"),))],
+    'itinerary': "Day 1: Waterfront. " * 100,
+}
+
+EXPECTED = dict(PLAN, departure_date="2026-12-01")
+
+@pytest.mark.parametrize('codec', ['m', 'j'])
+@pytest.mark.parametrize('compress', [True, False])
+def test_round_trip_restores_records(codec, compress):
+    data = plan_codec.encode(PLAN, compress=compress, codec=codec)
+    assert data[:4] == plan_codec.MAGIC + bytes([plan_codec.FORMAT_VERSION])
+    assert data[4:6] == (codec + ('s' if compress else 'n')).encode('ascii')
+    assert plan_codec.decode(data) == EXPECTED
+
+def test_small_payloads_are_not_compressed():
+    assert plan_codec.encode({'a': 1})[5:6] == b'n'
+
+def test_version_1_payloads_still_decode():
+    plain = {'destination': "Paris, France", 'attractions': [{'name': "Louvre", 'rating': 4.7}]}
+    body = zlib.compress(msgpack.packb(plain, use_bin_type=True))
+    assert plan_codec.decode(plan_codec.MAGIC + bytes([1]) + b"mz" + body) == plain
+
+def test_legacy_json_payloads_still_decode():
+    legacy = json.dumps({'destination': "Paris, France"})
+    assert plan_codec.decode(legacy) == plan_codec.decode(legacy.encode('utf-8')) == {'destination': "Paris, France"}
+
+def test_newer_versions_are_refused():
+    data = bytearray(plan_codec.encode({'a': 1}))
+    data[len(plan_codec.MAGIC)] = plan_codec.FORMAT_VERSION + 1
+    with pytest.raises(ValueError):
+        plan_codec.decode(bytes(data))
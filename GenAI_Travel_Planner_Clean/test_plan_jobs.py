@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-process plan job queue
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+import plan_pipeline
+from plan_jobs import (
+    LocalJobQueue,
+    JobStore,
+    JobNotFound,
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    STALE_JOB_SECONDS,
+)
+
+TRIP = {'destination': "Cape Town, South Africa", 'departure_date': "2026-11-01", 'return_date': "2026-11-05"}
+
+class FakePipeline:
+    """generate_travel_plan stand-in: one 'summary' stage, counting runs and rebuilds from stored stages"""
+
+    def __init__(self, queue=None):
+        self.queue = queue
+        self.runs = 0
+        self.rebuilds = 0
+        self.lock_free_during_rebuild = []
+
+    def __call__(self, trip, progress=None, completed=None, on_result=None):
+        completed = completed or {}
+        if 'summary' in completed and on_result is None:
+            self.rebuilds += 1
+            if self.queue is not None:
+                self.lock_free_during_rebuild.append(self._lock_is_free())
+        else:
+            self.runs += 1
+            if progress:
+                progress('summary', 50, "Summarizing")
+            completed['summary'] = f"Plan for {trip['destination']}"
+            if on_result:
+                on_result('summary', completed['summary'])
+        return {'summary': completed['summary']}
+
+    def _lock_is_free(self):
+        acquired = []
+
+        def try_lock():
+            acquired.append(self.queue.condition.acquire(timeout=1))
+            if acquired[0]:
+                self.queue.condition.release()
+
+        thread = threading.Thread(target=try_lock)
+        thread.start()
+        thread.join()
+        return acquired[0]
+
+def finish(queue, job_id):
+    while queue.get_status(job_id)['status'] != JOB_DONE:
+        queue.get_events(job_id, len(queue.get_status(job_id)['completed_stages']), wait=1)
+
+def test_job_runs_and_reports_progress(monkeypatch, tmp_path):
+    pipeline = FakePipeline()
+    monkeypatch.setattr(plan_pipeline, 'generate_travel_plan', pipeline)
+    queue = LocalJobQueue(workers=1, store=JobStore(str(tmp_path / "jobs.db")))
+    job_id = queue.submit(TRIP)
+    finish(queue, job_id)
+    assert queue.get_result(job_id) == {'summary': "Plan for Cape Town, South Africa"}
+    stages = [event['stage'] for event in queue.get_events(job_id)]
+    assert stages == ['started', 'summary', 'finished']
+    assert queue.submit(TRIP, job_id=job_id) == job_id  # reattaches instead of running again
+    assert pipeline.runs == 1
+
+def test_unknown_job_raises(tmp_path):
+    queue = LocalJobQueue(workers=1, store=JobStore(str(tmp_path / "jobs.db")))
+    try:
+        queue.get_status("missing")
+    except JobNotFound:
+        pass
+    else:
+        raise AssertionError("expected JobNotFound")
+
+def test_finished_jobs_are_evicted_and_reloaded(monkeypatch, tmp_path):
+    queue = LocalJobQueue(workers=1, store=JobStore(str(tmp_path / "jobs.db")), finished_in_memory=2)
+    pipeline = FakePipeline(queue)
+    monkeypatch.setattr(plan_pipeline, 'generate_travel_plan', pipeline)
+    job_ids = [queue.submit(dict(TRIP, destination=f"City {index}")) for index in range(4)]
+    for job_id in job_ids:
+        finish(queue, job_id)
+    queue.executor.shutdown(wait=True)  # workers retire a job just after reporting it done
+
+    assert not queue.jobs
+    assert list(queue.finished) == job_ids[-2:]
+    assert queue.get_result(job_ids[0]) == {'summary': "Plan for City 0"}
+    assert pipeline.runs == 4 and pipeline.rebuilds == 1
+    assert pipeline.lock_free_during_rebuild == [True]
+    assert len(queue.finished) == 2 and job_ids[0] in queue.finished
+
+def test_finished_jobs_stay_in_memory_without_a_store(monkeypatch):
+    monkeypatch.setattr(plan_pipeline, 'generate_travel_plan', FakePipeline())
+    queue = LocalJobQueue(workers=1, finished_in_memory=0)
+    job_id = queue.submit(TRIP)
+    finish(queue, job_id)
+    assert queue.get_result(job_id) == {'summary': "Plan for Cape Town, South Africa"}
+
+def stored_job(store, job_id, status, idle_seconds, stages=()):
+    """Job left in the store by another process that last updated it idle_seconds ago"""
+    updated_at = (datetime.now() - timedelta(seconds=idle_seconds)).isoformat()
+    store.save_job({'id': job_id, 'status': status, 'request': TRIP, 'error': None,
+                    'created_at': updated_at, 'updated_at': updated_at})
+    for stage, result in stages:
+        store.save_stage(job_id, stage, result)
+
+def test_stale_jobs_resume_from_their_saved_stages(monkeypatch, tmp_path):
+    completed_seen = []
+
+    def pipeline(trip, progress=None, completed=None, on_result=None):
+        completed_seen.append(dict(completed))
+        return dict(completed, summary="resumed")
+
+    monkeypatch.setattr(plan_pipeline, 'generate_travel_plan', pipeline)
+    store = JobStore(str(tmp_path / "jobs.db"))
+    stored_job(store, "crashed", JOB_RUNNING, STALE_JOB_SECONDS + 60, stages=[('flights', ["saved offer"])])
+
+    queue = LocalJobQueue(workers=1, store=store)
+    finish(queue, "crashed")
+    assert completed_seen[0] == {'flights': ["saved offer"]}
+    assert queue.get_result("crashed") == {'flights': ["saved offer"], 'summary': "resumed"}
+    assert queue.get_events("crashed")[0]['message'].startswith("♻️")
+
+def test_jobs_still_running_elsewhere_are_not_taken_over(monkeypatch, tmp_path):
+    pipeline = FakePipeline()
+    monkeypatch.setattr(plan_pipeline, 'generate_travel_plan', pipeline)
+    store = JobStore(str(tmp_path / "jobs.db"))
+    stored_job(store, "busy", JOB_RUNNING, 5)
+
+    queue = LocalJobQueue(workers=1, store=store)
+    assert queue.get_status("busy")['status'] == JOB_RUNNING
+    queue.executor.shutdown(wait=True)
+    assert pipeline.runs == 0 and "busy" not in queue.jobs
+
+def test_running_jobs_heartbeat_through_long_stages(monkeypatch, tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    touches = []
+
+    def pipeline(trip, progress=None, completed=None, on_result=None):
+        for _ in range(3):
+            time.sleep(0.1)
+            touches.append(store.load_job("slow")['updated_at'])
+        return {'summary': "slow"}
+
+    monkeypatch.setattr(plan_pipeline, 'generate_travel_plan', pipeline)
+    queue = LocalJobQueue(workers=1, store=store, heartbeat_seconds=0.04)
+    finish(queue, queue.submit(TRIP, job_id="slow"))
+    assert len(set(touches)) == 3  # no progress events, yet the stored row kept moving
+
+def test_only_one_process_claims_a_stale_job(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    stored_job(store, "orphan", JOB_RUNNING, STALE_JOB_SECONDS + 60)
+    seen = store.load_job("orphan")['updated_at']
+    now = datetime.now().isoformat()
+    assert store.claim("orphan", seen, now)
+    assert not store.claim("orphan", seen, now)
+    assert store.load_job("orphan")['status'] == JOB_QUEUED
+
+def test_failures_are_recorded(monkeypatch, tmp_path):
+    def pipeline(trip, progress=None, completed=None, on_result=None):
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(plan_pipeline, 'generate_travel_plan', pipeline)
+    store = JobStore(str(tmp_path / "jobs.db"))
+    queue = LocalJobQueue(workers=1, store=store)
+    job_id = queue.submit(TRIP)
+    queue.executor.shutdown(wait=True)
+    status = queue.get_status(job_id)
+    assert (status['status'], status['error']) == (JOB_FAILED, "provider down")
+    assert store.load_job(job_id)['status'] == JOB_FAILED
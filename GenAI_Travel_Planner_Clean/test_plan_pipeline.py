@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for plan assembly helpers
+"""
+
+from datetime import date
+import pytest
+import plan_pipeline
+from config import config
+from plan_pipeline import generate_multi_city_plan, generate_travel_plan, normalize_trip, plan_notices
+from rate_limiter import QuotaExceeded, RateLimitTimeout
+
+def test_notices_report_missing_coordinates_and_fares():
+    plan = {'destination': "Cape Town, South Africa", 'coords': None, 'flights': []}
+    assert [notice['level'] for notice in plan_notices(plan)] == ['warning', 'info']
+    assert "Cape Town" in plan_notices(plan)[0]['message']
+
+def test_complete_and_older_plans_have_no_notices():
+    assert plan_notices({'destination': "Paris, France", 'coords': (48.8, 2.3), 'flights': [{'price': "EUR 90"}]}) == []
+    assert plan_notices({'destination': "Paris, France"}) == []
+
+def test_multi_city_notices_name_each_city():
+    plan = {'flights': [{'price': "ZAR 900"}], 'cities': [
+        {'destination': "Paris, France", 'coords': (48.8, 2.3)},
+        {'destination': "Nowhere, Atlantis", 'coords': None},
+    ]}
+    assert [notice['message'].split(';')[0] for notice in plan_notices(plan)] == [
+        "Could not find coordinates for Nowhere, Atlantis"]
+
+def test_normalize_trip_parses_dates():
+    trip = normalize_trip({'source': "Johannesburg, South Africa", 'destination': "Cape Town, South Africa",
+                           'departure_date': "2026-12-01", 'return_date': "2026-12-05"})
+    assert (trip['departure_date'], trip['return_date']) == (date(2026, 12, 1), date(2026, 12, 5))
+
+def test_multi_city_plans_reject_too_many_destinations(monkeypatch):
+    monkeypatch.setattr(config, 'MULTI_CITY_MAX_DESTINATIONS', 2)
+    monkeypatch.setattr(plan_pipeline, 'leg_matrix', lambda *args, **kwargs: pytest.fail("legs priced"))
+    trip = {'source_iata': "JNB", 'destinations': ["Cape Town", "Durban", "Paris"],
+            'destination_iatas': ["CPT", "DUR", "CDG"]}
+    with pytest.raises(ValueError, match="at most 2"):
+        generate_multi_city_plan(trip)
+
+def test_stages_out_of_capacity_are_skipped_with_a_notice(monkeypatch):
+    def out_of_capacity(error):
+        def runner(trip, results):
+            raise error
+        return runner
+
+    monkeypatch.setattr(plan_pipeline, 'PLAN_STAGES', [
+        ('restaurants', 25, "", out_of_capacity(QuotaExceeded("google_places daily quota of 10 calls reached"))),
+        ('attractions', 55, "", lambda trip, results: [{'name': "Table Mountain"}]),
+        ('itinerary', 95, "", out_of_capacity(RateLimitTimeout("No gemini capacity within 30s"))),
+    ])
+    completed = []
+    plan = generate_travel_plan({'source': "Johannesburg, South Africa", 'destination': "Cape Town, South Africa",
+                                 'departure_date': "2026-12-01", 'return_date': "2026-12-05"},
+                                on_result=lambda stage, result: completed.append(stage))
+    assert (plan['restaurants'], plan['itinerary']) == ([], "")
+    assert completed == ['attractions']
+    messages = [notice['message'] for notice in plan_notices(plan)]
+    assert messages[0].startswith("Restaurants for Cape Town, South Africa is unavailable right now (google_places")
+    assert messages[1].startswith("Itinerary for Cape Town")
+
+def test_llm_calls_wait_for_the_queue_ahead_of_them(monkeypatch):
+    timeouts = []
+    monkeypatch.setattr(plan_pipeline.limiter, 'queue_wait', lambda provider: 32.0)
+    monkeypatch.setattr(plan_pipeline.limiter, 'acquire', lambda provider, timeout=None: timeouts.append(timeout))
+    plan_pipeline.acquire_llm()
+    assert timeouts == [32.0 + config.RATE_LIMIT_TIMEOUT]
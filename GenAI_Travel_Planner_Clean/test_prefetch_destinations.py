@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests for the nightly destination prefetch job
+"""
+
+import io
+from datetime import date
+import prefetch_destinations
+from prefetch_destinations import destination_tasks, parse_budget, run_prefetch, upcoming_months
+from rate_limiter import QuotaExceeded
+
+def test_parse_budget():
+    assert parse_budget("google_places=2000, serpapi=300,") == {'google_places': 2000, 'serpapi': 300}
+    assert parse_budget("") == {}
+
+def test_upcoming_months_roll_over_the_year():
+    assert upcoming_months(3, today=date(2026, 11, 20)) == ["November 2026", "December 2026", "January 2027"]
+
+def test_tasks_cover_every_provider_query_once():
+    tasks = destination_tasks("Cape Town, South Africa", themes=["💼 Business Trip", "🏖️ Relaxation"],
+                              budgets=["💰 Economy", "💎 Luxury"], months=["December 2026"])
+    labels = [label for _, label, _ in tasks]
+    assert labels[0] == 'geocode' and 'business venues' in labels and 'attractions' in labels
+    restaurants = [label for label in labels if label.startswith("restaurants")]
+    assert len(restaurants) == len(set(restaurants)) <= 4
+    assert [(provider, label) for provider, label, _ in tasks if provider == 'serpapi'] == [
+        ('serpapi', 'local info'), ('serpapi', 'events December 2026')]
+
+def test_quota_errors_skip_the_rest_of_a_provider(monkeypatch):
+    warmed = []
+
+    def warm(name, outcome):
+        def run(min_ttl):
+            warmed.append(name)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+        return run
+
+    monkeypatch.setattr(prefetch_destinations, 'destination_tasks', lambda city: [
+        ('google_places', 'geocode', warm('geocode', True)),
+        ('google_places', 'attractions', warm('attractions', QuotaExceeded("quota spent"))),
+        ('google_places', 'business venues', warm('business venues', True)),
+        ('serpapi', 'local info', warm('local info', False)),
+        ('serpapi', 'events', warm('events', RuntimeError("bad reply"))),
+    ])
+    stats = run_prefetch(["Cape Town, South Africa"], {}, log=io.StringIO())
+
+    assert warmed == ['geocode', 'attractions', 'local info', 'events']
+    assert {key: stats[key] for key in ('fetched', 'fresh', 'skipped', 'failed')} == {
+        'fetched': 1, 'fresh': 1, 'skipped': 2, 'failed': 1}
+
+def test_spent_budget_skips_a_provider(monkeypatch):
+    monkeypatch.setattr(prefetch_destinations, 'destination_tasks', lambda city: [
+        ('serpapi', 'local info', lambda min_ttl: True),
+    ])
+    stats = run_prefetch(["Cape Town, South Africa", "Paris, France"], {'serpapi': 0}, log=io.StringIO())
+    assert (stats['fetched'], stats['skipped']) == (0, 2)
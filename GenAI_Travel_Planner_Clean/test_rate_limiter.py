@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared per-provider rate limiter
+"""
+
+import threading
+import time
+import pytest
+from rate_limiter import (
+    ProviderDisabled,
+    QuotaExceeded,
+    RateLimitedClient,
+    RateLimiter,
+    RateLimitTimeout,
+)
+
+def make_limiter(tmp_path, **limits):
+    return RateLimiter(str(tmp_path / "limits.db"), limits, timeout=5)
+
+def test_burst_is_served_then_calls_are_paced(tmp_path):
+    limiter = make_limiter(tmp_path, api={'qps': 20, 'burst': 2, 'daily_quota': 0})
+    started = time.monotonic()
+    for _ in range(4):
+        limiter.acquire('api')
+    # two calls from the burst, then two more at 20 per second
+    assert time.monotonic() - started >= 0.09
+    assert limiter.get_metrics()['api']['acquired'] == 4
+
+def test_daily_quota_is_enforced(tmp_path):
+    limiter = make_limiter(tmp_path, api={'qps': 100, 'daily_quota': 2})
+    limiter.acquire('api')
+    limiter.acquire('api')
+    with pytest.raises(QuotaExceeded):
+        limiter.acquire('api')
+    metrics = limiter.get_metrics()['api']
+    assert (metrics['daily_used'], metrics['quota_rejections']) == (2, 1)
+
+def test_limiters_on_one_file_share_buckets(tmp_path):
+    limits = {'api': {'qps': 0.01, 'daily_quota': 0}}
+    first = RateLimiter(str(tmp_path / "limits.db"), limits, timeout=0.1)
+    second = RateLimiter(str(tmp_path / "limits.db"), limits, timeout=0.1)
+    first.acquire('api')
+    with pytest.raises(RateLimitTimeout):
+        second.acquire('api')
+
+def test_waiters_are_served_in_arrival_order(tmp_path):
+    limiter = make_limiter(tmp_path, api={'qps': 20, 'burst': 1, 'daily_quota': 0})
+    limiter.acquire('api')
+    order = []
+
+    def call(index):
+        limiter.acquire('api')
+        order.append(index)
+
+    threads = []
+    for index in range(4):
+        threads.append(threading.Thread(target=call, args=(index,)))
+        threads[-1].start()
+        time.sleep(0.01)
+    for thread in threads:
+        thread.join()
+    assert order == [0, 1, 2, 3]
+
+def test_zero_qps_disables_a_provider(tmp_path):
+    limiter = make_limiter(tmp_path, api={'qps': 0, 'daily_quota': 0})
+    started = time.monotonic()
+    with pytest.raises(ProviderDisabled):
+        limiter.acquire('api')
+    assert time.monotonic() - started < 1
+
+def test_negative_limits_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        make_limiter(tmp_path, api={'qps': -1, 'daily_quota': 0})
+
+def test_client_proxy_takes_a_token_per_call(tmp_path):
+    limiter = make_limiter(tmp_path, api={'qps': 100, 'daily_quota': 0})
+
+    class Client:
+        name = "client"
+
+        def lookup(self, value):
+            return value * 2
+
+    client = RateLimitedClient(Client(), 'api', limiter=limiter)
+    assert client.lookup(21) == 42
+    assert client.name == "client"
+    assert limiter.get_metrics()['api']['acquired'] == 1
+
+def test_queue_wait_grows_with_waiting_callers(tmp_path):
+    limiter = make_limiter(tmp_path, api={'qps': 4, 'burst': 1, 'daily_quota': 0})
+    assert limiter.queue_wait('api') == 0.0
+    limiter.acquire('api')
+    waiter = threading.Thread(target=limiter.acquire, args=('api',))
+    waiter.start()
+    time.sleep(0.05)
+    assert limiter.queue_wait('api') == 0.25
+    waiter.join()
+    assert limiter.queue_wait('api') == 0.0
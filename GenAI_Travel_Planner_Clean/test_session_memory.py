@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for session memory accounting and plan payload offloading
+"""
+
+import time
+import pytest
+from session_memory import PayloadHandle, PayloadStore, SessionMemory, estimate_size
+
+def make_memory(tmp_path, cap_kb=64, offload_kb=4, **store_options):
+    store = PayloadStore(str(tmp_path / "payloads.db"), **store_options)
+    return SessionMemory(store, cap_bytes=cap_kb * 1024, offload_bytes=offload_kb * 1024)
+
+def test_estimate_size_follows_containers():
+    payload = {'items': [str(index) * 1000 for index in range(10)]}
+    assert estimate_size(payload) > 10 * 1000
+
+def test_large_payloads_are_offloaded_and_loaded_back(tmp_path):
+    memory = make_memory(tmp_path)
+    plan = {'itinerary': "day " * 5000}
+    state = {'plan_snapshot': plan, 'travel_plan_data': plan, 'small': 1}
+    report = memory.account("session-1", state)
+
+    assert isinstance(state['plan_snapshot'], PayloadHandle)
+    assert isinstance(state['travel_plan_data'], PayloadHandle)
+    assert set(report['offloaded']) == {'plan_snapshot', 'travel_plan_data'}
+    assert memory.load(state, 'travel_plan_data') == plan
+    assert memory.load(state, 'small') == 1
+
+def test_small_payloads_stay_in_memory(tmp_path):
+    memory = make_memory(tmp_path)
+    state = {'travel_plan_data': {'summary': "short"}}
+    memory.account("session-1", state)
+    assert state['travel_plan_data'] == {'summary': "short"}
+
+def test_discard_removes_the_stored_payload(tmp_path):
+    memory = make_memory(tmp_path)
+    state = {'plan_snapshot': "x" * 10000}
+    memory.account("session-1", state)
+    payload_id = state['plan_snapshot'].payload_id
+    memory.discard(state, 'plan_snapshot')
+    assert 'plan_snapshot' not in state
+    assert memory.store.get(payload_id) is None
+
+def test_over_cap_sessions_are_counted(tmp_path):
+    memory = make_memory(tmp_path, cap_kb=1, offload_kb=64)
+    memory.account("session-1", {'notes': "x" * 4096})
+    metrics = memory.get_metrics()
+    assert metrics['over_cap'] == 1 and metrics['over_cap_events'] == 1
+
+def test_abandoned_payloads_are_purged_on_write(tmp_path):
+    store = PayloadStore(str(tmp_path / "payloads.db"), retention_seconds=0.05, purge_interval=0.05)
+    abandoned = store.put("old plan")
+    time.sleep(0.1)
+    store.put("new plan")
+    assert store.get(abandoned) is None
+
+def test_offloaded_snapshots_are_stored_with_plan_codec(tmp_path, monkeypatch):
+    import pickle
+    import plan_codec
+    monkeypatch.setattr(pickle, 'dumps', lambda *args, **kwargs: pytest.fail("payload pickled"))
+    monkeypatch.setattr(plan_codec, 'msgpack', None)  # JSON fallback, which has no bytes type of its own
+    memory = make_memory(tmp_path)
+    snapshot = ("job-1", plan_codec.encode({'itinerary': "day " * 5000}, compress=False))
+    state = {'plan_snapshot': snapshot}
+    memory.account("session-1", state)
+
+    assert isinstance(state['plan_snapshot'], PayloadHandle)
+    job_id, payload = memory.load(state, 'plan_snapshot')
+    assert (job_id, payload) == snapshot
+    assert plan_codec.decode(payload) == {'itinerary': "day " * 5000}
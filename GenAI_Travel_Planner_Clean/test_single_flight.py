@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for coalescing identical concurrent provider calls
+"""
+
+import threading
+import time
+import pytest
+from single_flight import SingleFlight, canonical_key, single_flight
+
+def run_concurrently(group, key, fn, callers):
+    """Start callers threads on group.do(key, fn) once the leader is inside fn; returns results and errors"""
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(group.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    threads[0].start()
+    fn.entered.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    while group.stats['coalesced'] < callers - 1:
+        time.sleep(0.001)
+    fn.release.set()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+def blocking(result=None, error=None):
+    """Function that signals entry, then blocks until released"""
+    calls = []
+
+    def fn():
+        calls.append(1)
+        fn.entered.set()
+        fn.release.wait(5)
+        if error:
+            raise error
+        return result
+
+    fn.entered, fn.release, fn.calls = threading.Event(), threading.Event(), calls
+    return fn
+
+def test_concurrent_callers_share_one_call():
+    group = SingleFlight()
+    fn = blocking(result=["shared"])
+    results, errors = run_concurrently(group, "key", fn, 5)
+    assert (len(fn.calls), errors) == (1, [])
+    assert all(result is results[0] for result in results) and len(results) == 5
+    assert group.stats == {'executed': 1, 'coalesced': 4}
+
+def test_errors_reach_every_waiter_and_the_key_is_released():
+    group = SingleFlight()
+    results, errors = run_concurrently(group, "key", blocking(error=RuntimeError("down")), 3)
+    assert results == [] and [str(e) for e in errors] == ["down"] * 3
+    assert group.do("key", lambda: "retried") == "retried"
+
+def test_sequential_calls_are_not_coalesced():
+    group = SingleFlight()
+    assert [group.do("key", lambda: index) for index in range(2)] == [0, 1]
+    assert group.stats == {'executed': 2, 'coalesced': 0}
+
+def lookup(city, country="", coords=None):
+    return city
+
+def test_canonical_key_normalizes_arguments():
+    key = canonical_key(lookup, ("Cape  Town ",), {}, ignore=('coords',))
+    assert key == canonical_key(lookup, (), {'city': "cape town", 'country': "", 'coords': (1, 2)}, ignore=('coords',))
+    assert key != canonical_key(lookup, ("Cape Town", "South Africa"), {}, ignore=('coords',))
+
+def test_decorator_keeps_the_function():
+    decorated = single_flight(ignore=('coords',))(lookup)
+    assert decorated("Paris", coords=(48.8, 2.3)) == "Paris"
+    assert decorated.__name__ == "lookup"
+    with pytest.raises(TypeError):
+        decorated()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests for the seeded synthetic data generators
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import date
+from itertools import islice
+from synthetic_data import batched, main, synthetic_events, synthetic_flights, synthetic_places
+
+DEPARTURE, RETURN = date(2026, 12, 1), date(2026, 12, 6)
+
+def flights(count, seed=0, **kwargs):
+    return list(synthetic_flights("JNB", "CPT", DEPARTURE, RETURN, count, seed, **kwargs))
+
+def test_same_seed_gives_the_same_stream():
+    assert flights(50, seed=7) == flights(50, seed=7)
+    assert flights(50, seed=7) != flights(50, seed=8)
+    assert list(synthetic_places("Cape Town, South Africa", 20, 3)) == list(synthetic_places("Cape Town, South Africa", 20, 3))
+    assert list(synthetic_events("Paris, France", 20, 3, start_date=DEPARTURE)) == \
+        list(synthetic_events("Paris, France", 20, 3, start_date=DEPARTURE))
+
+def test_streams_are_identical_across_processes(tmp_path):
+    output = tmp_path / "flights.jsonl"
+    subprocess.run([sys.executable, "synthetic_data.py", "flights", "--count", "5", "--seed", "4", "--output", str(output)],
+                   cwd=os.path.dirname(__file__), env=dict(os.environ, PYTHONHASHSEED="123"), check=True,
+                   capture_output=True)
+    main(["flights", "--count", "5", "--seed", "4", "--output", str(tmp_path / "local.jsonl")])
+    assert output.read_text(encoding='utf-8') == (tmp_path / "local.jsonl").read_text(encoding='utf-8')
+    assert len(output.read_text(encoding='utf-8').splitlines()) == 5
+
+def test_flights_follow_the_configured_shape():
+    offers = flights(2000, stop_weights=(1, 0, 0))
+    assert {offer.stops for offer in offers} == {0}
+    assert all(offer.departure_time.startswith("2026-12-01") and offer.return_time.startswith("2026-12-06")
+               for offer in offers)
+    narrow = statistics.pstdev(offer.amount for offer in flights(2000, price_sigma=0.05))
+    wide = statistics.pstdev(offer.amount for offer in flights(2000, price_sigma=0.6))
+    assert narrow < wide
+
+def test_places_honour_kind_and_rating_settings():
+    places = list(synthetic_places("Cape Town, South Africa", 500, kind='restaurant', rating_mean=3.0, rating_sd=0.2))
+    assert 2.8 < statistics.mean(place.rating for place in places) < 3.2
+    assert all(place.price_level for place in places)
+    assert len({place.place_id for place in places}) == 500
+
+def test_generators_are_lazy_and_batched():
+    stream = synthetic_flights("JNB", "CPT", DEPARTURE, RETURN, 10 ** 9)
+    assert len(list(islice(stream, 3))) == 3
+    assert [len(batch) for batch in batched(range(7), 3)] == [3, 3, 1]
+    record = json.loads(json.dumps(next(synthetic_events("Paris, France", 1, start_date=DEPARTURE)).to_dict()))
+    assert record['name'].startswith("Paris ")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the slotted travel record types and their provider converters
+"""
+
+import json
+import pytest
+from travel_records import (
+    Event,
+    FlightOffer,
+    LocalInfo,
+    Place,
+    flight_from_amadeus,
+    flight_from_skyscanner,
+    local_info_from_serpapi,
+    place_from_google,
+    to_plain,
+)
+
+AMADEUS_OFFER = {
+    'id': "7",
+    'price': {'currency': "ZAR", 'total': "2450.50"},
+    'itineraries': [
+        {'duration': "PT2H5M", 'segments': [
+            {'carrierCode': "FA", 'departure': {'iataCode': "JNB", 'at': "2026-12-01T07:00"},
+             'arrival': {'iataCode': "CPT", 'at': "2026-12-01T09:05"}},
+        ]},
+        {'duration': "PT1H55M", 'segments': [{'departure': {'iataCode': "CPT", 'at': "2026-12-05T18:00"}}]},
+    ],
+}
+
+def test_records_read_like_the_dicts_they_replace():
+    place = Place(name="Table Mountain", rating=4.8)
+    assert place['name'] == "Table Mountain"
+    assert place.get('price_level', 'N/A') == 'N/A' and place.get('unknown') is None
+    assert 'rating' in place and 'price_level' not in place
+    with pytest.raises(KeyError):
+        place['photo_url']
+    assert not hasattr(place, '__dict__')
+
+def test_from_dict_ignores_unknown_keys_and_to_dict_drops_unset_fields():
+    event = Event.from_dict({'name': "Jazz Festival", 'date': "Dec 2026", 'unknown': 1})
+    assert event.to_dict() == {'name': "Jazz Festival", 'description': '', 'date': "Dec 2026", 'website': '',
+                               'category': 'Event', 'icon': '🎪'}
+
+def test_amadeus_offers_convert():
+    offer = flight_from_amadeus(AMADEUS_OFFER)
+    assert (offer.price, offer.amount, offer.currency) == ("ZAR 2450.50", 2450.5, "ZAR")
+    assert (offer.duration_minutes, offer.stops, offer.return_time) == (240, 0, "2026-12-05T18:00")
+    assert flight_from_amadeus({'itineraries': []}) is None
+
+def test_skyscanner_prices_carry_their_currency():
+    itinerary = {'price': {'raw': 99.0, 'formatted': "99"}, 'legs': [{'durationInMinutes': 125, 'segments': [{}, {}]}]}
+    offer = flight_from_skyscanner(itinerary, "https://example.com", currency="EUR")
+    assert (offer.price, offer.total_duration, offer.stops) == ("EUR 99", "2h 5m", 1)
+    assert flight_from_skyscanner(itinerary, "https://example.com").price == "$99"
+
+def test_google_and_serpapi_payloads_convert():
+    place = place_from_google({'name': "Zeitz MOCAA", 'opening_hours': {'weekday_text': ["Mon", "Tue", "Wed"]}},
+                              "abc", place_types=['museum'])
+    assert (place.hours, place.place_types, place.address) == ("Mon; Tue...", ('museum',), 'Address not available')
+
+    info = local_info_from_serpapi([{'title': "Guide", 'link': "https://guide", 'snippet': "Use MyCiTi buses"},
+                                    {'title': "Empty"}], "Transport", "🚌")
+    assert info.summary == "Use MyCiTi buses" and [source.title for source in info.sources] == ["Guide"]
+    assert LocalInfo.from_dict(info.to_dict()) == info
+
+def test_plans_with_records_serialize_as_plain_json():
+    plan = {'flights': [FlightOffer(airline="FA", price="ZAR 100")], 'attractions': [Place(name="Museum")]}
+    assert json.loads(json.dumps(plan, default=to_plain)) == {
+        'flights': [FlightOffer(airline="FA", price="ZAR 100").to_dict()],
+        'attractions': [Place(name="Museum").to_dict()],
+    }
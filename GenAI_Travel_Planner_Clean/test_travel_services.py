@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Tests for Places candidate selection and fetcher behaviour in the travel data services
+"""
+
+import threading
+from datetime import date
+from types import SimpleNamespace
+import pytest
+import travel_services
+from amadeus import ResponseError, ServerError
+from rate_limiter import QuotaExceeded
+from travel_services import place_score, select_places
+
+def nearby(place_id, rating, reviews, types=('tourist_attraction',)):
+    return {'place_id': place_id, 'rating': rating, 'user_ratings_total': reviews, 'types': list(types)}
+
+class FakePlaces:
+    """Google Maps client answering nearby searches from a fixed result list and counting detail calls"""
+
+    def __init__(self, results):
+        self.results = results
+        self.details = []
+
+    def places_nearby(self, **params):
+        return {'results': self.results}
+
+    def place(self, place_id, fields):
+        self.details.append(place_id)
+        return {'result': {'name': place_id}}
+
+def test_place_score_weighs_reviews():
+    assert place_score(nearby('a', 4.7, 3000)) > place_score(nearby('b', 5.0, 3))
+    assert place_score({'place_id': 'c'}) == 0.0
+
+def test_select_places_ranks_before_detail():
+    places = [nearby('low', 3.9, 500), nearby('high', 4.8, 900), nearby('mid', 4.4, 900)]
+    assert [place['place_id'] for place in select_places(places, 2)] == ['high', 'mid']
+
+def test_select_places_prefers_one_per_group():
+    places = [nearby('museum-1', 4.9, 900, ['museum']), nearby('museum-2', 4.8, 900, ['museum']),
+              nearby('zoo', 4.2, 900, ['zoo']), nearby('park', 4.0, 900, ['park'])]
+    chosen = select_places(places, 3, group=lambda place: place['types'][0])
+    assert [place['place_id'] for place in chosen] == ['museum-1', 'zoo', 'park']
+
+def test_select_places_fills_when_fewer_groups_than_k():
+    places = [nearby(f"museum-{index}", 4.0 + index / 10, 900, ['museum']) for index in range(4)]
+    places.append(nearby('zoo', 3.5, 900, ['zoo']))
+    chosen = select_places(places, 3, group=lambda place: place['types'][0])
+    assert len(chosen) == 3
+    assert [place['place_id'] for place in chosen] == ['museum-3', 'museum-2', 'zoo']
+
+def test_attractions_fetch_details_for_top_three_only(monkeypatch):
+    client = FakePlaces([nearby(f"p{index}", 4.0 + index / 10, 100) for index in range(6)])
+    monkeypatch.setattr(travel_services, 'gmaps', client)
+    attractions = travel_services.fetch_google_attractions("Single Category Town", "", coords=(-33.9, 18.4))
+    assert [attraction['name'] for attraction in attractions] == ['p5', 'p4', 'p3']
+    assert sorted(client.details) == ['p3', 'p4', 'p5']
+
+def test_fetchers_leave_rendering_to_the_app(monkeypatch):
+    # Fetchers run on worker threads without a Streamlit script context, so they must not render
+    assert 'st' not in vars(travel_services)
+    monkeypatch.setattr(travel_services, 'geocode_location', lambda location: None)
+    results = []
+    worker = threading.Thread(target=lambda: results.append(travel_services.fetch_google_attractions("Unmapped Town")))
+    worker.start()
+    worker.join()
+    assert results == [[]]
+
+class PagedPlaces:
+    """Google Maps client serving each search type as pages of results linked by page tokens"""
+
+    def __init__(self, pages):
+        self.pages = pages  # search type -> list of pages (lists of place ids)
+        self.requests = []
+
+    def _page(self, search_type, number):
+        page = {'results': [nearby(place_id, 4.5, 100) for place_id in self.pages[search_type][number]]}
+        if number + 1 < len(self.pages[search_type]):
+            page['next_page_token'] = f"{search_type}:{number + 1}"
+        return page
+
+    def places_nearby(self, page_token=None, **params):
+        self.requests.append(page_token or params['type'])
+        if page_token:
+            search_type, number = page_token.split(':')
+            return self._page(search_type, int(number))
+        return self._page(params['type'], 0)
+
+def test_nearby_search_pages_until_enough_distinct_places(monkeypatch):
+    client = PagedPlaces({'tourist_attraction': [["a", "b"], ["c", "d"], ["e"]], 'museum': [["b", "f"], ["g"]]})
+    monkeypatch.setattr(travel_services, 'gmaps', client)
+    monkeypatch.setattr(travel_services, 'NEXT_PAGE_DELAY', 0)
+    searches = [{'type': 'tourist_attraction'}, {'type': 'museum'}]
+
+    places = travel_services.search_nearby_places((0, 0), 1000, searches, min_results=5, max_pages=2)
+    assert [place['place_id'] for place in places] == ["a", "b", "c", "d", "f"]
+    assert client.requests == ['tourist_attraction', 'tourist_attraction:1', 'museum']
+
+class FakeFlightSearch:
+    """Amadeus flight offers endpoint answering every search with one response, or raising one error"""
+
+    def __init__(self, data=None, error=None):
+        self.data, self.error = data, error
+
+    def get(self, **params):
+        if self.error:
+            raise self.error
+        return SimpleNamespace(data=self.data)
+
+def amadeus_with(search):
+    return SimpleNamespace(shopping=SimpleNamespace(flight_offers_search=search))
+
+def test_amadeus_flights_without_offers_are_an_empty_list(monkeypatch):
+    monkeypatch.setattr(travel_services, 'amadeus', amadeus_with(FakeFlightSearch(data=[])))
+    fetch = travel_services.fetch_amadeus_flights.__wrapped__
+    assert fetch("CPT", "JNB", date(2030, 5, 1), None) == []
+    assert fetch("Cape Town", "JNB", date(2030, 5, 1), None) == []
+
+def test_amadeus_flight_errors_raise_instead_of_returning_mock_data(monkeypatch):
+    error = ServerError(SimpleNamespace(status_code=500, parsed=False, result=None))
+    monkeypatch.setattr(travel_services, 'amadeus', amadeus_with(FakeFlightSearch(error=error)))
+    with pytest.raises(ResponseError):
+        travel_services.fetch_amadeus_flights.__wrapped__("CPT", "JNB", date(2030, 5, 1), None)
+
+def test_quota_errors_are_not_hidden_behind_empty_results(monkeypatch):
+    class OutOfQuota(PagedPlaces):
+        def places_nearby(self, page_token=None, **params):
+            if page_token:
+                raise QuotaExceeded("google_places daily quota of 1 calls reached")
+            return super().places_nearby(page_token, **params)
+
+    monkeypatch.setattr(travel_services, 'gmaps', OutOfQuota({'tourist_attraction': [["a"], ["b"]]}))
+    monkeypatch.setattr(travel_services, 'NEXT_PAGE_DELAY', 0)
+    with pytest.raises(QuotaExceeded):
+        travel_services.search_nearby_places((0, 0), 1000, [{'type': 'tourist_attraction'}], min_results=2, max_pages=2)
+
+def test_paging_errors_are_logged_and_keep_earlier_pages(monkeypatch, caplog):
+    class BrokenPaging(PagedPlaces):
+        def places_nearby(self, page_token=None, **params):
+            if page_token:
+                raise RuntimeError("INVALID_REQUEST")
+            return super().places_nearby(page_token, **params)
+
+    monkeypatch.setattr(travel_services, 'gmaps', BrokenPaging({'tourist_attraction': [["a"], ["b"]]}))
+    monkeypatch.setattr(travel_services, 'NEXT_PAGE_DELAY', 0)
+    places = travel_services.search_nearby_places((0, 0), 1000, [{'type': 'tourist_attraction'}], min_results=2, max_pages=2)
+    assert [place['place_id'] for place in places] == ["a"]
+    assert "paging stopped: INVALID_REQUEST" in caplog.text
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for multi-city visit ordering and stay splitting
+"""
+
+import random
+from datetime import date
+from itertools import permutations
+import pytest
+from trip_routing import (
+    EXACT_MAX_CITIES,
+    best_order,
+    estimated_leg,
+    held_karp,
+    nearest_neighbour,
+    route_cost,
+    split_stays,
+    two_opt,
+)
+
+def random_matrix(generator, size):
+    return [[0 if i == j else generator.uniform(50, 1000) for j in range(size)] for i in range(size)]
+
+def brute_force(cost, return_home=True):
+    return min(route_cost(cost, order, return_home) for order in permutations(range(1, len(cost))))
+
+@pytest.mark.parametrize('return_home', [True, False])
+def test_held_karp_matches_brute_force(return_home):
+    generator = random.Random(47)
+    for size in range(2, 8):
+        for _ in range(10):
+            cost = random_matrix(generator, size)  # asymmetric, like one-way fares
+            order = held_karp(cost, return_home)
+            assert sorted(order) == list(range(1, size))
+            assert route_cost(cost, order, return_home) == pytest.approx(brute_force(cost, return_home))
+
+def test_trivial_trips():
+    assert held_karp([[0]]) == []
+    assert held_karp([[0, 5], [5, 0]]) == [1]
+
+def test_heuristic_orders_are_valid_and_no_worse_than_greedy():
+    generator = random.Random(2)
+    cost = random_matrix(generator, EXACT_MAX_CITIES + 4)
+    greedy = nearest_neighbour(cost)
+    improved = two_opt(cost, greedy)
+    assert sorted(improved) == list(range(1, len(cost)))
+    assert route_cost(cost, improved) <= route_cost(cost, greedy)
+    order, total, method = best_order(cost)
+    assert (order, method) == (improved, 'heuristic') and total == pytest.approx(route_cost(cost, improved))
+
+def test_best_order_is_exact_for_small_trips():
+    cost = [[0, 1, 9, 9], [9, 0, 1, 9], [9, 9, 0, 1], [1, 9, 9, 0]]
+    assert best_order(cost) == ([1, 2, 3], 4, 'exact')
+
+def test_stays_share_nights_with_earlier_cities_getting_extras():
+    stays = split_stays(date(2026, 12, 1), date(2026, 12, 8), 3)
+    assert stays == [(date(2026, 12, 1), date(2026, 12, 4)), (date(2026, 12, 4), date(2026, 12, 6)),
+                     (date(2026, 12, 6), date(2026, 12, 8))]
+
+def test_every_city_gets_at_least_one_night():
+    stays = split_stays(date(2026, 12, 1), date(2026, 12, 2), 3)
+    assert [(leave - arrival).days for arrival, leave in stays] == [1, 1, 1]
+    assert stays[-1][1] == date(2026, 12, 4)
+
+def test_leg_estimates_grow_with_distance():
+    short, long = estimated_leg(500), estimated_leg(9000)
+    assert short[0] < long[0] and short[1] < long[1]
@@ -0,0 +1,267 @@
+"""
+Travel record types for AI Travel Planner
+Frozen, slotted records for places, flight offers, events and local info, with converters from
+Google Places, Amadeus, Skyscanner and SerpAPI payloads.
+
+Records keep the read API of the dicts they replace (record['name'], record.get('rating', 'N/A')),
+so renderers work unchanged; unset optional fields behave like missing keys.
+"""
+
+import re
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+from typing import Optional
+
+class RecordMixin:
+    """Dict-style read access and conversion for record dataclasses"""
+
+    __slots__ = ()
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in self.field_names() else None
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    @classmethod
+    def field_names(cls):
+        return cls.__dataclass_fields__.keys()
+
+    def to_dict(self):
+        """Plain dict of the set fields (nested records converted), shaped like the original payload dicts"""
+        result = {}
+        for field in fields(self):
+            value = getattr(self, field.name)
+            if value is None:
+                continue
+            if isinstance(value, tuple):
+                value = [item.to_dict() if isinstance(item, RecordMixin) else item for item in value]
+            result[field.name] = value
+        return result
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from a dict, ignoring unknown keys"""
+        return cls(**{key: value for key, value in data.items() if key in cls.field_names()})
+
+@dataclass(frozen=True, slots=True)
+class Link(RecordMixin):
+    title: str = 'Source'
+    link: str = ''
+
+@dataclass(frozen=True, slots=True)
+class Place(RecordMixin):
+    """Restaurant, business venue or attraction"""
+    name: str
+    place_id: Optional[str] = None
+    address: str = 'Address not available'
+    phone: str = 'Phone not available'
+    website: str = ''
+    rating: object = 'N/A'
+    total_ratings: int = 0
+    price_level: Optional[str] = None
+    hours: str = 'Hours not available'
+    photo_url: Optional[str] = None
+    review_snippet: Optional[str] = None
+    google_maps_url: str = ''
+    category: Optional[str] = None
+    place_types: Optional[tuple] = None
+    source: str = 'Google Places API'
+
+    def __post_init__(self):
+        if self.place_types is not None and not isinstance(self.place_types, tuple):
+            object.__setattr__(self, 'place_types', tuple(self.place_types))
+
+@dataclass(frozen=True, slots=True)
+class FlightOffer(RecordMixin):
+    """One priced round-trip offer"""
+    airline: str
+    price: str
+    amount: Optional[float] = None
+    currency: Optional[str] = None
+    total_duration: str = 'N/A'
+    duration_minutes: Optional[int] = None
+    departure_airport: Optional[str] = None
+    departure_time: str = 'N/A'
+    arrival_airport: Optional[str] = None
+    arrival_time: str = 'N/A'
+    return_time: Optional[str] = None
+    stops: int = 0
+    airline_logo: Optional[str] = None
+    booking_url: Optional[str] = None
+    booking_token: Optional[str] = None
+    source: str = 'Amadeus API'
+
+@dataclass(frozen=True, slots=True)
+class Event(RecordMixin):
+    """Live event found through search"""
+    name: str
+    description: str = ''
+    date: str = 'Date TBA'
+    website: str = ''
+    link_type: Optional[str] = None
+    link_text: Optional[str] = None
+    category: str = 'Event'
+    icon: str = '🎪'
+
+@dataclass(frozen=True, slots=True)
+class LocalInfo(RecordMixin):
+    """Summarized local information topic with its sources"""
+    category: str
+    icon: str = 'ℹ️'
+    summary: str = ''
+    sources: tuple = ()
+    full_description: str = ''
+
+    def __post_init__(self):
+        object.__setattr__(self, 'sources', tuple(
+            source if isinstance(source, Link) else Link.from_dict(source) for source in self.sources
+        ))
+
+# Record types by name, for serializers that tag and revive records
+RECORD_TYPES = {record_type.__name__: record_type for record_type in (Link, Place, FlightOffer, Event, LocalInfo)}
+
+def to_plain(value):
+    """json.dumps default for plans holding records: records become their dicts, dates ISO strings"""
+    if isinstance(value, RecordMixin):
+        return value.to_dict()
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+def _format_hours(opening_hours):
+    """First two weekdays of Google opening hours"""
+    if not opening_hours or not opening_hours.get('weekday_text'):
+        return 'Hours not available'
+    hours = "; ".join(opening_hours['weekday_text'][:2])
+    if len(opening_hours['weekday_text']) > 2:
+        hours += "..."
+    return hours
+
+def place_from_google(details, place_id, default_name='Unknown Place', category=None, place_types=None,
+                      price_level=None, snippets=False, website=None):
+    """
+    Place from a Google Places details result
+
+    Args:
+        details (dict): place(...)['result']
+        place_id (str): Place id from the search result
+        default_name (str): Name used when the result has none
+        category (str): Display category
+        place_types (list): Types from the search result
+        price_level (str): Display price text
+        snippets (bool): Include the photo/review placeholders restaurants and attractions show
+        website (str): Website override (defaults to the result's website)
+    """
+    return Place(
+        name=details.get('name', default_name),
+        place_id=place_id,
+        address=details.get('formatted_address', 'Address not available'),
+        phone=details.get('formatted_phone_number', 'Phone not available'),
+        website=details.get('website', '') if website is None else website,
+        rating=details.get('rating', 'N/A'),
+        total_ratings=details.get('user_ratings_total', 0),
+        price_level=price_level,
+        hours=_format_hours(details.get('opening_hours')),
+        photo_url='' if snippets else None,  # Simplified for now
+        review_snippet='Visit Google Maps for reviews' if snippets else None,  # Simplified
+        google_maps_url=details.get('url', ''),
+        category=category,
+        place_types=place_types,
+        source='Google Places API',
+    )
+
+def _minutes(duration):
+    """Convert PT4H30M format to total minutes"""
+    match = re.match(r'PT(?:(\d+)H)?(?:(\d+)M)?', duration or '')
+    return int(match.group(1) or 0) * 60 + int(match.group(2) or 0) if match else 0
+
+def flight_from_amadeus(offer):
+    """
+    FlightOffer from an Amadeus flight-offers-search result, or None if it has no segments
+    """
+    itineraries = offer.get('itineraries') or []
+    if not itineraries or not itineraries[0].get('segments'):
+        return None
+
+    outbound = itineraries[0]['segments'][0]
+    minutes = sum(_minutes(itinerary.get('duration')) for itinerary in itineraries[:2] if itinerary.get('segments'))
+    price = offer['price']
+    carrier = outbound.get('carrierCode', 'Unknown')
+    return FlightOffer(
+        airline=carrier,
+        price=f"{price['currency']} {price['total']}",
+        amount=float(price['total']),
+        currency=price['currency'],
+        total_duration=f"{minutes} min",
+        duration_minutes=minutes,
+        departure_airport=outbound.get('departure', {}).get('iataCode', 'N/A'),
+        departure_time=outbound.get('departure', {}).get('at', 'N/A'),
+        arrival_airport=outbound.get('arrival', {}).get('iataCode', 'N/A'),
+        arrival_time=outbound.get('arrival', {}).get('at', 'N/A'),
+        return_time=itineraries[1]['segments'][0].get('departure', {}).get('at') if len(itineraries) > 1 and itineraries[1].get('segments') else None,
+        stops=len(itineraries[0]['segments']) - 1,
+        airline_logo=f"https://pics.avs.io/100/100/{outbound.get('carrierCode', 'XX')}.png",
+        booking_token=offer.get('id', 'N/A'),  # Use offer ID for booking
+        source='Amadeus API',
+    )
+
+def flight_from_skyscanner(itinerary, booking_url, currency='USD'):
+    """FlightOffer from a Skyscanner itinerary priced in currency"""
+    legs = itinerary.get("legs") or [{}]
+    leg = legs[0]
+    minutes = leg.get('durationInMinutes', 0)
+    price = itinerary.get('price', {})
+    return FlightOffer(
+        airline=leg.get("carriers", [{}])[0].get("name", "Unknown Airline"),
+        price=f"${price.get('formatted', 'N/A')}" if currency == 'USD' else f"{currency} {price.get('formatted', 'N/A')}",
+        amount=price.get('raw'),
+        currency=currency,
+        total_duration=f"{minutes // 60}h {minutes % 60}m",
+        duration_minutes=minutes,
+        departure_time=leg.get("departure", "N/A"),
+        arrival_time=leg.get("arrival", "N/A"),
+        return_time=legs[1].get("departure") if len(legs) > 1 else None,
+        stops=len(leg.get("segments", [])) - 1,
+        booking_url=booking_url,
+        source='Skyscanner API',
+    )
+
+def event_from_serpapi(result, category, icon, date, link_type, link_text):
+    """Event from a SerpAPI organic result"""
+    snippet = result.get('snippet', '')
+    return Event(
+        name=result.get('title', 'Unknown Event'),
+        description=snippet[:200] + "..." if len(snippet) > 200 else snippet,
+        date=date,
+        website=result.get('link', ''),
+        link_type=link_type,
+        link_text=link_text,
+        category=category,
+        icon=icon,
+    )
+
+def local_info_from_serpapi(organic_results, category, icon):
+    """LocalInfo summarizing SerpAPI organic results for one topic"""
+    descriptions = []
+    sources = []
+    for result in organic_results:
+        snippet = result.get('snippet', '')
+        if snippet:
+            descriptions.append(snippet[:150] + "..." if len(snippet) > 150 else snippet)
+            sources.append(Link(title=result.get('title', 'Source'), link=result.get('link', '')))
+
+    return LocalInfo(
+        category=category,
+        icon=icon,
+        summary=" | ".join(descriptions),
+        sources=tuple(sources),
+        full_description=' '.join([result.get('snippet', '') for result in organic_results]),
+    )
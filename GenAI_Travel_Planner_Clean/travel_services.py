@@ -0,0 +1,980 @@
+"""
+Travel data services for AI Travel Planner
+Flight, places, events and local info fetchers shared by the Streamlit app and batch tools
+
+Provider errors fall back to mock or empty data, except rate limiter errors (QuotaExceeded, which includes
+ProviderDisabled, and RateLimitTimeout): those propagate so callers can report the data as unavailable.
+"""
+
+import logging
+import re
+import time
+import requests
+import googlemaps
+from serpapi import GoogleSearch
+from config import config
+from rate_limiter import limiter, RateLimitedClient, QuotaExceeded, RateLimitTimeout
+from single_flight import single_flight
+from fetch_cache import cached
+from fare_cache import fare_cached
+from amadeus_session import create_session
+from airports import airports
+from flight_ranking import rank_offers, top_offers
+from travel_records import (
+    FlightOffer,
+    place_from_google,
+    flight_from_amadeus,
+    flight_from_skyscanner,
+    event_from_serpapi,
+    local_info_from_serpapi,
+)
+
+# Fetchers run on worker threads, so they log instead of rendering (the app reports missing data through plan_notices)
+logger = logging.getLogger(__name__)
+
+# Initialize API clients (Google Maps calls are rate limited across sessions and workers)
+gmaps = RateLimitedClient(googlemaps.Client(key=config.GOOGLE_PLACES_API_KEY), 'google_places')
+
+# Amadeus client for this process: pooled connections and an access token shared with every worker on the host
+amadeus = create_session()
+
+
+def test_amadeus_connection():
+    """Test Amadeus production API connection"""
+    try:
+        # Simple test to verify production API is working
+        limiter.acquire('amadeus')
+        response = amadeus.reference_data.locations.get(keyword='NYC', subType='AIRPORT')
+        if response.data:
+            return True
+        return False
+    except Exception as e:
+        return False
+
+# Production mode detection - simplified for production use
+def is_production_mode():
+    """Always return True for production environment"""
+    return True
+
+def should_use_google_places():
+    """Always use Google Places API when available"""
+    return config.GOOGLE_PLACES_API_KEY and not config.GOOGLE_PLACES_API_KEY.startswith("#")
+
+def should_use_amadeus():
+    """Always use Amadeus API when available"""
+    return config.AMADEUS_CLIENT_ID and config.AMADEUS_CLIENT_SECRET
+
+# Airport coordinates helper for car rentals
+def get_airport_coordinates(iata_code):
+    """Get coordinates for an airport from the offline gazetteer, or None for unknown codes"""
+    airport = airports.get(iata_code)
+    return {'lat': airport.lat, 'lng': airport.lng} if airport else None
+
+# Primary airport of every city in the gazetteer
+CITY_TO_IATA = airports.city_codes()
+
+# Cities offered in the planner dropdowns before anything is typed (the curated gazetteer cities)
+FEATURED_CITIES = list(airports.city_codes(featured_only=True))
+
+# Destinations farther than this from any listed airport get no flight search
+NEAREST_AIRPORT_MAX_KM = 300
+
+# Trip themes and budget levels offered in the planner form
+TRAVEL_THEMES = ["💼 Business Trip", "💑 Couple Getaway", "👨‍👩‍👧‍👦 Family Vacation", "🏔️ Adventure Trip", "🧳 Solo Exploration"]
+BUDGET_LEVELS = ["Economy", "Standard", "Luxury"]
+
+def get_iata_code(city_country):
+    """
+    Get IATA code from city-country string
+
+    Accepts "City, Country", a bare city name or an IATA code. Places the gazetteer does not list
+    get the airport nearest to their geocoded location; returns None rather than guessing a code.
+    """
+    result = CITY_TO_IATA.get(city_country)
+    if result:
+        return result
+
+    city_airports = airports.city_airports(city_country)
+    if city_airports:
+        return city_airports[0].iata
+    airport = airports.get(city_country.strip())
+    return airport.iata if airport else get_nearest_airport_code(city_country)
+
+def get_nearest_airport_code(location, max_km=NEAREST_AIRPORT_MAX_KM):
+    """
+    IATA code of the airport nearest to a location (geocoded once, then cached)
+
+    Args:
+        location (str): City, Country
+        max_km (float): Farthest acceptable airport
+
+    Returns:
+        str: IATA code, or None if the location cannot be geocoded or no airport is close enough
+    """
+    coords = geocode_location(location)
+    if not coords:
+        return None
+    nearest = airports.nearest(coords[0], coords[1], k=1, max_km=max_km)
+    return nearest[0][0].iata if nearest else None
+
+# Function to fetch flight data using Amadeus API
+@fare_cached('amadeus')
+def fetch_amadeus_flights(source, destination, departure_date, return_date, adults=1, travel_class="economy",
+                          max_offers=None):
+    """
+    Fetch flight offers using Amadeus Production API (api.amadeus.com)
+
+    Requests up to max_offers (default AMADEUS_MAX_OFFERS) offers and converts them one at a time through bounded heaps, so only
+    the best AMADEUS_KEEP_OFFERS per departure window are kept as FlightOffer records (and cached).
+
+    Returns:
+        list: FlightOffer records, best first (empty when the route has no offers)
+
+    Raises:
+        amadeus.ResponseError: the search failed (nothing is cached, and the flight aggregator counts a provider failure)
+    """
+    # Ensure IATA codes are valid 3-letter codes
+    if len(source) != 3 or len(destination) != 3:
+        return []
+
+    params = dict(
+        originLocationCode=source,
+        destinationLocationCode=destination,
+        departureDate=str(departure_date),
+        adults=adults,
+        travelClass=travel_class.upper(),
+        currencyCode=config.FARE_CURRENCY,
+        max=max_offers or config.AMADEUS_MAX_OFFERS
+    )
+    if return_date:  # None searches one-way fares (multi-city legs)
+        params['returnDate'] = str(return_date)
+    limiter.acquire('amadeus')
+    response = amadeus.shopping.flight_offers_search.get(**params)
+    return top_offers((flight_from_amadeus(offer) for offer in response.data or []), config.AMADEUS_KEEP_OFFERS)
+
+def generate_mock_restaurants(location, cuisine_type="", budget=""):
+    """Generate realistic mock restaurant data for development"""
+    import random
+    
+    # Sample restaurant data based on location
+    restaurant_types = {
+        'african': ['Shisa Nyama', 'Braai House', 'African Kitchen', 'Ubuntu Restaurant'],
+        'italian': ['Mama Mia', 'Bella Vista', 'Romano\'s', 'La Piazza'],
+        'asian': ['Dragon Palace', 'Sakura Sushi', 'Thai Garden', 'Panda Express'],
+        'steakhouse': ['The Grill House', 'Prime Cuts', 'Steakhouse 101', 'Meat & Fire'],
+        '': ['Local Favorite', 'City Bistro', 'Corner Cafe', 'Downtown Eatery']
+    }
+    
+    cuisine_key = cuisine_type.lower() if cuisine_type else ''
+    base_names = restaurant_types.get(cuisine_key, restaurant_types[''])
+    
+    price_ranges = {
+        'budget': ('R50-150', 2),
+        'mid-range': ('R150-300', 3),
+        'luxury': ('R300-600', 4),
+        '': ('R100-250', 3)
+    }
+    
+    price_range, rating_base = price_ranges.get(budget.lower(), price_ranges[''])
+    
+    mock_restaurants = []
+    for i in range(min(5, len(base_names))):
+        name = f"{base_names[i]} - {location}"
+        rating = round(rating_base + random.uniform(-0.5, 0.8), 1)
+        rating = min(5.0, max(1.0, rating))  # Keep between 1-5
+        
+        mock_restaurants.append({
+            'name': name,
+            'rating': rating,
+            'price_level': rating_base,
+            'price_range': price_range,
+            'cuisine_type': cuisine_type or 'Local',
+            'vicinity': f"Near {location} center",
+            'opening_hours': 'Open now' if random.choice([True, False]) else 'Opens at 18:00',
+            'mock_data': True
+        })
+    
+    return mock_restaurants
+
+def parse_amadeus_flights(flight_data):
+    """Parse Amadeus flight data to match your existing structure"""
+    # Already-parsed records pass through; offers without itineraries or segments are skipped
+    offers = (offer if isinstance(offer, FlightOffer) else flight_from_amadeus(offer) for offer in flight_data)
+    return [offer for offer in offers if offer is not None]
+
+def parse_duration(duration_str):
+    """Convert PT4H30M format to total minutes"""
+    import re
+    pattern = r'PT(?:(\d+)H)?(?:(\d+)M)?'
+    match = re.match(pattern, duration_str)
+    if match:
+        hours = int(match.group(1) or 0)
+        minutes = int(match.group(2) or 0)
+        return hours * 60 + minutes
+    return 0
+
+# Function to extract top 3 cheapest flights
+def extract_cheapest_flights(flight_data):
+    """Extract and sort flights by numeric price"""
+    if not flight_data:
+        return []
+    return rank_offers(flight_data, weights={'price': 1}, top=3)  # Return top 3 cheapest
+
+def get_airport_display_name(airport_code):
+    """Get display name for airport"""
+    airport = airports.get(airport_code)
+    if not airport:
+        return f"{airport_code} Airport"
+    if airport.name.startswith(airport.city):
+        return airport.name
+    return f"{airport.city} ({airport.name})"
+
+# Streamlined flight search - direct to Skyscanner for production
+def get_flight_booking_url(source_iata, destination_iata, departure_date, return_date, num_travelers=1, flight_class="economy"):
+    """Generate Skyscanner booking URL for flights"""
+    return f"https://www.skyscanner.com/transport/flights/{source_iata}/{destination_iata}/{departure_date.strftime('%y%m%d')}/{return_date.strftime('%y%m%d')}/?adults={num_travelers}&children=0&infants=0&cabinclass={flight_class}"
+
+def generate_flight_summary(source_iata, destination_iata, departure_date, return_date, num_travelers, flight_class="economy"):
+    """Generate a clean flight summary for display"""
+    travelers_text = "1 traveler" if num_travelers == 1 else f"{num_travelers} travelers"
+    return {
+        'route': f"{source_iata} ➜ {destination_iata} ➜ {source_iata}",
+        'dates': f"{departure_date.strftime('%b %d')} - {return_date.strftime('%b %d, %Y')}",
+        'travelers': travelers_text,
+        'booking_url': get_flight_booking_url(source_iata, destination_iata, departure_date, return_date, num_travelers, flight_class)
+    }
+
+def generate_multi_city_summary(legs, num_travelers, flight_class="economy"):
+    """
+    Flight summary for a multi-city trip
+
+    Args:
+        legs (list): (from_iata, to_iata, date) per flight in travel order
+    """
+    travelers_text = "1 traveler" if num_travelers == 1 else f"{num_travelers} travelers"
+    path = "/".join(f"{origin.lower()}/{day.isoformat()}/{destination.lower()}" for origin, destination, day in legs)
+    return {
+        'route': " ➜ ".join([legs[0][0]] + [destination for _, destination, _ in legs]),
+        'dates': f"{legs[0][2].strftime('%b %d')} - {legs[-1][2].strftime('%b %d, %Y')}",
+        'travelers': travelers_text,
+        'booking_url': f"https://www.skyscanner.com/transport/d/{path}/?adults={num_travelers}&cabinclass={flight_class}",
+    }
+
+# Skyscanner API Integration for Enhanced Flight Search
+@fare_cached('skyscanner')
+def fetch_skyscanner_flights(source_iata, destination_iata, departure_date, return_date, departure_time_pref="Any Time", return_time_pref="Any Time", travel_class="economy"):
+    """Fetch flight data from Skyscanner API with time preferences"""
+    try:
+        import requests
+        
+        # Skyscanner RapidAPI endpoint
+        url = "https://skyscanner80.p.rapidapi.com/api/v1/flights/search-roundtrip"
+        
+        headers = {
+            "X-RapidAPI-Key": config.RAPIDAPI_KEY or "demo_key",
+            "X-RapidAPI-Host": "skyscanner80.p.rapidapi.com"
+        }
+        
+        # Convert time preferences to hour ranges
+        time_ranges = {
+            "🌅 Morning (06:00-12:00)": ("06:00", "12:00"),
+            "☀️ Afternoon (12:00-18:00)": ("12:00", "18:00"), 
+            "🌙 Evening (18:00-00:00)": ("18:00", "00:00"),
+            "🦉 Late Night (00:00-06:00)": ("00:00", "06:00"),
+            "⏰ Any Time": (None, None)
+        }
+        
+        departure_time_range = time_ranges.get(departure_time_pref, (None, None))
+        return_time_range = time_ranges.get(return_time_pref, (None, None))
+        
+        querystring = {
+            "fromId": source_iata,
+            "toId": destination_iata,
+            "departDate": str(departure_date),
+            "returnDate": str(return_date),
+            "adults": "1",
+            "cabinClass": travel_class,
+            "currency": config.FARE_CURRENCY
+        }
+        
+        # Add time preferences if specified
+        if departure_time_range[0]:
+            querystring["departureTimeFrom"] = departure_time_range[0]
+            querystring["departureTimeTo"] = departure_time_range[1]
+        
+        if return_time_range[0]:
+            querystring["returnTimeFrom"] = return_time_range[0]
+            querystring["returnTimeTo"] = return_time_range[1]
+        
+        response = requests.get(url, headers=headers, params=querystring, timeout=10)
+        
+        if response.status_code == 200:
+            data = response.json()
+            
+            # Parse Skyscanner response
+            flights = []
+            if "data" in data and "itineraries" in data["data"]:
+                booking_url = f"https://www.skyscanner.com/transport/flights/{source_iata}/{destination_iata}/{departure_date}/{return_date}/"
+                for itinerary in data["data"]["itineraries"][:5]:  # Get top 5 flights
+                    flights.append(flight_from_skyscanner(itinerary, booking_url, config.FARE_CURRENCY))
+            
+            return flights
+            
+        else:
+            logger.warning("Skyscanner API returned status %s, using demo flight data", response.status_code)
+            return generate_enhanced_flight_mock_data(source_iata, destination_iata, departure_time_pref, return_time_pref)
+            
+    except Exception as e:
+        logger.warning("Skyscanner search failed, using demo flight data: %s", e)
+        return generate_enhanced_flight_mock_data(source_iata, destination_iata, departure_time_pref, return_time_pref)
+
+def generate_south_african_domestic_flights(source_iata, destination_iata, departure_date, return_date):
+    """Generate realistic South African domestic flight data"""
+    
+    # South African domestic airlines
+    airlines = {
+        "FlySafair": "https://www.flysafair.co.za/",
+        "Kulula": "https://www.kulula.com/",
+        "South African Airways": "https://www.flysaa.com/",
+        "Lift": "https://www.lift.co.za/",
+        "Airlink": "https://www.flyairlink.com/"
+    }
+    
+    # Route-specific pricing (South African Rand converted to USD)
+    route_pricing = {
+        ("DUR", "JNB"): (85, 150),   # Durban to Johannesburg
+        ("JNB", "DUR"): (85, 150),   # Johannesburg to Durban
+        ("JNB", "CPT"): (95, 180),   # Johannesburg to Cape Town
+        ("CPT", "JNB"): (95, 180),   # Cape Town to Johannesburg
+        ("DUR", "CPT"): (120, 220),  # Durban to Cape Town
+        ("CPT", "DUR"): (120, 220),  # Cape Town to Durban
+    }
+    
+    route = (source_iata, destination_iata)
+    base_price, max_price = route_pricing.get(route, (100, 200))
+    
+    flights = []
+    for i, (airline, website) in enumerate(airlines.items()):
+        price_variation = i * 15  # Price varies by airline
+        price = base_price + price_variation
+        
+        # Time variations
+        departure_times = ["06:30", "09:15", "12:45", "15:30", "18:20"]
+        arrival_times = ["08:45", "11:30", "15:00", "17:45", "20:35"]
+        
+        flight = {
+            "airline": airline,
+            "price": f"${price}",
+            "departure_time": departure_times[i % len(departure_times)],
+            "arrival_time": arrival_times[i % len(arrival_times)],
+            "duration": "1h 15m" if route[0] != route[1] else "1h 30m",
+            "booking_url": website,
+            "stops": 0,  # Domestic flights are usually direct
+            "source": "South African Domestic (Demo)",
+            "flight_number": f"{airline[:2].upper()}{100 + i}",
+            "aircraft": "Boeing 737" if i % 2 == 0 else "Airbus A320",
+            "booking_token": f"SA-{source_iata}{destination_iata}-{i}"
+        }
+        flights.append(flight)
+    
+    return flights
+
+def generate_enhanced_flight_mock_data(source_iata, destination_iata, departure_time_pref="Any Time", return_time_pref="Any Time"):
+    """Generate mock flight data with time preferences"""
+    
+    # Sample airlines
+    airlines = ["Emirates", "Qatar Airways", "South African Airways", "British Airways", "Lufthansa"]
+    
+    # Time slots based on preferences
+    time_slots = {
+        "🌅 Morning (06:00-12:00)": ["07:30", "09:15", "11:45"],
+        "☀️ Afternoon (12:00-18:00)": ["13:20", "15:30", "17:10"],
+        "🌙 Evening (18:00-00:00)": ["19:45", "21:15", "23:30"],
+        "🦉 Late Night (00:00-06:00)": ["01:20", "03:45", "05:15"],
+        "⏰ Any Time": ["07:30", "13:20", "19:45"]
+    }
+    
+    departure_times = time_slots.get(departure_time_pref, time_slots["⏰ Any Time"])
+    
+    flights = []
+    for i, airline in enumerate(airlines[:3]):
+        flight = {
+            "airline": airline,
+            "price": f"${850 + (i * 120)}",
+            "departure_time": departure_times[i % len(departure_times)],
+            "arrival_time": "14:20",  # Sample arrival
+            "duration": f"{8 + i}h {30 + (i * 15)}m",
+            "booking_url": f"https://www.skyscanner.com/transport/flights/{source_iata}/{destination_iata}/",
+            "stops": i,  # 0, 1, 2 stops
+            "source": "Demo Data (Time-filtered)"
+        }
+        flights.append(flight)
+    
+    return flights
+
+# Google Search Functions for restaurants, attractions, and local activities
+@cached('geocode')
+@single_flight
+def geocode_location(location):
+    """
+    Geocode a City, Country string with Google Maps
+
+    Returns:
+        tuple: (lat, lng) or None if the location could not be found
+    """
+    try:
+        geocode_result = gmaps.geocode(location)
+        if not geocode_result:
+            return None
+        location_coords = geocode_result[0]['geometry']['location']
+        return location_coords['lat'], location_coords['lng']
+    except (QuotaExceeded, RateLimitTimeout):
+        raise
+    except Exception as error:
+        return None
+
+def fetch_google_restaurants(location, cuisine_type="", budget="", travel_theme="", coords=None):
+    """Fetch restaurant recommendations using Google Places API with business-friendly options"""
+    
+    # Use Google Places API when available, fallback to mock data
+    if not should_use_google_places():
+        return generate_mock_restaurants(location, cuisine_type, budget)
+    
+    try:
+        restaurants = search_google_restaurants(location, get_restaurant_search_query(cuisine_type, travel_theme),
+                                                get_price_level(budget), coords=coords)
+        if restaurants is None:
+            return generate_mock_restaurants(location, cuisine_type, budget)
+        return restaurants
+    except (QuotaExceeded, RateLimitTimeout):
+        raise
+    except Exception as error:
+        return []
+
+def get_restaurant_search_query(cuisine_type="", travel_theme=""):
+    """Places keyword for a restaurant search with business-friendly options"""
+    search_query = "restaurant"
+    if cuisine_type:
+        search_query += f" {cuisine_type}"
+    
+    # Add business-friendly terms for business travel theme
+    if "Business" in travel_theme:
+        search_query += " business lunch meeting wifi private dining"
+    return search_query
+
+@cached('places', ignore=('coords',))
+@single_flight(ignore=('coords',))
+def search_google_restaurants(location, search_query, min_price, coords=None):
+    """
+    Nearby restaurant search plus details, keyed on the query actually sent to Places
+    so every theme and budget that maps to the same request shares one cache entry
+
+    Returns:
+        list: Restaurant dicts, or None if the location could not be geocoded
+    """
+    # First, get the location coordinates (callers may pass already geocoded coords)
+    coords = coords or geocode_location(location)
+    if not coords:
+        return None
+    
+    lat, lng = coords
+    
+    # Use nearby search for better results
+    places_result = gmaps.places_nearby(
+        location=(lat, lng),
+        radius=10000,  # 10km radius
+        type='restaurant',
+        keyword=search_query,
+        min_price=min_price
+    )
+    
+    restaurants = []
+    
+    # Get detailed information for each restaurant
+    for place in places_result.get('results', [])[:3]:  # Limit to 3 restaurants
+        place_id = place['place_id']
+        
+        # Get detailed place information
+        place_details = gmaps.place(
+            place_id=place_id,
+            fields=['name', 'formatted_address', 'formatted_phone_number', 
+                   'website', 'rating', 'user_ratings_total', 'opening_hours',
+                   'price_level', 'url']
+        )
+        
+        details = place_details['result']
+        
+        restaurants.append(place_from_google(
+            details, place_id,
+            default_name='Unknown Restaurant',
+            price_level=get_price_text(details.get('price_level')),
+            snippets=True,
+            website=details.get('website', details.get('url', ''))
+        ))
+    
+    return restaurants
+
+@cached('places', ignore=('coords',))
+@single_flight(ignore=('coords',))
+def fetch_business_venues(location, coords=None):
+    """Fetch business-friendly venues like coworking spaces, conference centers, meeting rooms"""
+    
+    if not should_use_google_places():
+        return generate_mock_business_venues(location)
+    
+    try:
+        # First, get the location coordinates (callers may pass already geocoded coords)
+        coords = coords or geocode_location(location)
+        if not coords:
+            return generate_mock_business_venues(location)
+
+        lat, lng = coords
+
+        # Search for business venues
+        business_types = [
+            {'type': 'establishment', 'keyword': 'coworking space shared office', 'category': '💼 Coworking Space'},
+            {'type': 'establishment', 'keyword': 'conference center meeting room', 'category': '🏢 Conference Center'},
+            {'type': 'establishment', 'keyword': 'business center office space', 'category': '🏢 Business Center'},
+            {'type': 'establishment', 'keyword': 'hotel business center meeting', 'category': '🏨 Hotel Business Center'}
+        ]
+        
+        candidates = {}  # place_id -> (search result, category of the first search that found it)
+
+        for venue_type in business_types:
+            places_result = gmaps.places_nearby(
+                location=(lat, lng),
+                radius=15000,  # 15km radius
+                keyword=venue_type['keyword']
+            )
+
+            for place in places_result.get('results', []):
+                candidates.setdefault(place['place_id'], (place, venue_type['category']))
+
+        # Rank on the search results and fetch details for the top 3 business venues only
+        categories = {place_id: category for place_id, (_, category) in candidates.items()}
+        venues = []
+        for place in select_places([place for place, _ in candidates.values()], 3):
+            place_id = place['place_id']
+
+            # Get detailed place information
+            place_details = gmaps.place(
+                place_id=place_id,
+                fields=['name', 'formatted_address', 'formatted_phone_number',
+                       'website', 'rating', 'user_ratings_total', 'opening_hours', 'url']
+            )
+
+            venues.append(place_from_google(
+                place_details['result'], place_id,
+                default_name='Unknown Venue',
+                category=categories[place_id]
+            ))
+
+        return venues
+
+    except (QuotaExceeded, RateLimitTimeout):
+        raise
+    except Exception as error:
+        return generate_mock_business_venues(location)
+
+def generate_mock_business_venues(location):
+    """Generate mock business venue data when API is unavailable"""
+    return [
+        {
+            'name': f'{location} Business Center',
+            'address': f'Central Business District, {location}',
+            'phone': '+27 11 123 4567',
+            'website': 'https://businesscenter.com',
+            'rating': 4.2,
+            'total_ratings': 156,
+            'hours': 'Mon-Fri: 8:00 AM - 6:00 PM',
+            'category': '🏢 Business Center',
+            'google_maps_url': 'https://maps.google.com',
+            'source': 'Demo Data'
+        },
+        {
+            'name': f'{location} Coworking Hub',
+            'address': f'Downtown {location}',
+            'phone': '+27 11 234 5678',
+            'website': 'https://coworkinghub.com',
+            'rating': 4.5,
+            'total_ratings': 89,
+            'hours': 'Mon-Sun: 24/7 Access',
+            'category': '💼 Coworking Space',
+            'google_maps_url': 'https://maps.google.com',
+            'source': 'Demo Data'
+        }
+    ]
+
+# Helper functions for Google Places API
+def get_price_level(budget):
+    """Convert budget preference to Google Places price level"""
+    # Extract the budget type from the enhanced format
+    if "Economy" in budget:
+        return 1
+    elif "Standard" in budget:
+        return 2
+    elif "Luxury" in budget:
+        return 3
+    else:
+        return 1  # Default to economy
+
+def get_price_text(price_level):
+    """Convert price level number to text"""
+    if price_level is None:
+        return "Price not available"
+    
+    price_text = {
+        1: "$ (Inexpensive)",
+        2: "$$ (Moderate)",
+        3: "$$$ (Expensive)",
+        4: "$$$$ (Very Expensive)"
+    }
+    return price_text.get(price_level, "Price not available")
+
+def get_attraction_category(types):
+    """Determine attraction category from Google Places types"""
+    if 'museum' in types:
+        return '🏛️ Museum'
+    elif 'amusement_park' in types:
+        return '🎢 Amusement Park'
+    elif 'zoo' in types:
+        return '🦁 Zoo'
+    elif 'aquarium' in types:
+        return '🐠 Aquarium'
+    elif 'park' in types:
+        return '🌳 Park'
+    elif 'tourist_attraction' in types:
+        return '🎯 Tourist Attraction'
+    else:
+        return '📍 Point of Interest'
+
+# Nearby search results are ranked before any detail lookup. The score is the rating shrunk towards
+# PRIOR_RATING as if each place had PRIOR_RATINGS extra reviews, so a 5.0 from 3 reviews does not
+# outrank a 4.7 from 3,000.
+PRIOR_RATING = 4.0
+PRIOR_RATINGS = 50
+
+def place_score(place):
+    """Review-weighted rating of a nearby search result (0 when it has no rating)"""
+    rating = place.get('rating')
+    if rating is None:
+        return 0.0
+    reviews = place.get('user_ratings_total') or 0
+    return (rating * reviews + PRIOR_RATING * PRIOR_RATINGS) / (reviews + PRIOR_RATINGS)
+
+def select_places(places, k, group=None):
+    """
+    Best k nearby search results by place_score, chosen from the search payload before any detail lookup
+
+    Args:
+        places (list): Nearby search result dicts
+        k (int): Places to keep
+        group (callable): When given, the best place of each group (e.g. category) is chosen first and
+            any remaining slots are filled from the overall ranking, so fewer groups than k still give k places
+
+    Returns:
+        list: Selected results, best first (ties keep the Places order)
+    """
+    ranked = sorted(places, key=place_score, reverse=True)
+    if not group:
+        return ranked[:k]
+    best = {}
+    for place in ranked:
+        best.setdefault(group(place), place)
+    chosen = {id(place) for place in list(best.values())[:k]}
+    for place in ranked:
+        if len(chosen) >= k:
+            break
+        chosen.add(id(place))
+    return [place for place in ranked if id(place) in chosen]
+
+# Attractions come from a few broad nearby searches instead of one per attraction type; results are
+# classified locally with get_attraction_category. A search is paged (up to ATTRACTION_MAX_PAGES pages of 20)
+# only while fewer than ATTRACTION_MIN_CANDIDATES distinct places have been found.
+ATTRACTION_SEARCHES = [{'type': 'tourist_attraction'}, {'type': 'museum'}]
+ATTRACTION_MIN_CANDIDATES = 10
+ATTRACTION_MAX_PAGES = 3
+# Places needs a moment before a next_page_token becomes valid
+NEXT_PAGE_DELAY = 2
+
+def search_nearby_places(coords, radius, searches, keyword=None, min_results=0, max_pages=1):
+    """
+    Distinct nearby search results over several searches, in the order Places returned them
+
+    Args:
+        coords (tuple): (lat, lng) to search around
+        radius (int): Search radius in metres
+        searches (list): places_nearby keyword arguments per search (e.g. {'type': 'museum'})
+        keyword (str): Keyword added to every search
+        min_results (int): Fetch further pages of a search while fewer distinct places than this are found
+        max_pages (int): Pages fetched per search at most
+
+    Returns:
+        list: Nearby search result dicts, deduplicated by place_id
+    """
+    places = {}
+    for search in searches:
+        params = dict(search, keyword=keyword) if keyword else dict(search)
+        page = gmaps.places_nearby(location=coords, radius=radius, **params)
+        for page_number in range(max_pages):
+            for place in page.get('results', []):
+                places.setdefault(place['place_id'], place)
+            token = page.get('next_page_token')
+            if not token or len(places) >= min_results or page_number + 1 == max_pages:
+                break
+            time.sleep(NEXT_PAGE_DELAY)
+            try:
+                page = gmaps.places_nearby(page_token=token)
+            except (QuotaExceeded, RateLimitTimeout):
+                raise
+            except Exception as error:
+                logger.warning("Nearby search paging stopped: %s", error)
+                break
+    return list(places.values())
+
+@cached('places', ignore=('coords',))
+@single_flight(ignore=('coords',))
+def fetch_google_attractions(location, activity_preferences="", coords=None):
+    """Fetch tourist attractions using Google Places API"""
+    try:
+        # Get location coordinates (callers may pass already geocoded coords)
+        coords = coords or geocode_location(location)
+        if not coords:
+            logger.info("No coordinates for %s, skipping attractions", location)
+            return []
+        
+        nearby = search_nearby_places(coords, 15000, ATTRACTION_SEARCHES,  # 15km radius for attractions
+                                      keyword=activity_preferences, min_results=ATTRACTION_MIN_CANDIDATES,
+                                      max_pages=ATTRACTION_MAX_PAGES)
+        
+        # Classify locally, rank on the search results (best place per category first) and fetch details for the top 3 only
+        category = lambda place: get_attraction_category(place.get('types', []))
+        attractions = []
+        for place in select_places(nearby, 3, group=category):
+            place_id = place['place_id']
+            
+            # Get detailed place information
+            place_details = gmaps.place(
+                place_id=place_id,
+                fields=['name', 'formatted_address', 'formatted_phone_number', 
+                       'website', 'rating', 'user_ratings_total', 'opening_hours', 'url']
+            )
+            
+            attractions.append(place_from_google(
+                place_details['result'], place_id,
+                default_name='Unknown Attraction',
+                category=category(place),
+                place_types=place.get('types', []),
+                snippets=True
+            ))
+        
+        return attractions
+        
+    except (QuotaExceeded, RateLimitTimeout):
+        raise
+    except Exception as error:
+        return []
+
+@cached('local_info')
+@single_flight
+def fetch_google_local_info(location):
+    """Fetch local information with summaries and website links"""
+    try:
+        queries = [
+            {
+                'query': f"weather in {location} best time to visit climate",
+                'category': 'Weather & Best Time to Visit',
+                'icon': '🌤️'
+            },
+            {
+                'query': f"local culture customs traditions {location}",
+                'category': 'Local Culture & Customs',
+                'icon': '🏛️'
+            },
+            {
+                'query': f"safety tips travel advice {location}",
+                'category': 'Safety & Travel Tips',
+                'icon': '🛡️'
+            },
+            {
+                'query': f"transportation getting around {location} public transport",
+                'category': 'Transportation & Getting Around',
+                'icon': '🚌'
+            }
+        ]
+        
+        all_info = []
+        
+        for query_info in queries:
+            params = {
+                "engine": "google",
+                "q": query_info['query'],
+                "location": location,
+                "hl": "en",
+                "gl": "za",
+                "api_key": config.SERPAPI_KEY
+            }
+            
+            limiter.acquire('serpapi')
+            search = GoogleSearch(params)
+            results = search.get_dict()
+            
+            # Get top 2 results for better summary
+            if results.get("organic_results"):
+                # Summarize the top results with their sources
+                all_info.append(local_info_from_serpapi(
+                    results["organic_results"][:2], query_info['category'], query_info['icon']
+                ))
+        
+        return all_info
+    except (QuotaExceeded, RateLimitTimeout):
+        raise
+    except Exception as error:
+        return []
+
+def extract_rating_from_snippet(snippet):
+    """Extract rating from Google search snippet"""
+    try:
+        if not snippet or not isinstance(snippet, str):
+            return "N/A"
+            
+        import re
+        # Look for patterns like "4.5 stars", "4.5/5", "Rating: 4.5"
+        patterns = [
+            r'(\d+\.?\d*)\s*(?:stars?|/5|\⭐)',
+            r'(?:Rating|Rated):\s*(\d+\.?\d*)',
+            r'(\d+\.?\d*)\s*out\s*of\s*5'
+        ]
+        
+        for pattern in patterns:
+            match = re.search(pattern, snippet, re.IGNORECASE)
+            if match:
+                return f"{match.group(1)} ⭐"
+        
+        return "N/A"
+    except Exception as e:
+        return "N/A"
+
+def fetch_live_events(location, departure_date, return_date):
+    """Fetch live events and happenings during travel dates"""
+    # Format dates for search queries
+    from datetime import datetime
+    if isinstance(departure_date, str):
+        dep_date = datetime.strptime(departure_date, "%Y-%m-%d")
+    else:
+        dep_date = departure_date
+    
+    # Searches are per month, so every trip departing in the same month shares one lookup
+    month_year = dep_date.strftime("%B %Y")
+    return fetch_monthly_events(location, month_year)
+
+@cached('events')
+@single_flight
+def fetch_monthly_events(location, month_year):
+    """
+    Search live events in a destination for one month
+
+    Args:
+        location (str): City, Country string
+        month_year (str): Month as "October 2026"
+
+    Returns:
+        list: Up to 12 event dicts across categories
+    """
+    try:
+        event_queries = [
+            {
+                'query': f"events {location} {month_year} concerts shows festivals",
+                'category': 'Concerts & Shows',
+                'icon': '🎵'
+            },
+            {
+                'query': f"festivals {location} {month_year} food music cultural",
+                'category': 'Festivals & Cultural Events',
+                'icon': '🎭'
+            },
+            {
+                'query': f"sports events {location} {month_year} games matches tournaments",
+                'category': 'Sports & Games',
+                'icon': '⚽'
+            },
+            {
+                'query': f"exhibitions museums {location} {month_year} art shows galleries",
+                'category': 'Exhibitions & Museums',
+                'icon': '🎨'
+            },
+            {
+                'query': f"nightlife events {location} {month_year} clubs bars entertainment",
+                'category': 'Nightlife & Entertainment',
+                'icon': '🌃'
+            }
+        ]
+        
+        all_events = []
+        
+        for event_info in event_queries:
+            params = {
+                "engine": "google",
+                "q": event_info['query'],
+                "location": location,
+                "hl": "en",
+                "gl": "za",
+                "api_key": config.SERPAPI_KEY
+            }
+            
+            limiter.acquire('serpapi')
+            search = GoogleSearch(params)
+            results = search.get_dict()
+            
+            # Get events from organic results
+            events_found = []
+            organic_results = results.get("organic_results", [])
+            
+            for result in organic_results[:3]:  # Limit to 3 events per category
+                title = result.get('title', 'Unknown Event')
+                snippet = result.get('snippet', '')
+                link = result.get('link', '')
+                
+                # Filter out general tourism sites, prefer specific event listings
+                if any(keyword in title.lower() or keyword in snippet.lower() for keyword in 
+                       ['event', 'concert', 'show', 'festival', 'exhibition', 'match', 'game', 'performance']):
+                    
+                    # Extract date information from snippet if available
+                    import re
+                    date_patterns = [
+                        r'(\d{1,2}[-/]\d{1,2}[-/]\d{4})',
+                        r'(\d{1,2}\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4})',
+                        r'((Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{1,2}[-,]?\s*\d{4})'
+                    ]
+                    
+                    event_date = "Date TBA"
+                    for pattern in date_patterns:
+                        match = re.search(pattern, snippet, re.IGNORECASE)
+                        if match:
+                            event_date = match.group(1)
+                            break
+                    
+                    # Determine if it's a booking or info site
+                    if any(keyword in link.lower() for keyword in ['tickets', 'booking', 'eventbrite', 'ticketek', 'quicket']):
+                        link_type = "🎫 **Ticket Booking Site** - Purchase tickets directly"
+                        link_text = "Buy Tickets"
+                    elif any(keyword in link.lower() for keyword in ['facebook', 'instagram', 'twitter']):
+                        link_type = "📱 **Social Media Event** - Follow for updates"
+                        link_text = "View Event Details"
+                    else:
+                        link_type = "ℹ️ **Event Information** - Details and possibly booking"
+                        link_text = "Learn More"
+                    
+                    events_found.append(event_from_serpapi(
+                        result, event_info['category'], event_info['icon'], event_date, link_type, link_text
+                    ))
+            
+            if events_found:
+                all_events.extend(events_found)
+        
+        return all_events[:12]  # Return top 12 events across all categories
+        
+    except (QuotaExceeded, RateLimitTimeout):
+        raise
+    except Exception as error:
+        return []
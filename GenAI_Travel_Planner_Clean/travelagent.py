@@ -6,16 +6,27 @@ st.set_page_config(page_title="🌍 AI Travel Planner", layout="wide")
 import json
 import os
 import re
+import uuid
 import requests
-import googlemaps
-from amadeus import Client, ResponseError
-from serpapi import GoogleSearch
-from agno.agent import Agent
-from agno.tools.serpapi import SerpApiTools
-from agno.models.google import Gemini
 from datetime import datetime
 from config import config
 from database import db
+from travel_services import (
+    FEATURED_CITIES,
+    TRAVEL_THEMES,
+    get_iata_code,
+    get_airport_display_name,
+    test_amadeus_connection,
+    amadeus,
+)
+from plan_jobs import get_job_queue, JobNotFound
+from plan_pipeline import to_date, plan_notices
+from rate_limiter import limiter
+from fetch_cache import cache as fetch_cache
+from fare_cache import fare_cache
+import plan_codec
+from session_memory import session_memory
+from city_autocomplete import city_autocomplete
 
 # Initialize session state for email access and travel plan
 if 'email_verified' not in st.session_state:
@@ -24,6 +35,12 @@ if 'user_email' not in st.session_state:
     st.session_state.user_email = ""
 if 'plan_generated' not in st.session_state:
     st.session_state.plan_generated = False
+if 'session_id' not in st.session_state:
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        st.session_state.session_id = get_script_run_ctx().session_id
+    except Exception:
+        st.session_state.session_id = uuid.uuid4().hex
 
 def validate_email(email):
     """Validate email format"""
@@ -248,29 +265,59 @@ if st.session_state.user_email.lower() in [email.lower() for email in admin_emai
             )
         else:
             st.sidebar.info("No emails collected this session")
-# Set environment variables for libraries that need them
-os.environ["GOOGLE_API_KEY"] = config.GOOGLE_API_KEY
-
-# Initialize API clients
-gmaps = googlemaps.Client(key=config.GOOGLE_PLACES_API_KEY)
+    
+    # Provider rate limit and quota usage across all sessions on this host
+    with st.sidebar.expander("🚦 API Rate Limits"):
+        for provider, metric in limiter.get_metrics().items():
+            quota = metric['daily_quota'] or "∞"
+            st.markdown(
+                f"**{provider}** — {metric['daily_used']}/{quota} today  \n"
+                f"{metric['acquired']} calls, {metric['queued']} queued, "
+                f"max wait {metric['max_wait_seconds']:.1f}s, "
+                f"{metric['quota_rejections']} over quota, {metric['timeouts']} timeouts"
+            )
+        session = amadeus.get_metrics()
+        expires = "no token" if session['token_expires_in'] is None else f"token expires in {session['token_expires_in'] // 60} min"
+        st.markdown(
+            f"**amadeus session** — {session['calls']} calls, {expires}  \n"
+            f"{session['token_requests']} token requests, {session['shared_tokens']} shared from other workers, "
+            f"{session['background_refreshes']} background refreshes, {session['refresh_failures']} failed"
+        )
 
-# Initialize Amadeus client for production
-amadeus = Client(
-    client_id=config.AMADEUS_CLIENT_ID,
-    client_secret=config.AMADEUS_CLIENT_SECRET,
-    hostname='production'  # Uses api.amadeus.com for production (real flight data)
-)
+    with st.sidebar.expander("🗄️ Fetch Cache"):
+        for data_type, metric in fetch_cache.get_metrics().items():
+            hit_ratio = "–" if metric['hit_ratio'] is None else f"{metric['hit_ratio']:.0%}"
+            st.markdown(
+                f"**{data_type}** — {hit_ratio} hits (TTL {metric['ttl_seconds'] / 3600:g}h)  \n"
+                f"{metric['memory_hits']} memory / {metric['disk_hits']} disk / {metric['stale_hits']} stale hits, "
+                f"{metric['misses']} misses, {metric['refreshes']} background refreshes  \n"
+                f"{metric['memory_entries']} in memory ({metric['memory_bytes'] / 1024:.0f} KB), "
+                f"{metric['disk_entries']} on disk ({metric['disk_bytes'] / 1024:.0f} KB)"
+            )
 
-def test_amadeus_connection():
-    """Test Amadeus production API connection"""
-    try:
-        # Simple test to verify production API is working
-        response = amadeus.reference_data.locations.get(keyword='NYC', subType='AIRPORT')
-        if response.data:
-            return True
-        return False
-    except Exception as e:
-        return False
+        fares = fare_cache.get_metrics()
+        fare_hit_ratio = "–" if fares['hit_ratio'] is None else f"{fares['hit_ratio']:.0%}"
+        st.markdown(
+            f"**shared fares** ({fares['backend']}) — {fare_hit_ratio} hits (TTL {fares['ttl_seconds'] / 60:g} min)  \n"
+            f"{fares['hits']} hits, {fares['misses']} misses, {fares['invalidated']} invalidated  \n"
+            f"{fares['entries']} entries ({fares['bytes'] / 1024:.0f} KB)"
+        )
+        route = st.text_input("Invalidate route", placeholder="JNB-CPT", key="fare_cache_route")
+        if st.button("🧹 Invalidate fares", key="fare_cache_invalidate") and '-' in route:
+            origin, destination = route.strip().split('-', 1)
+            st.success(f"Removed {fare_cache.invalidate_route(origin.strip(), destination.strip())} cached fares for {route.upper()}")
+
+    with st.sidebar.expander("🧠 Session Memory"):
+        memory = session_memory.get_metrics()
+        this_session = session_memory.account(st.session_state.session_id, st.session_state)
+        st.markdown(
+            f"**{memory['sessions']}** active sessions — {memory['total_bytes'] / 1024:.0f} KB in session state  \n"
+            f"largest {memory['largest_bytes'] / 1024:.0f} KB, {memory['over_cap']} over the "
+            f"{memory['cap_bytes'] / 1024:.0f} KB cap ({memory['over_cap_events']} runs over cap since start-up), "
+            f"{memory['offloaded_bytes'] / 1024:.0f} KB offloaded to disk"
+        )
+        largest_keys = sorted(this_session['keys'].items(), key=lambda item: item[1], reverse=True)[:5]
+        st.markdown("This session: " + ", ".join(f"`{key}` {size / 1024:.1f} KB" for key, size in largest_keys))
 
 # Test connection on startup
 if 'amadeus_tested' not in st.session_state:
@@ -1024,43 +1071,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Production mode detection - simplified for production use
-def is_production_mode():
-    """Always return True for production environment"""
-    return True
-
-def should_use_google_places():
-    """Always use Google Places API when available"""
-    return config.GOOGLE_PLACES_API_KEY and not config.GOOGLE_PLACES_API_KEY.startswith("#")
-
-def should_use_amadeus():
-    """Always use Amadeus API when available"""
-    return config.AMADEUS_CLIENT_ID and config.AMADEUS_CLIENT_SECRET
-
-# Airport coordinates helper for car rentals
-def get_airport_coordinates(iata_code):
-    """Get coordinates for major airports"""
-    airport_coords = {
-        'JNB': {'lat': -26.1367, 'lng': 28.2411},  # Johannesburg O.R. Tambo
-        'CPT': {'lat': -33.9715, 'lng': 18.6021},  # Cape Town International
-        'DUR': {'lat': -29.6144, 'lng': 31.1197},  # Durban King Shaka
-        'LHR': {'lat': 51.4700, 'lng': -0.4543},   # London Heathrow
-        'JFK': {'lat': 40.6413, 'lng': -73.7781},  # New York JFK
-        'LAX': {'lat': 33.9425, 'lng': -118.4081}, # Los Angeles LAX
-        'CDG': {'lat': 49.0097, 'lng': 2.5479},    # Paris Charles de Gaulle
-        'NRT': {'lat': 35.7720, 'lng': 140.3929},  # Tokyo Narita
-        'SYD': {'lat': -33.9399, 'lng': 151.1753}, # Sydney Kingsford Smith
-        'PLZ': {'lat': -33.9850, 'lng': 25.6173},  # Port Elizabeth
-        'BFN': {'lat': -29.0927, 'lng': 26.3023},  # Bloemfontein
-        'ELS': {'lat': -33.0356, 'lng': 27.8258},  # East London
-        'GRJ': {'lat': -34.0056, 'lng': 22.3789},  # George
-        'KIM': {'lat': -28.8028, 'lng': 24.7651},  # Kimberley
-        'UTN': {'lat': -28.3991, 'lng': 21.2606},  # Upington
-        'PTG': {'lat': -23.9261, 'lng': 29.4584},  # Polokwane
-        'MQP': {'lat': -25.3832, 'lng': 31.1056}   # Nelspruit
-    }
-    return airport_coords.get(iata_code, {'lat': 0, 'lng': 0})
-
 # Main Header with Custom Styling
 st.markdown("""
 <div class="main-header fade-in">
@@ -1074,48 +1084,36 @@ st.markdown("""
 # Code cleaned up - removed development mode toggle
 # Code cleaned up - production ready
 
-# Prepare city-country options for dropdowns
-CITY_TO_IATA = {
-    "Mumbai, India": "BOM",
-    "Delhi, India": "DEL",
-    "Durban, South Africa": "DUR",
-    "Johannesburg, South Africa": "JNB",
-    "London, United Kingdom": "LHR",
-    "New York, Usa": "JFK",
-    "Paris, France": "CDG",
-    "Tokyo, Japan": "HND",
-    "Cape Town, South Africa": "CPT",
-    "Port Elizabeth, South Africa": "PLZ",
-    "Bloemfontein, South Africa": "BFN",
-    "East London, South Africa": "ELS",
-    "George, South Africa": "GRJ",
-    "Kimberley, South Africa": "KIM",
-    "Upington, South Africa": "UTN",
-    "Pietermaritzburg, South Africa": "PZB",
-    "Polokwane, South Africa": "PTG",
-    "Nelspruit, South Africa": "MQP"
-}
-
-# Simpler get_iata_code function
-def get_iata_code(city_country):
-    """Get IATA code from city-country string"""
-    result = CITY_TO_IATA.get(city_country, None)
-    
-    if result:
-        return result
-    else:
-        # If not found, generate a 3-letter code from the city name
-        city_clean = city_country.split(',')[0].strip().replace(' ', '')[:3].upper()
-        return city_clean
-
-city_options = list(CITY_TO_IATA.keys())
+city_options = FEATURED_CITIES
+
+def city_picker(label, default, fallback_index=0, key=None):
+    """
+    City selectbox narrowed by a typo-tolerant search box
+
+    Args:
+        label (str): Selectbox label
+        default (str): City, Country selected initially
+        fallback_index (int): Option selected when default is not offered
+        key (str): Widget key prefix (optional)
+
+    Returns:
+        str: Selected City, Country
+    """
+    query = st.text_input(f"🔎 Search {label.split('(')[0].strip(' :')}",
+                          key=f"{key or label}_search", placeholder="Type a city, airport or code - typos are fine")
+    options = city_autocomplete.suggest(query, limit=15) if query.strip() else city_options
+    if not options:
+        st.caption(f"No city matches '{query}' - showing featured cities")
+        options = city_options
+    index = options.index(default) if default in options else (fallback_index if options is city_options else 0)
+    return st.selectbox(label, options, index=index, key=key)
 
 # Main Application Logic with State Persistence
 def main_app():
     """Main application with persistent state management"""
     
     # Check if we should show the travel plan or the form
-    if st.session_state.travel_plan_generated and st.session_state.travel_plan_data:
+    if st.session_state.travel_plan_generated and session_memory.load(st.session_state, 'travel_plan_data'):
         show_travel_plan()
     else:
         show_travel_form()
@@ -1126,18 +1124,11 @@ def show_travel_form():
     st.markdown('<div class="section-header">🌍 Where are you headed?</div>', unsafe_allow_html=True)
     
     # Use session state to preserve form values
-    source = st.selectbox(
-        "🛫 Departure City (City, Country):", 
-        city_options, 
-        index=city_options.index(st.session_state.form_data.get('source', "Durban, South Africa")) if st.session_state.form_data.get('source', "Durban, South Africa") in city_options else 0,
-        key='source_input'
-    )
-    destination = st.selectbox(
-        "🛬 Destination (City, Country):", 
-        city_options, 
-        index=city_options.index(st.session_state.form_data.get('destination', "Johannesburg, South Africa")) if st.session_state.form_data.get('destination', "Johannesburg, South Africa") in city_options else 1,
-        key='destination_input'
-    )
+    source = city_picker("🛫 Departure City (City, Country):",
+                         st.session_state.form_data.get('source', "Durban, South Africa"), 0, key='source_input')
+    destination = city_picker("🛬 Destination (City, Country):",
+                              st.session_state.form_data.get('destination', "Johannesburg, South Africa"), 1,
+                              key='destination_input')
 
     travel_theme = st.selectbox(
         "🎭 Select Your Travel Theme:",
@@ -1222,6 +1213,7 @@ def show_travel_plan():
         if st.button("🔄 Generate New Plan", type="primary"):
             # Reset state to show form again
             st.session_state.travel_plan_generated = False
+            session_memory.discard(st.session_state, 'travel_plan_data')
             st.session_state.travel_plan_data = None
             st.rerun()
     
@@ -1230,13 +1222,11 @@ def show_travel_plan():
             # Full page refresh
             st.rerun()
     
-    # Display the travel plan data
-    if st.session_state.travel_plan_data:
+    # Display the travel plan data (read through session_memory, which resolves offloaded payloads)
+    plan_data = session_memory.load(st.session_state, 'travel_plan_data')
+    if plan_data:
         st.markdown("---")
         
-        # Display saved travel plan
-        plan_data = st.session_state.travel_plan_data
-        
         # Show trip summary
         if 'trip_summary' in plan_data:
             st.markdown(f"""
@@ -1317,20 +1307,31 @@ st.markdown("""
     <p style="color: #D4AF37; margin: 0.5rem 0 0 0; font-weight: 500; font-size: 1rem;">Select your perfect travel destinations</p>
 </div>
 """, unsafe_allow_html=True)
-source = st.selectbox(
-    "🛫 Departure City (City, Country):", 
-    city_options, 
-    index=city_options.index("Durban, South Africa") if "Durban, South Africa" in city_options else 0
-)
-destination = st.selectbox(
-    "🛬 Destination (City, Country):", 
-    city_options, 
-    index=city_options.index("Johannesburg, South Africa") if "Johannesburg, South Africa" in city_options else 1
-)
+source = city_picker("🛫 Departure City (City, Country):", "Durban, South Africa", 0)
+destination = city_picker("🛬 Destination (City, Country):", "Johannesburg, South Africa", 1)
+
+# Multi-city trips: the planner picks the visit order with the lowest total fare or flight time
+multi_city = st.toggle("🗺️ Multi-city trip", help="Visit several destinations - the planner picks the best order")
+destinations = []
+optimize_for = "price"
+if multi_city:
+    destinations = st.multiselect(
+        "🏙️ Cities to Visit:",
+        city_options if destination in city_options else [destination] + city_options,
+        default=[destination],
+        max_selections=config.MULTI_CITY_MAX_DESTINATIONS,
+        help="Add every city you want to visit; the order you pick them in does not matter"
+    )
+    optimize_for = st.radio(
+        "⚖️ Visit Order:",
+        ["price", "duration"],
+        format_func=lambda value: "💰 Lowest total fare" if value == "price" else "⏱️ Shortest flight time",
+        horizontal=True
+    )
 
 travel_theme = st.selectbox(
     "🎭 Select Your Travel Theme:",
-    ["💼 Business Trip", "💑 Couple Getaway", "👨‍👩‍👧‍👦 Family Vacation", "🏔️ Adventure Trip", "🧳 Solo Exploration"]
+    TRAVEL_THEMES
 )
 
 # Divider for aesthetics
@@ -1379,6 +1380,14 @@ return_time_pref = st.selectbox(
     help="Preferred return time window"
 )
 
+# Flexible dates: compare fares for nearby departure/return days
+flex_days = st.select_slider(
+    "📅 Flexible Dates (± days):",
+    options=[0, 1, 2, 3],
+    value=0,
+    help="Also compare fares for departures and returns up to this many days either side"
+)
+
 # Number of travelers slider
 num_travelers = st.slider(
     "👥 Number of Travelers:",
@@ -1613,973 +1622,50 @@ params = {
     "api_key": config.SERPAPI_KEY
 }
 
-# Function to fetch flight data using Amadeus API
-@st.cache_data(ttl=300)  # 5 minute cache for production
-def fetch_amadeus_flights(source, destination, departure_date, return_date, adults=1):
-    """Fetch flight offers using Amadeus Production API (api.amadeus.com)"""
-    try:
-        # Ensure IATA codes are valid 3-letter codes
-        if len(source) != 3 or len(destination) != 3:
-            return []
-            
-        response = amadeus.shopping.flight_offers_search.get(
-            originLocationCode=source,
-            destinationLocationCode=destination,
-            departureDate=str(departure_date),
-            returnDate=str(return_date),
-            adults=adults,
-            currencyCode='ZAR',
-            max=3
-        )
-        
-        if response.data:
-            return response.data
-    except ResponseError as error:
-        return generate_mock_flight_data(source, destination, departure_date, return_date, adults)
-    except Exception as e:
-        return generate_mock_flight_data(source, destination, departure_date, return_date, adults)
-
-def generate_mock_flight_data(source, destination, departure_date, return_date, adults=1):
-    """Generate realistic mock flight data for development"""
-    import random
-    from datetime import timedelta
-    
-    # Get city names for display
-    city_names = {
-        'JNB': 'Johannesburg', 'CPT': 'Cape Town', 'DUR': 'Durban',
-        'LHR': 'London', 'JFK': 'New York', 'CDG': 'Paris',
-        'LAX': 'Los Angeles', 'NRT': 'Tokyo', 'SYD': 'Sydney'
-    }
-    
-    source_city = city_names.get(source, source)
-    dest_city = city_names.get(destination, destination)
-    
-    # Generate 3-5 mock flights with realistic pricing
-    base_prices = {
-        ('JNB', 'CPT'): 1200, ('CPT', 'JNB'): 1200,
-        ('JNB', 'DUR'): 800, ('DUR', 'JNB'): 800,
-        ('CPT', 'DUR'): 1400, ('DUR', 'CPT'): 1400,
-    }
-    
-    route_key = (source, destination)
-    base_price = base_prices.get(route_key, 2500)  # Default for international
-    
-    airlines = ['South African Airways', 'FlySafair', 'Kulula', 'Lift', 'British Airways', 'Emirates']
-    
-    mock_flights = []
-    for i in range(3):
-        price_variation = random.uniform(0.8, 1.4)
-        flight_price = round(base_price * price_variation * adults)
-        
-        # Generate realistic flight times
-        departure_time = f"{random.randint(6, 22):02d}:{random.choice(['00', '15', '30', '45'])}"
-        duration_hours = random.randint(1, 12)
-        duration_mins = random.choice([0, 15, 30, 45])
-        
-        mock_flights.append({
-            'price': {'total': str(flight_price), 'currency': 'ZAR'},
-            'airline': random.choice(airlines),
-            'departure_time': departure_time,
-            'duration': f"{duration_hours}h {duration_mins}m",
-            'source': source_city,
-            'destination': dest_city,
-            'stops': random.choice([0, 0, 0, 1]),  # Mostly direct flights
-            'aircraft': random.choice(['Boeing 737', 'Airbus A320', 'Boeing 787']),
-            'mock_data': True
-        })
-    
-    return mock_flights
-
-def generate_mock_restaurants(location, cuisine_type="", budget=""):
-    """Generate realistic mock restaurant data for development"""
-    import random
-    
-    # Sample restaurant data based on location
-    restaurant_types = {
-        'african': ['Shisa Nyama', 'Braai House', 'African Kitchen', 'Ubuntu Restaurant'],
-        'italian': ['Mama Mia', 'Bella Vista', 'Romano\'s', 'La Piazza'],
-        'asian': ['Dragon Palace', 'Sakura Sushi', 'Thai Garden', 'Panda Express'],
-        'steakhouse': ['The Grill House', 'Prime Cuts', 'Steakhouse 101', 'Meat & Fire'],
-        '': ['Local Favorite', 'City Bistro', 'Corner Cafe', 'Downtown Eatery']
-    }
-    
-    cuisine_key = cuisine_type.lower() if cuisine_type else ''
-    base_names = restaurant_types.get(cuisine_key, restaurant_types[''])
-    
-    price_ranges = {
-        'budget': ('R50-150', 2),
-        'mid-range': ('R150-300', 3),
-        'luxury': ('R300-600', 4),
-        '': ('R100-250', 3)
-    }
-    
-    price_range, rating_base = price_ranges.get(budget.lower(), price_ranges[''])
-    
-    mock_restaurants = []
-    for i in range(min(5, len(base_names))):
-        name = f"{base_names[i]} - {location}"
-        rating = round(rating_base + random.uniform(-0.5, 0.8), 1)
-        rating = min(5.0, max(1.0, rating))  # Keep between 1-5
-        
-        mock_restaurants.append({
-            'name': name,
-            'rating': rating,
-            'price_level': rating_base,
-            'price_range': price_range,
-            'cuisine_type': cuisine_type or 'Local',
-            'vicinity': f"Near {location} center",
-            'opening_hours': 'Open now' if random.choice([True, False]) else 'Opens at 18:00',
-            'mock_data': True
-        })
-    
-    return mock_restaurants
-
-def parse_amadeus_flights(flight_data):
-    """Parse Amadeus flight data to match your existing structure"""
-    parsed_flights = []
-    
-    for offer in flight_data:
-        price = offer['price']['total']
-        currency = offer['price']['currency']
-        
-        # Get flight segments - safely check if itineraries exist
-        if 'itineraries' not in offer or not offer['itineraries']:
-            continue  # Skip this offer if no itineraries
-            
-        itineraries = offer['itineraries']
-        if not itineraries[0].get('segments'):
-            continue  # Skip if no segments
-            
-        outbound = itineraries[0]['segments'][0]
-        return_flight = itineraries[1]['segments'][0] if len(itineraries) > 1 and itineraries[1].get('segments') else None
-        
-        # Calculate total duration - safely access duration
-        total_duration = itineraries[0].get('duration', 'N/A')
-        if return_flight and len(itineraries) > 1:
-            return_duration = itineraries[1].get('duration', 'N/A')
-            # Convert PT4H30M format to minutes
-            total_duration = parse_duration(total_duration) + parse_duration(return_duration)
-        else:
-            total_duration = parse_duration(total_duration)
-        
-        flight_info = {
-            'price': f"{currency} {price}",
-            'total_duration': f"{total_duration} min",
-            'airline': outbound.get('carrierCode', 'Unknown'),
-            'airline_logo': f"https://pics.avs.io/100/100/{outbound.get('carrierCode', 'XX')}.png",
-            'flights': [{
-                'departure_airport': {
-                    'code': outbound.get('departure', {}).get('iataCode', 'N/A'),
-                    'time': outbound.get('departure', {}).get('at', 'N/A')
-                },
-                'arrival_airport': {
-                    'code': outbound.get('arrival', {}).get('iataCode', 'N/A'),
-                    'time': outbound.get('arrival', {}).get('at', 'N/A')
-                }
-            }],
-            'booking_token': offer.get('id', 'N/A')  # Use offer ID for booking
-        }
-        
-        parsed_flights.append(flight_info)
-    
-    return parsed_flights
-
-def parse_duration(duration_str):
-    """Convert PT4H30M format to total minutes"""
-    import re
-    pattern = r'PT(?:(\d+)H)?(?:(\d+)M)?'
-    match = re.match(pattern, duration_str)
-    if match:
-        hours = int(match.group(1) or 0)
-        minutes = int(match.group(2) or 0)
-        return hours * 60 + minutes
-    return 0
-
-# Function to extract top 3 cheapest flights
-def extract_cheapest_flights(flight_data):
-    """Extract and sort flights by price"""
-    if not flight_data:
-        return []
-    
-    # Sort by price (remove currency symbol for sorting)
-    def get_price_value(flight):
-        price_str = flight.get('price', '0')
-        # Extract numeric value from "ZAR 1500" format
-        try:
-            return float(price_str.split(' ')[1])
-        except:
-            return float('inf')
-    
-    sorted_flights = sorted(flight_data, key=get_price_value)
-    return sorted_flights[:3]  # Return top 3 cheapest
-
-def get_airport_display_name(airport_code):
-    """Get display name for airport"""
-    location_names = {
-        'JNB': 'Johannesburg (O.R. Tambo)',
-        'CPT': 'Cape Town International',
-        'DUR': 'Durban (King Shaka)',
-        'NYC': 'New York (JFK/LGA/EWR)',
-        'LAX': 'Los Angeles International',
-        'LHR': 'London Heathrow',
-        'CDG': 'Paris Charles de Gaulle',
-        'NRT': 'Tokyo Narita',
-        'SYD': 'Sydney Kingsford Smith'
-    }
-    return location_names.get(airport_code, f"{airport_code} Airport")
-
-# Streamlined flight search - direct to Skyscanner for production
-def get_flight_booking_url(source_iata, destination_iata, departure_date, return_date, num_travelers=1, flight_class="economy"):
-    """Generate Skyscanner booking URL for flights"""
-    return f"https://www.skyscanner.com/transport/flights/{source_iata}/{destination_iata}/{departure_date.strftime('%y%m%d')}/{return_date.strftime('%y%m%d')}/?adults={num_travelers}&children=0&infants=0&cabinclass={flight_class}"
-
-def generate_flight_summary(source_iata, destination_iata, departure_date, return_date, num_travelers, flight_class="economy"):
-    """Generate a clean flight summary for display"""
-    travelers_text = "1 traveler" if num_travelers == 1 else f"{num_travelers} travelers"
-    return {
-        'route': f"{source_iata} ➜ {destination_iata} ➜ {source_iata}",
-        'dates': f"{departure_date.strftime('%b %d')} - {return_date.strftime('%b %d, %Y')}",
-        'travelers': travelers_text,
-        'booking_url': get_flight_booking_url(source_iata, destination_iata, departure_date, return_date, num_travelers, flight_class)
-    }
-
-# Skyscanner API Integration for Enhanced Flight Search
-@st.cache_data(ttl=300)  # 5 minute cache
-def fetch_skyscanner_flights(source_iata, destination_iata, departure_date, return_date, departure_time_pref="Any Time", return_time_pref="Any Time"):
-    """Fetch flight data from Skyscanner API with time preferences"""
-    try:
-        import requests
-        
-        # Skyscanner RapidAPI endpoint
-        url = "https://skyscanner80.p.rapidapi.com/api/v1/flights/search-roundtrip"
-        
-        headers = {
-            "X-RapidAPI-Key": config.RAPIDAPI_KEY or "demo_key",
-            "X-RapidAPI-Host": "skyscanner80.p.rapidapi.com"
-        }
-        
-        # Convert time preferences to hour ranges
-        time_ranges = {
-            "🌅 Morning (06:00-12:00)": ("06:00", "12:00"),
-            "☀️ Afternoon (12:00-18:00)": ("12:00", "18:00"), 
-            "🌙 Evening (18:00-00:00)": ("18:00", "00:00"),
-            "🦉 Late Night (00:00-06:00)": ("00:00", "06:00"),
-            "⏰ Any Time": (None, None)
-        }
-        
-        departure_time_range = time_ranges.get(departure_time_pref, (None, None))
-        return_time_range = time_ranges.get(return_time_pref, (None, None))
-        
-        querystring = {
-            "fromId": source_iata,
-            "toId": destination_iata,
-            "departDate": str(departure_date),
-            "returnDate": str(return_date),
-            "adults": "1",
-            "currency": "USD"
-        }
-        
-        # Add time preferences if specified
-        if departure_time_range[0]:
-            querystring["departureTimeFrom"] = departure_time_range[0]
-            querystring["departureTimeTo"] = departure_time_range[1]
-        
-        if return_time_range[0]:
-            querystring["returnTimeFrom"] = return_time_range[0]
-            querystring["returnTimeTo"] = return_time_range[1]
-        
-        response = requests.get(url, headers=headers, params=querystring, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            
-            # Parse Skyscanner response
-            flights = []
-            if "data" in data and "itineraries" in data["data"]:
-                for itinerary in data["data"]["itineraries"][:5]:  # Get top 5 flights
-                    flight_info = {
-                        "airline": itinerary.get("legs", [{}])[0].get("carriers", [{}])[0].get("name", "Unknown Airline"),
-                        "price": f"${itinerary.get('price', {}).get('formatted', 'N/A')}",
-                        "departure_time": itinerary.get("legs", [{}])[0].get("departure", "N/A"),
-                        "arrival_time": itinerary.get("legs", [{}])[0].get("arrival", "N/A"),
-                        "duration": f"{itinerary.get('legs', [{}])[0].get('durationInMinutes', 0) // 60}h {itinerary.get('legs', [{}])[0].get('durationInMinutes', 0) % 60}m",
-                        "booking_url": f"https://www.skyscanner.com/transport/flights/{source_iata}/{destination_iata}/{departure_date}/{return_date}/",
-                        "stops": len(itinerary.get("legs", [{}])[0].get("segments", [])) - 1,
-                        "source": "Skyscanner API"
-                    }
-                    flights.append(flight_info)
-            
-            st.success(f"🛫 Found {len(flights)} Skyscanner flights with time preferences")
-            return flights
-            
-        else:
-            st.warning(f"Skyscanner API returned status {response.status_code}")
-            return generate_enhanced_flight_mock_data(source_iata, destination_iata, departure_time_pref, return_time_pref)
-            
-    except Exception as e:
-        st.info(f"Using demo flight data (Skyscanner: {str(e)[:50]}...)")
-        return generate_enhanced_flight_mock_data(source_iata, destination_iata, departure_time_pref, return_time_pref)
-
-def generate_south_african_domestic_flights(source_iata, destination_iata, departure_date, return_date):
-    """Generate realistic South African domestic flight data"""
-    
-    # South African domestic airlines
-    airlines = {
-        "FlySafair": "https://www.flysafair.co.za/",
-        "Kulula": "https://www.kulula.com/",
-        "South African Airways": "https://www.flysaa.com/",
-        "Lift": "https://www.lift.co.za/",
-        "Airlink": "https://www.flyairlink.com/"
-    }
-    
-    # Route-specific pricing (South African Rand converted to USD)
-    route_pricing = {
-        ("DUR", "JNB"): (85, 150),   # Durban to Johannesburg
-        ("JNB", "DUR"): (85, 150),   # Johannesburg to Durban
-        ("JNB", "CPT"): (95, 180),   # Johannesburg to Cape Town
-        ("CPT", "JNB"): (95, 180),   # Cape Town to Johannesburg
-        ("DUR", "CPT"): (120, 220),  # Durban to Cape Town
-        ("CPT", "DUR"): (120, 220),  # Cape Town to Durban
-    }
-    
-    route = (source_iata, destination_iata)
-    base_price, max_price = route_pricing.get(route, (100, 200))
-    
-    flights = []
-    for i, (airline, website) in enumerate(airlines.items()):
-        price_variation = i * 15  # Price varies by airline
-        price = base_price + price_variation
-        
-        # Time variations
-        departure_times = ["06:30", "09:15", "12:45", "15:30", "18:20"]
-        arrival_times = ["08:45", "11:30", "15:00", "17:45", "20:35"]
-        
-        flight = {
-            "airline": airline,
-            "price": f"${price}",
-            "departure_time": departure_times[i % len(departure_times)],
-            "arrival_time": arrival_times[i % len(arrival_times)],
-            "duration": "1h 15m" if route[0] != route[1] else "1h 30m",
-            "booking_url": website,
-            "stops": 0,  # Domestic flights are usually direct
-            "source": "South African Domestic (Demo)",
-            "flight_number": f"{airline[:2].upper()}{100 + i}",
-            "aircraft": "Boeing 737" if i % 2 == 0 else "Airbus A320",
-            "booking_token": f"SA-{source_iata}{destination_iata}-{i}"
-        }
-        flights.append(flight)
-    
-    return flights
-
-def generate_enhanced_flight_mock_data(source_iata, destination_iata, departure_time_pref="Any Time", return_time_pref="Any Time"):
-    """Generate mock flight data with time preferences"""
-    
-    # Sample airlines
-    airlines = ["Emirates", "Qatar Airways", "South African Airways", "British Airways", "Lufthansa"]
-    
-    # Time slots based on preferences
-    time_slots = {
-        "🌅 Morning (06:00-12:00)": ["07:30", "09:15", "11:45"],
-        "☀️ Afternoon (12:00-18:00)": ["13:20", "15:30", "17:10"],
-        "🌙 Evening (18:00-00:00)": ["19:45", "21:15", "23:30"],
-        "🦉 Late Night (00:00-06:00)": ["01:20", "03:45", "05:15"],
-        "⏰ Any Time": ["07:30", "13:20", "19:45"]
-    }
-    
-    departure_times = time_slots.get(departure_time_pref, time_slots["⏰ Any Time"])
-    
-    flights = []
-    for i, airline in enumerate(airlines[:3]):
-        flight = {
-            "airline": airline,
-            "price": f"${850 + (i * 120)}",
-            "departure_time": departure_times[i % len(departure_times)],
-            "arrival_time": "14:20",  # Sample arrival
-            "duration": f"{8 + i}h {30 + (i * 15)}m",
-            "booking_url": f"https://www.skyscanner.com/transport/flights/{source_iata}/{destination_iata}/",
-            "stops": i,  # 0, 1, 2 stops
-            "source": "Demo Data (Time-filtered)"
-        }
-        flights.append(flight)
-    
-    return flights
-
-# Google Search Functions for restaurants, attractions, and local activities
-def fetch_google_restaurants(location, cuisine_type="", budget="", travel_theme=""):
-    """Fetch restaurant recommendations using Google Places API with business-friendly options"""
-    
-    # Use Google Places API when available, fallback to mock data
-    if not should_use_google_places():
-        return generate_mock_restaurants(location, cuisine_type, budget)
-    
-    try:
-        # First, get the location coordinates
-        geocode_result = gmaps.geocode(location)
-        if not geocode_result:
-            return generate_mock_restaurants(location, cuisine_type, budget)
-        
-        location_coords = geocode_result[0]['geometry']['location']
-        lat, lng = location_coords['lat'], location_coords['lng']
-        
-        # Search for restaurants using Places API with business-friendly options
-        search_query = "restaurant"
-        if cuisine_type:
-            search_query += f" {cuisine_type}"
-        
-        # Add business-friendly terms for business travel theme
-        if "Business" in travel_theme:
-            search_query += " business lunch meeting wifi private dining"
-        
-        # Use nearby search for better results
-        places_result = gmaps.places_nearby(
-            location=(lat, lng),
-            radius=10000,  # 10km radius
-            type='restaurant',
-            keyword=search_query,
-            min_price=get_price_level(budget)
-        )
-        
-        restaurants = []
-        
-        # Get detailed information for each restaurant
-        for place in places_result.get('results', [])[:3]:  # Limit to 3 restaurants
-            place_id = place['place_id']
-            
-            # Get detailed place information
-            place_details = gmaps.place(
-                place_id=place_id,
-                fields=['name', 'formatted_address', 'formatted_phone_number', 
-                       'website', 'rating', 'user_ratings_total', 'opening_hours',
-                       'price_level', 'url']
-            )
-            
-            details = place_details['result']
-            
-            # Format opening hours
-            opening_hours = "Hours not available"
-            if details.get('opening_hours') and details['opening_hours'].get('weekday_text'):
-                opening_hours = "; ".join(details['opening_hours']['weekday_text'][:2])  # Show first 2 days
-                if len(details['opening_hours']['weekday_text']) > 2:
-                    opening_hours += "..."
-            
-            restaurant = {
-                'name': details.get('name', 'Unknown Restaurant'),
-                'address': details.get('formatted_address', 'Address not available'),
-                'phone': details.get('formatted_phone_number', 'Phone not available'),
-                'website': details.get('website', details.get('url', '')),
-                'rating': details.get('rating', 'N/A'),
-                'total_ratings': details.get('user_ratings_total', 0),
-                'price_level': get_price_text(details.get('price_level')),
-                'hours': opening_hours,
-                'photo_url': '',  # Simplified for now
-                'review_snippet': 'Visit Google Maps for reviews',  # Simplified
-                'google_maps_url': details.get('url', ''),
-                'place_id': place_id,
-                'source': 'Google Places API'
-            }
-            restaurants.append(restaurant)
-        
-        return restaurants
-        
-    except Exception as error:
-        return []
-
-def fetch_business_venues(location):
-    """Fetch business-friendly venues like coworking spaces, conference centers, meeting rooms"""
-    
-    if not should_use_google_places():
-        return generate_mock_business_venues(location)
-    
-    try:
-        # First, get the location coordinates
-        geocode_result = gmaps.geocode(location)
-        if not geocode_result:
-            return generate_mock_business_venues(location)
-
-        location_coords = geocode_result[0]['geometry']['location']
-        lat, lng = location_coords['lat'], location_coords['lng']
-
-        # Search for business venues
-        business_types = [
-            {'type': 'establishment', 'keyword': 'coworking space shared office', 'category': '💼 Coworking Space'},
-            {'type': 'establishment', 'keyword': 'conference center meeting room', 'category': '🏢 Conference Center'},
-            {'type': 'establishment', 'keyword': 'business center office space', 'category': '🏢 Business Center'},
-            {'type': 'establishment', 'keyword': 'hotel business center meeting', 'category': '🏨 Hotel Business Center'}
-        ]
-        
-        all_venues = []
-
-        for venue_type in business_types:
-            places_result = gmaps.places_nearby(
-                location=(lat, lng),
-                radius=15000,  # 15km radius
-                keyword=venue_type['keyword']
-            )
-
-            for place in places_result.get('results', [])[:2]:  # 2 per type
-                place_id = place['place_id']
-
-                # Get detailed place information
-                place_details = gmaps.place(
-                    place_id=place_id,
-                    fields=['name', 'formatted_address', 'formatted_phone_number',
-                           'website', 'rating', 'user_ratings_total', 'opening_hours', 'url']
-                )
-
-                details = place_details['result']
-
-                # Format opening hours
-                opening_hours = "Hours not available"
-                if details.get('opening_hours') and details['opening_hours'].get('weekday_text'):
-                    opening_hours = "; ".join(details['opening_hours']['weekday_text'][:2])
-                    if len(details['opening_hours']['weekday_text']) > 2:
-                        opening_hours += "..."
-
-                venue = {
-                    'name': details.get('name', 'Unknown Venue'),
-                    'address': details.get('formatted_address', 'Address not available'),
-                    'phone': details.get('formatted_phone_number', 'Phone not available'),
-                    'website': details.get('website', ''),
-                    'rating': details.get('rating', 'N/A'),
-                    'total_ratings': details.get('user_ratings_total', 0),
-                    'hours': opening_hours,
-                    'category': venue_type['category'],
-                    'google_maps_url': details.get('url', ''),
-                    'place_id': place_id,
-                    'source': 'Google Places API'
-                }
-                all_venues.append(venue)
-
-        # Remove duplicates and limit to best venues
-        unique_venues = {venue['place_id']: venue for venue in all_venues}.values()
-        sorted_venues = sorted(unique_venues, key=lambda x: (x['rating'] if x['rating'] != 'N/A' else 0), reverse=True)
-
-        return list(sorted_venues)[:3]  # Return top 3 business venues
-
-    except Exception as error:
-        return generate_mock_business_venues(location)
-
-def generate_mock_business_venues(location):
-    """Generate mock business venue data when API is unavailable"""
-    return [
-        {
-            'name': f'{location} Business Center',
-            'address': f'Central Business District, {location}',
-            'phone': '+27 11 123 4567',
-            'website': 'https://businesscenter.com',
-            'rating': 4.2,
-            'total_ratings': 156,
-            'hours': 'Mon-Fri: 8:00 AM - 6:00 PM',
-            'category': '🏢 Business Center',
-            'google_maps_url': 'https://maps.google.com',
-            'source': 'Demo Data'
-        },
-        {
-            'name': f'{location} Coworking Hub',
-            'address': f'Downtown {location}',
-            'phone': '+27 11 234 5678',
-            'website': 'https://coworkinghub.com',
-            'rating': 4.5,
-            'total_ratings': 89,
-            'hours': 'Mon-Sun: 24/7 Access',
-            'category': '💼 Coworking Space',
-            'google_maps_url': 'https://maps.google.com',
-            'source': 'Demo Data'
-        }
-    ]
-
-# Helper functions for Google Places API
-def get_price_level(budget):
-    """Convert budget preference to Google Places price level"""
-    # Extract the budget type from the enhanced format
-    if "Economy" in budget:
-        return 1
-    elif "Standard" in budget:
-        return 2
-    elif "Luxury" in budget:
-        return 3
-    else:
-        return 1  # Default to economy
-
-def get_price_text(price_level):
-    """Convert price level number to text"""
-    if price_level is None:
-        return "Price not available"
-    
-    price_text = {
-        1: "$ (Inexpensive)",
-        2: "$$ (Moderate)",
-        3: "$$$ (Expensive)",
-        4: "$$$$ (Very Expensive)"
-    }
-    return price_text.get(price_level, "Price not available")
-
-def get_attraction_category(types):
-    """Determine attraction category from Google Places types"""
-    if 'museum' in types:
-        return '🏛️ Museum'
-    elif 'amusement_park' in types:
-        return '🎢 Amusement Park'
-    elif 'zoo' in types:
-        return '🦁 Zoo'
-    elif 'aquarium' in types:
-        return '🐠 Aquarium'
-    elif 'park' in types:
-        return '🌳 Park'
-    elif 'tourist_attraction' in types:
-        return '🎯 Tourist Attraction'
-    else:
-        return '📍 Point of Interest'
-
-def fetch_google_attractions(location, activity_preferences=""):
-    """Fetch tourist attractions using Google Places API"""
-    try:
-        # Get location coordinates
-        geocode_result = gmaps.geocode(location)
-        if not geocode_result:
-            st.warning(f"Could not find coordinates for {location}")
-            return []
-        
-        location_coords = geocode_result[0]['geometry']['location']
-        lat, lng = location_coords['lat'], location_coords['lng']
-        
-        # Search for different types of attractions
-        attraction_types = ['tourist_attraction', 'museum', 'amusement_park', 'zoo', 'aquarium']
-        all_attractions = []
-        
-        for attraction_type in attraction_types:
-            search_query = attraction_type.replace('_', ' ')
-            if activity_preferences:
-                search_query += f" {activity_preferences}"
-            
-            places_result = gmaps.places_nearby(
-                location=(lat, lng),
-                radius=15000,  # 15km radius for attractions
-                type=attraction_type,
-                keyword=search_query
-            )
-            
-            for place in places_result.get('results', [])[:2]:  # 2 per type
-                place_id = place['place_id']
-                
-                # Get detailed place information
-                place_details = gmaps.place(
-                    place_id=place_id,
-                    fields=['name', 'formatted_address', 'formatted_phone_number', 
-                           'website', 'rating', 'user_ratings_total', 'opening_hours', 'url']
-                )
-                
-                details = place_details['result']
-                
-                # Format opening hours
-                opening_hours = "Hours not available"
-                if details.get('opening_hours') and details['opening_hours'].get('weekday_text'):
-                    opening_hours = "; ".join(details['opening_hours']['weekday_text'][:2])
-                    if len(details['opening_hours']['weekday_text']) > 2:
-                        opening_hours += "..."
-                
-                # Determine attraction category from place types
-                place_types = place.get('types', [])
-                category = get_attraction_category(place_types)
-                
-                attraction = {
-                    'name': details.get('name', 'Unknown Attraction'),
-                    'address': details.get('formatted_address', 'Address not available'),
-                    'phone': details.get('formatted_phone_number', 'Phone not available'),
-                    'website': details.get('website', ''),
-                    'rating': details.get('rating', 'N/A'),
-                    'total_ratings': details.get('user_ratings_total', 0),
-                    'hours': opening_hours,
-                    'photo_url': '',  # Simplified for now
-                    'review_snippet': 'Visit Google Maps for reviews',  # Simplified
-                    'google_maps_url': details.get('url', ''),
-                    'category': category,
-                    'place_types': place_types,
-                    'place_id': place_id,
-                    'source': 'Google Places API'
-                }
-                all_attractions.append(attraction)
-        
-        # Remove duplicates and limit to 3 best attractions
-        unique_attractions = {attr['place_id']: attr for attr in all_attractions}.values()
-        sorted_attractions = sorted(unique_attractions, key=lambda x: (x['rating'] if x['rating'] != 'N/A' else 0), reverse=True)
-        
-        return list(sorted_attractions)[:3]
-        
-    except Exception as error:
-        return []
-
-def fetch_google_local_info(location):
-    """Fetch local information with summaries and website links"""
-    try:
-        queries = [
-            {
-                'query': f"weather in {location} best time to visit climate",
-                'category': 'Weather & Best Time to Visit',
-                'icon': '🌤️'
-            },
-            {
-                'query': f"local culture customs traditions {location}",
-                'category': 'Local Culture & Customs',
-                'icon': '🏛️'
-            },
-            {
-                'query': f"safety tips travel advice {location}",
-                'category': 'Safety & Travel Tips',
-                'icon': '🛡️'
-            },
-            {
-                'query': f"transportation getting around {location} public transport",
-                'category': 'Transportation & Getting Around',
-                'icon': '🚌'
-            }
-        ]
-        
-        all_info = []
-        
-        for query_info in queries:
-            params = {
-                "engine": "google",
-                "q": query_info['query'],
-                "location": location,
-                "hl": "en",
-                "gl": "za",
-                "api_key": config.SERPAPI_KEY
-            }
-            
-            search = GoogleSearch(params)
-            results = search.get_dict()
-            
-            # Get top 2 results for better summary
-            if results.get("organic_results"):
-                organic_results = results["organic_results"][:2]
-                
-                # Create a summary from multiple sources
-                descriptions = []
-                sources = []
-                
-                for result in organic_results:
-                    snippet = result.get('snippet', '')
-                    if snippet:
-                        descriptions.append(snippet[:150] + "..." if len(snippet) > 150 else snippet)
-                        sources.append({
-                            'title': result.get('title', 'Source'),
-                            'link': result.get('link', '')
-                        })
-                
-                # Combine descriptions into a brief summary
-                summary = " | ".join(descriptions)
-                
-                info = {
-                    'category': query_info['category'],
-                    'icon': query_info['icon'],
-                    'summary': summary,
-                    'sources': sources,
-                    'full_description': ' '.join([result.get('snippet', '') for result in organic_results])
-                }
-                all_info.append(info)
-        
-        return all_info
-    except Exception as error:
-        return []
-
-def extract_rating_from_snippet(snippet):
-    """Extract rating from Google search snippet"""
-    try:
-        if not snippet or not isinstance(snippet, str):
-            return "N/A"
-            
-        import re
-        # Look for patterns like "4.5 stars", "4.5/5", "Rating: 4.5"
-        patterns = [
-            r'(\d+\.?\d*)\s*(?:stars?|/5|\⭐)',
-            r'(?:Rating|Rated):\s*(\d+\.?\d*)',
-            r'(\d+\.?\d*)\s*out\s*of\s*5'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, snippet, re.IGNORECASE)
-            if match:
-                return f"{match.group(1)} ⭐"
-        
-        return "N/A"
-    except Exception as e:
-        return "N/A"
-
-def fetch_live_events(location, departure_date, return_date):
-    """Fetch live events and happenings during travel dates"""
-    try:
-        # Format dates for search queries
-        from datetime import datetime
-        if isinstance(departure_date, str):
-            dep_date = datetime.strptime(departure_date, "%Y-%m-%d")
-        else:
-            dep_date = departure_date
-            
-        if isinstance(return_date, str):
-            ret_date = datetime.strptime(return_date, "%Y-%m-%d")
-        else:
-            ret_date = return_date
-        
-        # Create date range for search
-        month_year = dep_date.strftime("%B %Y")
-        
-        event_queries = [
-            {
-                'query': f"events {location} {month_year} concerts shows festivals",
-                'category': 'Concerts & Shows',
-                'icon': '🎵'
-            },
-            {
-                'query': f"festivals {location} {month_year} food music cultural",
-                'category': 'Festivals & Cultural Events',
-                'icon': '🎭'
-            },
-            {
-                'query': f"sports events {location} {month_year} games matches tournaments",
-                'category': 'Sports & Games',
-                'icon': '⚽'
-            },
-            {
-                'query': f"exhibitions museums {location} {month_year} art shows galleries",
-                'category': 'Exhibitions & Museums',
-                'icon': '🎨'
-            },
-            {
-                'query': f"nightlife events {location} {month_year} clubs bars entertainment",
-                'category': 'Nightlife & Entertainment',
-                'icon': '🌃'
-            }
-        ]
-        
-        all_events = []
-        
-        for event_info in event_queries:
-            params = {
-                "engine": "google",
-                "q": event_info['query'],
-                "location": location,
-                "hl": "en",
-                "gl": "za",
-                "api_key": config.SERPAPI_KEY
-            }
-            
-            search = GoogleSearch(params)
-            results = search.get_dict()
-            
-            # Get events from organic results
-            events_found = []
-            organic_results = results.get("organic_results", [])
-            
-            for result in organic_results[:3]:  # Limit to 3 events per category
-                title = result.get('title', 'Unknown Event')
-                snippet = result.get('snippet', '')
-                link = result.get('link', '')
-                
-                # Filter out general tourism sites, prefer specific event listings
-                if any(keyword in title.lower() or keyword in snippet.lower() for keyword in 
-                       ['event', 'concert', 'show', 'festival', 'exhibition', 'match', 'game', 'performance']):
-                    
-                    # Extract date information from snippet if available
-                    import re
-                    date_patterns = [
-                        r'(\d{1,2}[-/]\d{1,2}[-/]\d{4})',
-                        r'(\d{1,2}\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4})',
-                        r'((Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{1,2}[-,]?\s*\d{4})'
-                    ]
-                    
-                    event_date = "Date TBA"
-                    for pattern in date_patterns:
-                        match = re.search(pattern, snippet, re.IGNORECASE)
-                        if match:
-                            event_date = match.group(1)
-                            break
-                    
-                    # Determine if it's a booking or info site
-                    if any(keyword in link.lower() for keyword in ['tickets', 'booking', 'eventbrite', 'ticketek', 'quicket']):
-                        link_type = "🎫 **Ticket Booking Site** - Purchase tickets directly"
-                        link_text = "Buy Tickets"
-                    elif any(keyword in link.lower() for keyword in ['facebook', 'instagram', 'twitter']):
-                        link_type = "📱 **Social Media Event** - Follow for updates"
-                        link_text = "View Event Details"
-                    else:
-                        link_type = "ℹ️ **Event Information** - Details and possibly booking"
-                        link_text = "Learn More"
-                    
-                    event = {
-                        'name': title,
-                        'description': snippet[:200] + "..." if len(snippet) > 200 else snippet,
-                        'date': event_date,
-                        'website': link,
-                        'link_type': link_type,
-                        'link_text': link_text,
-                        'category': event_info['category'],
-                        'icon': event_info['icon']
-                    }
-                    events_found.append(event)
-            
-            if events_found:
-                all_events.extend(events_found)
-        
-        return all_events[:12]  # Return top 12 events across all categories
-        
-    except Exception as error:
-        return []
-
-# AI Agents
-researcher = Agent(
-    name="Researcher",
-    instructions=[
-        "Identify the travel destination specified by the user.",
-        "Gather detailed information on the destination, including climate, culture, and safety tips.",
-        "Find popular attractions, landmarks, and must-visit places.",
-        "Search for activities that match the user’s interests and travel style.",
-        "Prioritize information from reliable sources and official travel guides.",
-        "Provide well-structured summaries with key insights and recommendations."
-    ],
-    model=Gemini(id="gemini-1.5-flash"),
-    add_datetime_to_instructions=True,
-)
-
-planner = Agent(
-    name="Planner",
-    instructions=[
-        "Gather details about the user's travel preferences and budget.",
-        "Create a detailed itinerary with scheduled activities and estimated costs.",
-        "Ensure the itinerary includes transportation options and travel time estimates.",
-        "Optimize the schedule for convenience and enjoyment.",
-        "Present the itinerary in a structured format."
-    ],
-    model=Gemini(id="gemini-1.5-flash"),
-    add_datetime_to_instructions=True,
-)
+def reset_plan_job():
+    """Forget the plan job this session is following so the form is shown again"""
+    st.session_state.plan_generated = False
+    st.session_state.plan_job_id = None
+    session_memory.discard(st.session_state, 'plan_snapshot')
+    st.query_params.pop('plan_id', None)
 
-hotel_restaurant_finder = Agent(
-    name="Hotel & Restaurant Finder",
-    instructions=[
-        "Identify key locations in the user's travel itinerary.",
-        "Search for highly rated hotels near those locations.",
-        "Search for top-rated restaurants based on cuisine preferences and proximity.",
-        "Prioritize results based on user preferences, ratings, and availability.",
-        "Provide direct booking links or reservation options where possible."
-    ],
-    model=Gemini(id="gemini-1.5-flash"),
-    add_datetime_to_instructions=True,
-)
+# Reattach to the plan job in the URL after a tab reload instead of starting over
+if not st.session_state.get('plan_job_id') and st.query_params.get('plan_id'):
+    st.session_state.plan_job_id = st.query_params['plan_id']
+    st.session_state.plan_generated = True
 
 # Generate Travel Plan with persistent display
 if st.button("🚀 Generate Travel Plan") or st.session_state.plan_generated:
     
-    # Only run the generation process if not already generated
+    # Only submit a new plan job if this session is not already following one
     if not st.session_state.plan_generated:
         # Track plan generation
         track_user_action("plan_generated", f"Destination: {destination}, Theme: {travel_theme}")
         st.session_state.plan_generated = True
+
+        # Generation runs as a background job; reruns and reloads reattach to it by id
+        st.session_state.plan_job_id = get_job_queue().submit({
+            'source': source,
+            'destination': destination,
+            'travel_theme': travel_theme,
+            'activity_preferences': activity_preferences,
+            'departure_date': departure_date,
+            'return_date': return_date,
+            'departure_time_pref': departure_time_pref,
+            'return_time_pref': return_time_pref,
+            'num_travelers': num_travelers,
+            'budget': budget,
+            'flight_class': flight_class,
+            'flex_days': flex_days,
+            'destinations': destinations if len(destinations) > 1 else None,
+            'optimize_for': optimize_for,
+        })
+        st.query_params['plan_id'] = st.session_state.plan_job_id
         
         # Add a "Generate New Plan" button at the top when plan is shown
         if st.button("🔄 Generate New Plan", key="new_plan_btn"):
             track_user_action("new_plan_requested")
-            st.session_state.plan_generated = False
+            reset_plan_job()
             st.rerun()
     
     else:
@@ -2587,7 +1673,7 @@ if st.button("🚀 Generate Travel Plan") or st.session_state.plan_generated:
         col1, col2 = st.columns([1, 4])
         with col1:
             if st.button("🔄 Generate New Plan", key="new_plan_btn_displayed"):
-                st.session_state.plan_generated = False
+                reset_plan_job()
                 st.rerun()
     
     # Initialize progress tracking
@@ -2626,133 +1712,59 @@ if st.button("🚀 Generate Travel Plan") or st.session_state.plan_generated:
         # Create a progress bar
         progress_bar = st.progress(0)
         status_text = st.empty()
-        
-        # Stage 1: Flight Information
-        status_text.text("🛫 Preparing flight booking information...")
-        progress_bar.progress(10)
-        
-        # Generate flight booking info (no API calls, direct to Skyscanner)
-        flight_summary = generate_flight_summary(source_iata, destination_iata, departure_date, return_date, num_travelers, flight_class)
-        
-        # Stage 2: Restaurant Search
-        status_text.text("🍽️ Discovering local restaurants...")
-        progress_bar.progress(25)
-        
-        # Use Google for restaurants (better local business data)
-        restaurant_data = fetch_google_restaurants(destination, budget=budget, travel_theme=travel_theme)
-
-        # Stage 3: Business Venues (if applicable)
-        if "Business" in travel_theme:
-            status_text.text("💼 Finding business venues...")
-            progress_bar.progress(40)
-            business_venues = fetch_business_venues(destination)
-        else:
-            progress_bar.progress(40)
-            business_venues = []
-
-        # Stage 4: Attractions
-        status_text.text("🎯 Exploring attractions and activities...")
-        progress_bar.progress(55)
-        
-        # Use Google for tourist attractions (comprehensive local info)
-        attraction_data = fetch_google_attractions(destination, activity_preferences)
-
-        # Stage 5: Live Events
-        status_text.text("🎉 Checking for live events...")
-        progress_bar.progress(70)
-        
-        # Fetch live events happening during travel dates
-        live_events = fetch_live_events(destination, departure_date, return_date)
 
-        # Stage 6: Local Information
-        status_text.text("ℹ️ Gathering local insights...")
-        progress_bar.progress(80)
-        
-        # Use Google for local culture, weather, safety info
-        local_info = fetch_google_local_info(destination)
-
-        # Stage 7: AI Research
-        status_text.text("🔍 Analyzing destination data...")
-        progress_bar.progress(90)
-        
-        # AI Processing with combined data
-        # Calculate trip duration from dates
-        trip_duration = (return_date - departure_date).days
-        if trip_duration <= 0:
-            trip_duration = 1  # Minimum 1 day trip
-
-        # Combine all data for AI processing
-        combined_travel_data = {
-            'restaurants': restaurant_data,
-            'attractions': attraction_data,
-            'local_info': local_info,
-            'live_events': live_events
-        }
-    
-    research_prompt = (
-        f"Based on real-time data for {destination}, provide comprehensive travel insights:\n"
-        f"- Popular Attractions: {', '.join([a.get('name', 'Attraction') for a in attraction_data[:5]]) if attraction_data else 'Research local attractions'}\n"
-        f"- Upcoming Events: {', '.join([e.get('title', 'Event') for e in live_events[:3]]) if live_events else 'Check local event listings'}\n"
-        f"- Local Highlights: {', '.join([info.get('category', 'Local info') for info in local_info[:3]]) if local_info else 'General destination information'}\n"
-        f"Create a detailed guide covering:\n"
-        f"1. Must-visit attractions and activities for a {travel_theme.lower()} trip\n"
-        f"2. Live events and happenings during travel dates\n"
-        f"3. Local culture and customs\n"
-        f"4. Weather and best time to visit\n"
-        f"5. Safety tips and transportation\n"
-        f"6. Recommendations based on traveler preferences: {activity_preferences}\n"
-        f"Trip duration: {trip_duration} days, Budget: {budget}, Flight Class: {flight_class}\n"
-        f"Focus on providing practical, actionable travel advice without technical data."
-    )
-    research_results = researcher.run(research_prompt, stream=False)
-
-    # Stage 8: Creating Itinerary
-    status_text.text("🗺️ Creating your personalized itinerary...")
-    progress_bar.progress(95)
-
-    # Create a clean summary for the AI instead of raw JSON
-    flight_info_summary = f"Flight booking available from {source_iata} to {destination_iata}, check Skyscanner for current prices and availability"
-    car_rental_summary = "Car rental options available via Skyscanner"
-    restaurant_summary = f"Featured restaurants include {', '.join([r.get('name', 'Restaurant') for r in restaurant_data[:3]]) if restaurant_data else 'local dining options'}"
-    attraction_summary = f"Top attractions include {', '.join([a.get('name', 'Attraction') for a in attraction_data[:3]]) if attraction_data else 'local points of interest'}"
-    events_summary = f"Live events during your visit: {', '.join([e.get('title', 'Various events') for e in live_events[:3]]) if live_events else 'Check local listings'}"
-    
-    planning_prompt = (
-        f"Create a detailed {trip_duration}-day itinerary for a {travel_theme.lower()} trip to {destination}. "
-        f"Use this information to create recommendations:\n\n"
-        f"AVAILABLE SERVICES:\n"
-        f"- Flights: {flight_info_summary}\n"
-        f"- Transportation: {car_rental_summary}\n"
-        f"- Dining: {restaurant_summary}\n"
-        f"- Attractions: {attraction_summary}\n"
-        f"- Events: {events_summary}\n\n"
-        f"TRAVELER PREFERENCES:\n"
-        f"- Activities: {activity_preferences}\n"
-        f"- Budget: {budget}\n"
-        f"- Flight Class: {flight_class}\n"
-        f"- Departure Time Preference: {departure_time_pref}\n"
-        f"- Return Time Preference: {return_time_pref}\n\n"
-        f"RESEARCH INSIGHTS:\n{research_results.content}\n\n"
-        f"CRITICAL FORMATTING INSTRUCTIONS:\n"
-        f"- Use ONLY plain text and basic markdown formatting\n"
-        f"- NO HTML tags whatsoever (no <div>, <span>, <style>, etc.)\n"
-        f"- NO CSS styling or HTML formatting\n"
-        f"- Use simple markdown: # for headers, ** for bold, - for bullets\n"
-        f"- Create clear, readable text that displays properly in a travel app\n"
-        f"- Focus on practical travel information with specific times and locations\n\n"
-        f"Create a detailed day-by-day itinerary including recommended restaurants, attractions, and events from the available data."
-    )
-    itinerary = planner.run(planning_prompt, stream=False)
+    # Reruns reuse this session's compact plan snapshot; otherwise follow the plan job's progress events
+    job_id = st.session_state.plan_job_id
+    snapshot = session_memory.load(st.session_state, 'plan_snapshot')
+    if snapshot and snapshot[0] == job_id:
+        plan = plan_codec.decode(snapshot[1])
+        progress_bar.progress(100)
+    else:
+        job_queue = get_job_queue()
+        try:
+            for event in job_queue.iter_events(job_id):
+                status_text.text(event['message'])
+                progress_bar.progress(event['percent'])
+            plan = job_queue.get_result(job_id)
+        except JobNotFound:
+            plan = None
+        if plan is not None:
+            st.session_state.plan_snapshot = (job_id, plan_codec.encode(plan))
+            session_memory.account(st.session_state.session_id, st.session_state)
+
+    if plan is None:
+        progress_container.empty()
+        reset_plan_job()
+        st.error("❌ We couldn't generate your travel plan. Please try again.")
+        st.stop()
+
+    # Display the plan as it was requested - the form may have been reset by a reload
+    travel_theme = plan['travel_theme']
+    departure_date = to_date(plan['departure_date'])
+    return_date = to_date(plan['return_date'])
+    departure_time_pref = plan['departure_time_pref']
+    return_time_pref = plan['return_time_pref']
+    num_travelers = plan['num_travelers']
+    budget = plan['budget']
+    destination_iata = plan['destination_iata']
+
+    flight_summary = plan['flight_summary']
+    restaurant_data = plan['restaurants']
+    business_venues = plan['business_venues']
+    attraction_data = plan['attractions']
+    live_events = plan['live_events']
+    local_info = plan['local_info']
+    itinerary_content = plan['itinerary']
 
-    # Final stage: Complete
-    status_text.text("✅ Travel plan ready!")
-    progress_bar.progress(100)
-    
     # Clear the progress indicators after a brief moment
     import time
     time.sleep(1)
     progress_container.empty()
 
+    # Data the fetchers could not find, reported here because they run on worker threads
+    for notice in plan_notices(plan):
+        {'warning': st.warning, 'info': st.info}[notice['level']](notice['message'])
+
     # Display Results
     st.subheader("✈️ Flight Booking")
     
@@ -2774,16 +1786,49 @@ if st.button("🚀 Generate Travel Plan") or st.session_state.plan_generated:
     *Click the link above to see all available flights for your dates and book directly with your preferred airline.*
     """)
 
+    # Multi-city route: the chosen visit order and the best fare found for each leg
+    if plan.get('route'):
+        route = plan['route']
+        objective = "lowest total fare" if route['objective'] == 'price' else "shortest total flight time"
+        estimated = f", {route['estimated_legs']} legs estimated from distance" if route['estimated_legs'] else ""
+        st.markdown(f"#### 🗺️ Your Route ({objective}, {route['method']} ordering{estimated})")
+        for leg in plan['legs']:
+            best = leg['flights'][0] if leg['flights'] else None
+            fare = f"{best.get('price')} · {best.get('airline')} · {best.get('total_duration')}" if best else "no live fare"
+            st.markdown(f"**{to_date(leg['date']).strftime('%a %d %b')}** {leg['from']} ➜ {leg['to']} — {fare}")
+
+    # Live fares found by the flight aggregator (older saved plans have none)
+    if plan.get('flights'):
+        first_leg = f" ({plan['legs'][0]['from']} ➜ {plan['legs'][0]['to']})" if plan.get('legs') else ""
+        st.markdown(f"#### 💸 Live Fares{first_leg}")
+        for offer in plan['flights'][:5]:
+            stops = "Direct" if not offer.get('stops') else f"{offer.get('stops')} stop{'s' if offer.get('stops') > 1 else ''}"
+            link = f" · [Book]({offer.get('booking_url')})" if offer.get('booking_url') else ""
+            st.markdown(f"**{offer.get('airline')}** {offer.get('price')} · {stops} · {offer.get('total_duration')} · "
+                        f"departs {offer.get('departure_time')} ({offer.get('source')}){link}")
+
+    # Flexible-date fare matrix: cheapest fare per departure (rows) and return (columns) date
+    fares = plan.get('fare_matrix')
+    if fares and any(price is not None for row in fares['prices'] for price in row):
+        import pandas as pd
+        st.markdown(f"#### 📅 Flexible Dates ({fares['currency']}, cheapest fare per date pair)")
+        label = lambda day: to_date(day).strftime('%a %d %b')
+        matrix = pd.DataFrame(fares['prices'], index=[label(day) for day in fares['departure_dates']],
+                              columns=[label(day) for day in fares['return_dates']], dtype=float)
+        matrix.index.name = "Depart ↓ / Return →"
+        st.dataframe(matrix.style.format("{:,.0f}", na_rep="—").highlight_min(axis=None, color="#D4AF37"),
+                     use_container_width=True)
+        chosen = matrix.loc[label(departure_date), label(return_date)]
+        best = matrix.stack().idxmin()
+        if pd.notna(chosen) and matrix.loc[best] < chosen:
+            st.caption(f"💡 Departing {best[0]} and returning {best[1]} saves "
+                       f"{fares['currency']} {chosen - matrix.loc[best]:,.0f} per booking.")
+
     # Car Rental Booking Section
     st.subheader("🚗 Car Rental Booking")
     
-    # Generate Skyscanner car rental URL using correct format
-    pickup_date_str = departure_date.strftime('%Y-%m-%dT10:00')
-    dropoff_date_str = return_date.strftime('%Y-%m-%dT10:00')
-    
     # Use actual Skyscanner car hire URL structure
-    # Note: Using generic location ID format - Skyscanner will redirect properly
-    skyscanner_car_url = f"https://www.skyscanner.com/carhire/results/{destination_iata}/{destination_iata}/{pickup_date_str}/{dropoff_date_str}/30/"
+    skyscanner_car_url = plan['car_rental_url']
     
     # Get rental duration
     rental_days = (return_date - departure_date).days
@@ -3017,4 +2062,4 @@ if st.button("🚀 Generate Travel Plan") or st.session_state.plan_generated:
         pass
 
     st.markdown('<div class="section-header">🗺️ Your Personalized Itinerary</div>', unsafe_allow_html=True)
-    st.markdown(itinerary.content, unsafe_allow_html=True)
+    st.markdown(itinerary_content, unsafe_allow_html=True)
@@ -0,0 +1,132 @@
+"""
+Multi-city routing for AI Travel Planner
+Visit order for a trip through several destinations: exact Held-Karp dynamic programming over a
+pairwise fare or travel-time matrix for up to EXACT_MAX_CITIES destinations, and nearest-neighbour
+construction improved by 2-opt beyond that. Also splits the trip's days across the cities and
+estimates legs no fare was found for from great-circle distance.
+"""
+
+from datetime import timedelta
+
+# Largest number of destinations ordered exactly (Held-Karp is O(2^n n^2))
+EXACT_MAX_CITIES = 10
+
+# Rough leg estimates when no fare is available: base + per-km fare, taxi/climb + ~810 km/h block speed
+BASE_FARE, FARE_PER_KM = 60.0, 0.09
+BASE_MINUTES, KM_PER_MINUTE = 40.0, 13.5
+
+def estimated_leg(km):
+    """(fare, minutes) estimate for a direct flight of km kilometres"""
+    return BASE_FARE + FARE_PER_KM * km, BASE_MINUTES + km / KM_PER_MINUTE
+
+def route_cost(cost, order, return_home=True):
+    """Total cost of visiting order (node indices, 0 is home) starting from home"""
+    stops = [0] + list(order) + ([0] if return_home else [])
+    return sum(cost[a][b] for a, b in zip(stops, stops[1:]))
+
+def held_karp(cost, return_home=True):
+    """
+    Exact cheapest visit order
+
+    Args:
+        cost (list): Square matrix, cost[i][j] for travelling from node i to node j; node 0 is home
+        return_home (bool): The trip ends back at node 0
+
+    Returns:
+        list: Node indices 1..n-1 in visit order
+    """
+    cities = len(cost) - 1
+    if cities <= 1:
+        return list(range(1, cities + 1))
+    full = (1 << cities) - 1
+    inf = float('inf')
+    # best[mask][last]: cheapest way to leave home, visit the cities in mask and stop at city last
+    best = [[inf] * cities for _ in range(full + 1)]
+    parent = [[-1] * cities for _ in range(full + 1)]
+    for city in range(cities):
+        best[1 << city][city] = cost[0][city + 1]
+
+    for mask in range(1, full + 1):
+        row = best[mask]
+        for last in range(cities):
+            so_far = row[last]
+            if so_far == inf:
+                continue
+            leg = cost[last + 1]
+            for city in range(cities):
+                if mask & (1 << city):
+                    continue
+                total = so_far + leg[city + 1]
+                extended = mask | (1 << city)
+                if total < best[extended][city]:
+                    best[extended][city] = total
+                    parent[extended][city] = last
+
+    closing = lambda last: best[full][last] + (cost[last + 1][0] if return_home else 0)
+    last = min(range(cities), key=closing)
+    order, mask = [], full
+    while last != -1:
+        order.append(last + 1)
+        mask, last = mask & ~(1 << last), parent[mask][last]
+    return order[::-1]
+
+def nearest_neighbour(cost):
+    """Greedy visit order: always fly to the cheapest unvisited city next"""
+    unvisited = set(range(1, len(cost)))
+    order, current = [], 0
+    while unvisited:
+        current = min(unvisited, key=lambda city: (cost[current][city], city))
+        unvisited.remove(current)
+        order.append(current)
+    return order
+
+def two_opt(cost, order, return_home=True):
+    """Improve a visit order by reversing segments while any reversal lowers the total cost"""
+    order = list(order)
+    best_total = route_cost(cost, order, return_home)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(order) - 1):
+            for j in range(i + 1, len(order)):
+                candidate = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                total = route_cost(cost, candidate, return_home)
+                if total < best_total - 1e-9:
+                    order, best_total, improved = candidate, total, True
+    return order
+
+def best_order(cost, return_home=True):
+    """
+    Visit order minimizing the total of a cost matrix
+
+    Args:
+        cost (list): Square matrix with home as node 0
+        return_home (bool): The trip ends back at home
+
+    Returns:
+        tuple: (order of node indices 1..n-1, total cost, 'exact' or 'heuristic')
+    """
+    if len(cost) - 1 <= EXACT_MAX_CITIES:
+        order, method = held_karp(cost, return_home), 'exact'
+    else:
+        order, method = two_opt(cost, nearest_neighbour(cost), return_home), 'heuristic'
+    return order, route_cost(cost, order, return_home), method
+
+def split_stays(departure_date, return_date, cities):
+    """
+    Arrival and departure date per city, sharing the trip's nights as evenly as possible
+
+    Earlier cities get the extra nights; every city gets at least one night, so trips shorter than
+    the number of cities end after return_date.
+
+    Returns:
+        list: (arrival_date, leave_date) per city in visit order
+    """
+    nights = max((return_date - departure_date).days, cities)
+    base, extra = divmod(nights, cities)
+    stays, arrival = [], departure_date
+    for index in range(cities):
+        leave = arrival + timedelta(days=base + (1 if index < extra else 0))
+        stays.append((arrival, leave))
+        arrival = leave
+    return stays